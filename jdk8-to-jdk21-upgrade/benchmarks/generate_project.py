@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+合成Maven项目生成器
+按指定规模生成可重复的多模块Java项目，用于基准测试：
+Java文件数、模块数、javax引用密度、文件大小和源文件编码均可控制，相同参数和种子生成完全相同的项目
+"""
+
+import os
+import sys
+import json
+import random
+from pathlib import Path
+
+MAPPING_FILE = Path(__file__).resolve().parent.parent / 'references' / 'javax_jakarta_mapping.json'
+
+# 每个包目录下的最大文件数，避免单个目录过大
+FILES_PER_PACKAGE = 50
+
+# 非javax的常见import
+PLAIN_IMPORTS = [
+    'java.util.List', 'java.util.Map', 'java.util.Optional', 'java.time.LocalDateTime',
+    'java.util.concurrent.ConcurrentHashMap', 'org.springframework.stereotype.Service',
+    'org.springframework.beans.factory.annotation.Autowired', 'lombok.Data', 'lombok.extern.slf4j.Slf4j',
+]
+
+# 模块POM中使用的旧版本依赖
+MODULE_DEPENDENCIES = [
+    ('org.projectlombok', 'lombok', '1.18.12'),
+    ('com.baomidou', 'mybatis-plus-boot-starter', '3.4.3'),
+    ('org.redisson', 'redisson-spring-boot-starter', '3.16.0'),
+    ('cn.hutool', 'hutool-all', '5.7.22'),
+    ('com.google.guava', 'guava', '30.1-jre'),
+    ('org.apache.commons', 'commons-lang3', '3.12.0'),
+    ('com.fasterxml.jackson.core', 'jackson-databind', '2.13.4'),
+    ('com.alibaba', 'druid', '1.2.8'),
+]
+
+# 各编码下可表示的注释文本
+ENCODING_COMMENTS = {
+    'utf-8': '业务逻辑处理',
+    'gbk': '业务逻辑处理',
+    'iso-8859-1': 'traitement métier',
+}
+
+POM_HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0"
+         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd">
+    <modelVersion>4.0.0</modelVersion>
+'''
+
+
+class ProjectGenerator:
+    """确定性的合成项目生成器"""
+
+    def __init__(self, output, files=1000, modules=10, javax_density=0.3, avg_size=4096,
+                 encodings=('utf-8',), full_body_refs=0.1, seed=42):
+        self.output = Path(output)
+        self.files = files
+        self.modules = max(1, modules)
+        self.javax_density = javax_density
+        self.avg_size = avg_size
+        self.encodings = list(encodings)
+        self.full_body_refs = full_body_refs
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
+            self.javax_packages = sorted(json.load(f)['package_mappings'])
+
+        self.stats = {'java_files': 0, 'java_bytes': 0, 'javax_files': 0, 'pom_files': 0, 'by_encoding': {}}
+
+    def generate(self):
+        """生成项目，返回规模统计"""
+        self.output.mkdir(parents=True, exist_ok=True)
+        module_names = [f'module-{i:03d}' for i in range(self.modules)]
+        self.write(self.output / 'pom.xml', self.root_pom(module_names).encode('utf-8'))
+        self.stats['pom_files'] += 1
+
+        for index, name in enumerate(module_names):
+            module_dir = self.output / name
+            self.write(module_dir / 'pom.xml', self.module_pom(name).encode('utf-8'))
+            self.stats['pom_files'] += 1
+
+            # 文件按模块平均分配，余数分给前面的模块
+            count = self.files // self.modules + (1 if index < self.files % self.modules else 0)
+            for number in range(count):
+                package = f'com.example.m{index:03d}.p{number // FILES_PER_PACKAGE:03d}'
+                class_name = f'Generated{number:05d}'
+                encoding = self.random.choice(self.encodings)
+                data = self.java_source(package, class_name, encoding)
+                path = module_dir / 'src' / 'main' / 'java' / package.replace('.', os.sep) / f'{class_name}.java'
+                self.write(path, data)
+                self.stats['java_files'] += 1
+                self.stats['java_bytes'] += len(data)
+                self.stats['by_encoding'][encoding] = self.stats['by_encoding'].get(encoding, 0) + 1
+
+        self.stats['seed'] = self.seed
+        with open(self.output / 'benchmark_project.json', 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, indent=2, ensure_ascii=False)
+        return self.stats
+
+    def write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def root_pom(self, module_names):
+        modules = ''.join(f'        <module>{name}</module>\n' for name in module_names)
+        return POM_HEADER + f'''    <parent>
+        <groupId>org.springframework.boot</groupId>
+        <artifactId>spring-boot-starter-parent</artifactId>
+        <version>2.7.18</version>
+        <relativePath/>
+    </parent>
+    <groupId>com.example</groupId>
+    <artifactId>benchmark-root</artifactId>
+    <version>1.0.0</version>
+    <packaging>pom</packaging>
+    <properties>
+        <java.version>1.8</java.version>
+        <lombok.version>1.18.12</lombok.version>
+        <spring-cloud.version>2021.0.3</spring-cloud.version>
+    </properties>
+    <modules>
+{modules}    </modules>
+</project>
+'''
+
+    def module_pom(self, name):
+        dependencies = ''
+        for group_id, artifact_id, version in self.random.sample(MODULE_DEPENDENCIES, 3):
+            if artifact_id == 'lombok':
+                version = '${lombok.version}'
+            dependencies += f'''        <dependency>
+            <groupId>{group_id}</groupId>
+            <artifactId>{artifact_id}</artifactId>
+            <version>{version}</version>
+        </dependency>
+'''
+        return POM_HEADER + f'''    <parent>
+        <groupId>com.example</groupId>
+        <artifactId>benchmark-root</artifactId>
+        <version>1.0.0</version>
+    </parent>
+    <artifactId>{name}</artifactId>
+    <dependencies>
+{dependencies}    </dependencies>
+</project>
+'''
+
+    def java_source(self, package, class_name, encoding):
+        """生成单个Java文件的字节内容"""
+        imports = self.random.sample(PLAIN_IMPORTS, self.random.randint(2, 5))
+        javax = []
+        if self.random.random() < self.javax_density:
+            javax = self.random.sample(self.javax_packages, self.random.randint(1, 4))
+            imports += [f'{pkg}.Type{i}' for i, pkg in enumerate(javax)]
+            self.stats['javax_files'] += 1
+        if self.random.random() < 0.01:
+            imports.append('sun.misc.Unsafe')
+        imports.sort()
+
+        lines = [f'package {package};', '']
+        lines += [f'import {name};' for name in imports]
+        lines += ['', f'// {ENCODING_COMMENTS.get(encoding, "generated")}',
+                  f'public class {class_name} {{', '']
+
+        # 文件大小按对数正态分布，均值约为avg_size
+        target = int(self.random.lognormvariate(0, 0.5) * self.avg_size / 1.13)
+        size = sum(len(line) + 1 for line in lines)
+        method = 0
+        while size < target:
+            body = [f'    public int method{method}(int value) {{',
+                    f'        // {ENCODING_COMMENTS.get(encoding, "generated")} {method}',
+                    f'        return value * {self.random.randint(1, 1000)} + {method};',
+                    '    }', '']
+            if javax and self.random.random() < self.full_body_refs:
+                body.insert(1, f'        {self.random.choice(javax)}.Type0 ref{method} = null;')
+            lines += body
+            size += sum(len(line) + 1 for line in body)
+            method += 1
+        lines.append('}')
+        return ('\n'.join(lines) + '\n').encode(encoding)
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python generate_project.py <输出目录> [--files N] [--modules N] [--javax-density F] "
+              "[--avg-size BYTES] [--encodings utf-8,gbk] [--seed N]")
+        print("\n选项:")
+        print("  --files N          Java文件数（默认1000）")
+        print("  --modules N        模块数（默认10）")
+        print("  --javax-density F  包含javax import的文件比例（默认0.3）")
+        print("  --avg-size BYTES   Java文件平均大小（默认4096）")
+        print("  --encodings LIST   源文件编码，逗号分隔，随机分配（默认utf-8）")
+        print("  --seed N           随机种子（默认42）")
+        sys.exit(1)
+
+    output = Path(sys.argv[1])
+    if output.exists() and any(output.iterdir()):
+        print(f"错误: 输出目录非空: {output}")
+        sys.exit(1)
+
+    generator = ProjectGenerator(
+        output,
+        files=int(get_option_value('--files', '1000')),
+        modules=int(get_option_value('--modules', '10')),
+        javax_density=float(get_option_value('--javax-density', '0.3')),
+        avg_size=int(get_option_value('--avg-size', '4096')),
+        encodings=get_option_value('--encodings', 'utf-8').split(','),
+        seed=int(get_option_value('--seed', '42'))
+    )
+    stats = generator.generate()
+    print(f"✓ 已生成: {output}")
+    print(f"  Java文件: {stats['java_files']} ({stats['java_bytes'] / 1024 / 1024:.1f} MB)，"
+          f"含javax: {stats['javax_files']}，POM: {stats['pom_files']}")
+
+if __name__ == '__main__':
+    main()
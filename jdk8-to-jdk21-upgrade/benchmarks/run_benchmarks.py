@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+基准测试运行脚本
+为每个规模生成合成项目，分别运行analyze_project.py、migrate_imports.py和upgrade_pom.py，
+记录耗时、吞吐量和子进程峰值内存，结果保存为JSON以便跨版本比较
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+from generate_project import ProjectGenerator
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def report_file(script, project):
+    """脚本写出的JSON结果（含分阶段性能数据），没有时返回None"""
+    if script == 'analyze_project.py':
+        return project / 'upgrade_analysis.json'
+    if script == 'migrate_imports.py':
+        return project.parent / 'import_migration_stats.json'
+    return None
+
+
+def run_measured(args, env):
+    """运行子进程并返回(退出码, 耗时秒数, 峰值RSS字节数)"""
+    start = time.perf_counter()
+    with open(os.devnull, 'wb') as devnull:
+        process = subprocess.Popen(args, stdout=devnull, stderr=subprocess.STDOUT, env=env)
+        # os.wait4同时返回子进程的资源使用情况，ru_maxrss在Linux上以KB为单位、在macOS上以字节为单位
+        _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return process.returncode, elapsed, usage.ru_maxrss * scale
+
+
+def benchmark_cases(jobs):
+    """基准用例：(名称, 脚本, 参数, 是否复用上一用例的项目副本)
+
+    参数中的{project}替换为项目目录。复用副本的用例用于测量增量清单、缓存等二次运行的效果。
+    """
+    return [
+        ('analyze', 'analyze_project.py', ['{project}', '--no-cache'], False),
+        ('analyze-cache-cold', 'analyze_project.py', ['{project}'], False),
+        ('analyze-cache-warm', 'analyze_project.py', ['{project}'], True),
+        ('analyze-full-body', 'analyze_project.py', ['{project}', '--full-body', '--no-cache'], False),
+        ('migrate', 'migrate_imports.py', ['{project}', '--no-manifest'], False),
+        (f'migrate-jobs{jobs}', 'migrate_imports.py', ['{project}', '--no-manifest', '--jobs', str(jobs)], False),
+        ('migrate-manifest-cold', 'migrate_imports.py', ['{project}'], False),
+        ('migrate-manifest-warm', 'migrate_imports.py', ['{project}'], True),
+        ('upgrade-pom-reactor', 'upgrade_pom.py', ['{project}/pom.xml', '--reactor', '--no-backup'], False),
+    ]
+
+
+def run_size(size, modules, args, workdir, cache_dir):
+    """生成指定规模的项目并运行全部用例"""
+    pristine = workdir / f'pristine-{size}'
+    generator = ProjectGenerator(pristine, files=size, modules=modules,
+                                 javax_density=args['javax_density'], avg_size=args['avg_size'],
+                                 encodings=args['encodings'], seed=args['seed'])
+    print(f"\n>>> 生成项目: {size}个Java文件, {modules}个模块")
+    project_stats = generator.generate()
+    megabytes = project_stats['java_bytes'] / 1024 / 1024
+
+    results = []
+    copy = None
+    for name, script, script_args, reuse in benchmark_cases(args['jobs']):
+        # 脚本会修改项目或写入报告，每个用例在独立副本上运行，复制耗时不计入结果；
+        # 副本放在单独的目录中，迁移清单和统计文件（写在项目同级目录）不会被后续用例误用
+        if not reuse or copy is None:
+            if copy is not None:
+                shutil.rmtree(copy.parent)
+            copy = workdir / f'run-{size}' / 'project'
+            shutil.copytree(pristine, copy)
+            # 冷启动用例使用空缓存目录
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        env = dict(os.environ, JDK21_UPGRADE_CACHE_DIR=str(cache_dir), PYTHONDONTWRITEBYTECODE='1')
+
+        report = report_file(script, copy)
+        if report is not None and report.exists():
+            report.unlink()
+
+        command = [sys.executable, str(SCRIPTS_DIR / script)] + [a.replace('{project}', str(copy)) for a in script_args]
+        exit_code, elapsed, peak_rss = run_measured(command, env)
+        result = {
+            'name': name,
+            'script': script,
+            'args': script_args,
+            'java_files': project_stats['java_files'],
+            'pom_files': project_stats['pom_files'],
+            'megabytes': round(megabytes, 2),
+            'exit_code': exit_code,
+            'wall_seconds': round(elapsed, 3),
+            'files_per_sec': round(project_stats['java_files'] / elapsed, 1) if elapsed else None,
+            'mb_per_sec': round(megabytes / elapsed, 2) if elapsed else None,
+            'peak_rss_mb': round(peak_rss / 1024 / 1024, 1)
+        }
+        # 脚本自身记录的分阶段耗时和峰值内存
+        if report is not None and report.exists():
+            with open(report, 'r', encoding='utf-8') as f:
+                performance = json.load(f).get('performance', {})
+            result['phases'] = performance.get('phases')
+            # 脚本按阶段清零RSS高水位后，wait4只反映最后一次清零以来的峰值，取脚本记录的整体峰值
+            process_peak = performance.get('total', {}).get('process_peak_rss_mb')
+            if process_peak:
+                result['peak_rss_mb'] = max(result['peak_rss_mb'], process_peak)
+        results.append(result)
+        status = '✓' if exit_code == 0 else f'✗ (退出码 {exit_code})'
+        print(f"  {status} {name:<24} {elapsed:8.2f}s {result['files_per_sec']:>10} files/s "
+              f"{result['mb_per_sec']:>8} MB/s  峰值RSS {result['peak_rss_mb']} MB")
+
+    if copy is not None:
+        shutil.rmtree(copy.parent)
+    shutil.rmtree(pristine)
+    return {'size': size, 'modules': modules, 'project': project_stats, 'results': results}
+
+
+def environment_info():
+    """记录运行环境，便于比较不同版本的结果"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=SCRIPTS_DIR, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL).stdout.decode('ascii').strip() or None
+    except FileNotFoundError:
+        info['git_commit'] = None
+    return info
+
+
+def compare(results, baseline_path):
+    """与基线结果比较各用例耗时"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(run['size'], result['name']): result
+                for run in baseline['runs'] for result in run['results']}
+
+    print(f"\n与基线比较: {baseline_path}")
+    for run in results['runs']:
+        for result in run['results']:
+            old = previous.get((run['size'], result['name']))
+            if old is None or not old['wall_seconds']:
+                continue
+            ratio = result['wall_seconds'] / old['wall_seconds']
+            marker = '⚠' if ratio > 1.1 else ' '
+            print(f"  {marker} {run['size']:>7} {result['name']:<24} {old['wall_seconds']:8.2f}s → "
+                  f"{result['wall_seconds']:8.2f}s ({ratio:.2f}x)")
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("用法: python run_benchmarks.py [--sizes 1000,10000] [--modules N] [--javax-density F] "
+              "[--avg-size BYTES] [--encodings utf-8,gbk] [--seed N] [--jobs N] [--output PATH] [--compare PATH]")
+        print("\n选项:")
+        print("  --sizes LIST       Java文件数，逗号分隔（默认1000,10000）")
+        print("  --modules N        每个规模的模块数（默认为文件数/100，范围1-500）")
+        print("  --javax-density F  包含javax import的文件比例（默认0.3）")
+        print("  --avg-size BYTES   Java文件平均大小（默认4096）")
+        print("  --encodings LIST   源文件编码（默认utf-8,gbk）")
+        print("  --seed N           生成器随机种子（默认42）")
+        print("  --jobs N           并行用例的进程数（默认CPU核数）")
+        print("  --output PATH      结果文件（默认benchmarks/results/<时间>.json）")
+        print("  --compare PATH     与之前保存的结果比较")
+        sys.exit(0)
+
+    sizes = [int(size) for size in get_option_value('--sizes', '1000,10000').split(',')]
+    modules = get_option_value('--modules')
+    args = {
+        'javax_density': float(get_option_value('--javax-density', '0.3')),
+        'avg_size': int(get_option_value('--avg-size', '4096')),
+        'encodings': get_option_value('--encodings', 'utf-8,gbk').split(','),
+        'seed': int(get_option_value('--seed', '42')),
+        'jobs': int(get_option_value('--jobs', str(os.cpu_count() or 1)))
+    }
+
+    results = {
+        'benchmark_time': datetime.now().isoformat(),
+        'environment': environment_info(),
+        'parameters': args,
+        'runs': []
+    }
+
+    print("基准测试")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory(prefix='jdk21-upgrade-bench-') as tmp:
+        workdir = Path(tmp)
+        for size in sizes:
+            module_count = int(modules) if modules else min(500, max(1, size // 100))
+            results['runs'].append(run_size(size, module_count, args, workdir, workdir / 'cache'))
+
+    output = Path(get_option_value('--output') or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存: {output}")
+
+    baseline = get_option_value('--compare')
+    if baseline:
+        compare(results, baseline)
+
+if __name__ == '__main__':
+    main()
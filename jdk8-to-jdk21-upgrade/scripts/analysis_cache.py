@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+分析结果持久化缓存
+按项目在用户缓存目录下维护一个SQLite数据库，记录每个Java文件的扫描结果
+（javax命中规则和过时API），以路径、大小、修改时间和内容哈希为键。
+规则集变化时整库失效，后续运行只需重新扫描发生变化的文件。
+完整分析时同时记录当时的HEAD提交，作为--since模式计算变更文件的基线。
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from upgrade_cache import get_cache_dir
+
+# 表结构版本，结构变化时旧数据库自动重建
+SCHEMA_VERSION = 1
+
+
+def cache_path_for(project_path):
+    """项目对应的缓存数据库路径（按项目绝对路径区分）"""
+    key = hashlib.sha256(str(Path(project_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return get_cache_dir() / 'analysis' / f'{Path(project_path).resolve().name}-{key}.sqlite'
+
+
+class AnalysisCache:
+    """单个项目的文件级分析结果缓存
+
+    rule_version标识当前规则集（映射表、检测规则、扫描模式），与库中记录不一致时清空全部结果。
+    """
+
+    def __init__(self, project_path, rule_version, db_path=None):
+        self.db_path = Path(db_path) if db_path else cache_path_for(project_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.rule_version = rule_version
+        self.hits = 0
+        self.updates = []
+
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' sha256 TEXT NOT NULL,'
+            ' prefiltered INTEGER NOT NULL,'
+            ' findings TEXT NOT NULL)')
+
+        meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+        if meta.get('schema') != str(SCHEMA_VERSION) or meta.get('rule_version') != rule_version:
+            # 规则集或表结构变化，已有结果全部作废
+            with self.conn:
+                self.conn.execute('DELETE FROM files')
+                self.conn.execute("DELETE FROM meta WHERE key = 'baseline_commit'")
+                self.conn.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                      [('schema', str(SCHEMA_VERSION)), ('rule_version', rule_version)])
+
+        self.baseline_commit = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'baseline_commit'").fetchone()
+        self.baseline_commit = self.baseline_commit[0] if self.baseline_commit else None
+
+        # 一次性读入全部记录，避免逐文件查询
+        self.rows = {
+            path: {'size': size, 'mtime_ns': mtime_ns, 'sha256': sha256,
+                   'prefiltered': bool(prefiltered), 'findings': findings}
+            for path, size, mtime_ns, sha256, prefiltered, findings in self.conn.execute(
+                'SELECT path, size, mtime_ns, sha256, prefiltered, findings FROM files')
+        }
+
+    def lookup(self, path, stat):
+        """大小和修改时间均未变化时返回缓存记录，否则返回None"""
+        row = self.rows.get(path)
+        if row is not None and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+            self.hits += 1
+            return self.result(row)
+        return None
+
+    def known_hash(self, path):
+        """缓存中记录的内容哈希，用于判断仅修改时间变化的文件"""
+        row = self.rows.get(path)
+        return row['sha256'] if row else None
+
+    def revalidate(self, path, stat):
+        """内容哈希未变（如仅被touch）时沿用缓存结果并刷新大小和修改时间"""
+        row = self.rows[path]
+        row['size'], row['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        self.updates.append((path, row))
+        self.hits += 1
+        return self.result(row)
+
+    def store(self, path, stat, result):
+        """记录新的扫描结果，在save时统一写入"""
+        row = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': result['sha256'],
+            'prefiltered': result['prefiltered'],
+            'findings': json.dumps({'javax': result['javax'], 'deprecated': result['deprecated']})
+        }
+        self.rows[path] = row
+        self.updates.append((path, row))
+
+    def result(self, row):
+        findings = json.loads(row['findings'])
+        return {
+            'sha256': row['sha256'],
+            'prefiltered': row['prefiltered'],
+            'javax': findings['javax'],
+            'deprecated': findings['deprecated']
+        }
+
+    def save(self, seen_paths, baseline_commit=None):
+        """单个事务内写入本次变化的记录，并删除已不存在的文件
+
+        baseline_commit为本次覆盖了项目全部Java文件时的HEAD提交；为None时（如抽样运行）清除基线，
+        下次--since运行退化为全量分析。
+        """
+        removed = [(path,) for path in self.rows if path not in seen_paths]
+        with self.conn:
+            if baseline_commit:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('baseline_commit', ?)",
+                                  (baseline_commit,))
+            else:
+                self.conn.execute("DELETE FROM meta WHERE key = 'baseline_commit'")
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, prefiltered, findings) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(path, row['size'], row['mtime_ns'], row['sha256'], int(row['prefiltered']), row['findings'])
+                 for path, row in self.updates])
+            self.conn.executemany('DELETE FROM files WHERE path = ?', removed)
+        for (path,) in removed:
+            del self.rows[path]
+        self.updates = []
+        self.baseline_commit = baseline_commit
+
+    def close(self):
+        self.conn.close()
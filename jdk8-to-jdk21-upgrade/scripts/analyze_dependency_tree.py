@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Maven依赖树分析脚本
+流式解析 mvn dependency:tree 的文本输出（含Maven日志前缀、多模块）以及 -DoutputType=dot/json 输出，
+构建紧凑的依赖图，找出同一模块中javax与jakarta命名空间混用的同一API（如javax.servlet-api与
+jakarta.servlet-api 6.x），给出每个构件的完整引入路径和需要添加的<exclusion>。
+解析结果按依赖树文件内容的哈希缓存，依赖未变化时重复验证无需重新解析
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+from array import array
+from pathlib import Path
+from datetime import datetime
+from collections import namedtuple
+
+from dependency_catalog import CATALOG_FILE, version_key
+from upgrade_cache import get_cache_dir
+
+# 分析逻辑版本，变化时旧缓存自动失效
+ANALYZER_VERSION = 1
+
+FORMATS = ('text', 'dot', 'json')
+
+# Maven日志行前缀，如"[INFO] "
+LOG_PREFIX = re.compile(r'^\[(?:INFO|WARNING|WARN|ERROR|DEBUG)\] ?')
+
+# 根构件坐标 groupId:artifactId:type[:classifier]:version，子节点额外带scope
+COORDINATE = re.compile(r'^[\w.\-]+(?::[\w.\-]+){3,5}$')
+
+DOT_GRAPH = re.compile(r'digraph\s+"([^"]+)"')
+DOT_EDGE = re.compile(r'"([^"]+)"\s*->\s*"([^"]+)"')
+
+# 文本树中每层缩进3个字符："+- "、"\- "、"|  "、"   "
+INDENT = 3
+
+Artifact = namedtuple('Artifact', 'group_id artifact_id type classifier version scope')
+
+
+def parse_coordinate(text, root=False):
+    """解析依赖树中的坐标，格式不符时返回None"""
+    parts = text.split(':')
+    scope = ''
+    if not root:
+        if len(parts) not in (5, 6):
+            return None
+        scope = parts.pop()
+    if len(parts) == 4:
+        group_id, artifact_id, packaging, version = parts
+        classifier = ''
+    elif len(parts) == 5:
+        group_id, artifact_id, packaging, classifier, version = parts
+    else:
+        return None
+    return Artifact(group_id, artifact_id, packaging, classifier, version, scope)
+
+
+def artifact_label(artifact):
+    return f'{artifact.group_id}:{artifact.artifact_id}:{artifact.version}'
+
+
+class DependencyGraph:
+    """依赖树的紧凑表示
+
+    构件按坐标驻留为整数编号；树中每个出现位置只保存构件编号和父位置（根为-1），
+    引入路径沿父位置回溯得到，不保存任何子节点列表。
+    """
+
+    def __init__(self):
+        self.artifacts = []
+        self.index = {}
+        self.nodes = array('l')
+        self.parents = array('l')
+        self.roots = []
+
+    def add(self, artifact, parent=-1):
+        artifact_index = self.index.get(artifact)
+        if artifact_index is None:
+            artifact_index = self.index[artifact] = len(self.artifacts)
+            self.artifacts.append(artifact)
+        node = len(self.nodes)
+        self.nodes.append(artifact_index)
+        self.parents.append(parent)
+        if parent == -1:
+            self.roots.append(node)
+        return node
+
+    def artifact(self, node):
+        return self.artifacts[self.nodes[node]]
+
+    def path(self, node):
+        """从模块根到该位置的构件列表"""
+        path = []
+        while node != -1:
+            path.append(self.artifact(node))
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+    def module_of(self):
+        """各出现位置所属的模块根（父位置总在子位置之前，一次正序遍历即可）"""
+        modules = array('l', self.nodes)
+        for node, parent in enumerate(self.parents):
+            modules[node] = node if parent == -1 else modules[parent]
+        return modules
+
+
+def strip_log_prefix(line):
+    return LOG_PREFIX.sub('', line.rstrip('\r\n'), count=1)
+
+
+def parse_text(lines, graph):
+    """逐行解析文本格式依赖树，只保留按深度排列的祖先栈"""
+    stack = []
+    for line in lines:
+        line = strip_log_prefix(line)
+        marker = line.find('- ')
+        branch = (marker > 0 and line[marker - 1] in '+\\' and (marker - 1) % INDENT == 0
+                  and not line[:marker - 1].strip('| '))
+        if branch:
+            depth = (marker - 1) // INDENT + 1
+            if depth > len(stack):
+                continue
+            del stack[depth:]
+            # verbose模式下被省略的节点写在括号中，不在类路径上
+            token = line[marker + 2:].split(' ', 1)[0]
+            parent = stack[depth - 1]
+            artifact = None if token.startswith('(') or parent == -1 else parse_coordinate(token)
+            stack.append(graph.add(artifact, parent) if artifact is not None else -1)
+        elif COORDINATE.match(line):
+            artifact = parse_coordinate(line, root=True)
+            stack = [graph.add(artifact)] if artifact is not None else []
+        else:
+            stack = []
+
+
+def parse_dot(lines, graph):
+    """逐行解析dot格式依赖图（每个模块一个digraph）"""
+    labels = {}
+    for line in lines:
+        line = strip_log_prefix(line)
+        match = DOT_GRAPH.search(line)
+        if match:
+            artifact = parse_coordinate(match.group(1), root=True)
+            labels = {match.group(1): graph.add(artifact)} if artifact is not None else {}
+            continue
+        for parent_label, child_label in DOT_EDGE.findall(line):
+            parent = labels.get(parent_label)
+            artifact = parse_coordinate(child_label)
+            if parent is not None and artifact is not None:
+                labels[child_label] = graph.add(artifact, parent)
+
+
+def json_node(obj):
+    """object_hook：解码时立即把依赖对象压缩为(构件, 子节点)，不保留原始字典"""
+    if 'artifactId' not in obj:
+        return obj
+    artifact = Artifact(obj.get('groupId', ''), obj['artifactId'], obj.get('type', 'jar'),
+                        obj.get('classifier', ''), obj.get('version', ''), obj.get('scope', ''))
+    return artifact, obj.get('children', [])
+
+
+def parse_json(lines, graph):
+    """解析JSON格式依赖树（多模块时为多个顺序排列的JSON对象）"""
+    text = ''.join(strip_log_prefix(line) + '\n' for line in lines)
+    decoder = json.JSONDecoder(object_hook=json_node)
+    position = text.find('{')
+    while position != -1:
+        try:
+            tree, end = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            position = text.find('{', position + 1)
+            continue
+        if isinstance(tree, tuple):
+            pending = [(tree, -1)]
+            while pending:
+                (artifact, children), parent = pending.pop()
+                node = graph.add(artifact, parent)
+                pending.extend((child, node) for child in reversed(children) if isinstance(child, tuple))
+        position = text.find('{', end)
+
+
+PARSERS = {'text': parse_text, 'dot': parse_dot, 'json': parse_json}
+
+
+def detect_format(path):
+    """按开头的内容判断依赖树格式"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = strip_log_prefix(line).strip()
+            if line.startswith('digraph'):
+                return 'dot'
+            if line.startswith('{'):
+                return 'json'
+            if COORDINATE.match(line):
+                return 'text'
+    return 'text'
+
+
+def parse_tree(path, tree_format=None):
+    """流式解析依赖树文件，返回(依赖图, 格式)"""
+    tree_format = tree_format or detect_format(path)
+    graph = DependencyGraph()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        PARSERS[tree_format](f, graph)
+    return graph, tree_format
+
+
+class NamespaceRules:
+    """由dependency_versions.json的jakarta_ee部分构建的构件→(API, 命名空间)索引"""
+
+    def __init__(self, jakarta_ee):
+        self.apis = jakarta_ee
+        self.exact = {}
+        for api, info in jakarta_ee.items():
+            for coordinate in info.get('javax_artifacts', []):
+                self.exact[tuple(coordinate.split(':', 1))] = (api, None)
+            for coordinate in info.get('jakarta_artifacts', []):
+                self.exact[tuple(coordinate.split(':', 1))] = (api, version_key(info['jakarta_namespace_since']))
+
+    def classify(self, artifact):
+        """返回(API, 'javax'|'jakarta')，不是Java EE/Jakarta EE API构件时返回None"""
+        rule = self.exact.get((artifact.group_id, artifact.artifact_id)) or self.exact.get((artifact.group_id, '*'))
+        if rule is None:
+            return None
+        api, since = rule
+        # jakarta.*构件的早期版本（如jakarta.servlet-api 4.x）仍使用javax包
+        if since is not None and version_key(artifact.version) >= since:
+            return api, 'jakarta'
+        return api, 'javax'
+
+    def replacement(self, api):
+        info = self.apis[api]
+        return f"{info['groupId_new']}:{info['artifactId']}:{info['jakarta_version']}"
+
+
+def load_namespace_rules(catalog_file=CATALOG_FILE):
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        return NamespaceRules(json.load(f).get('jakarta_ee', {}))
+
+
+def exclusion_xml(dependency, excluded):
+    """在引入该构件的直接依赖上添加的<exclusion>配置"""
+    return (f"<dependency>\n"
+            f"    <groupId>{dependency.group_id}</groupId>\n"
+            f"    <artifactId>{dependency.artifact_id}</artifactId>\n"
+            f"    <exclusions>\n"
+            f"        <exclusion>\n"
+            f"            <groupId>{excluded.group_id}</groupId>\n"
+            f"            <artifactId>{excluded.artifact_id}</artifactId>\n"
+            f"        </exclusion>\n"
+            f"    </exclusions>\n"
+            f"</dependency>")
+
+
+def suggestion_for(path, replacement):
+    """javax构件的处理建议：直接依赖替换为jakarta构件，传递依赖在引入它的直接依赖上排除"""
+    artifact = path[-1]
+    coordinate = f'{artifact.group_id}:{artifact.artifact_id}'
+    if len(path) <= 2:
+        return {'action': 'replace', 'dependency': coordinate, 'replacement': replacement}
+    direct = path[1]
+    return {'action': 'exclude', 'dependency': f'{direct.group_id}:{direct.artifact_id}',
+            'exclusion': coordinate, 'xml': exclusion_xml(direct, artifact)}
+
+
+def analyze_graph(graph, rules):
+    """按模块、按API归类javax/jakarta构件：两种命名空间并存为冲突，只有javax为遗留依赖"""
+    classified = [rules.classify(artifact) for artifact in graph.artifacts]
+    modules = graph.module_of()
+
+    providers = {}
+    for node, artifact_index in enumerate(graph.nodes):
+        rule = classified[artifact_index]
+        if rule is None:
+            continue
+        api, namespace = rule
+        module = providers.setdefault(modules[node], {})
+        module.setdefault(api, {'javax': [], 'jakarta': []})[namespace].append(node)
+
+    conflicts = []
+    legacy = []
+    for root, apis in providers.items():
+        for api, found in apis.items():
+            if not found['javax']:
+                continue
+            replacement = rules.replacement(api)
+            entry = {
+                'module': artifact_label(graph.artifact(root)),
+                'api': api,
+                'javax': [occurrence(graph, node, replacement) for node in found['javax']],
+                'jakarta': [occurrence(graph, node) for node in found['jakarta']]
+            }
+            (conflicts if found['jakarta'] else legacy).append(entry)
+
+    return {
+        'stats': {'modules': len(graph.roots), 'nodes': len(graph.nodes), 'artifacts': len(graph.artifacts)},
+        'modules': [artifact_label(graph.artifact(root)) for root in graph.roots],
+        'conflicts': conflicts,
+        'javax_dependencies': legacy
+    }
+
+
+def occurrence(graph, node, replacement=None):
+    path = graph.path(node)
+    artifact = path[-1]
+    result = {'artifact': artifact_label(artifact), 'scope': artifact.scope,
+              'path': [artifact_label(item) for item in path]}
+    if replacement is not None:
+        result['suggestion'] = suggestion_for(path, replacement)
+    return result
+
+
+class TreeCache:
+    """依赖树分析结果缓存，以树文件内容、规则文件和分析逻辑版本的哈希为键"""
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else get_cache_dir() / 'dependency_trees.sqlite'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS trees (digest TEXT PRIMARY KEY, result TEXT NOT NULL)')
+
+    def get(self, digest):
+        row = self.conn.execute('SELECT result FROM trees WHERE digest = ?', (digest,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, digest, result):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO trees (digest, result) VALUES (?, ?)',
+                              (digest, json.dumps(result, ensure_ascii=False)))
+
+    def close(self):
+        self.conn.close()
+
+
+def tree_digest(path, tree_format):
+    """依赖树文件内容哈希（同时覆盖规则文件、指定的格式和分析逻辑版本）"""
+    digest = hashlib.sha256(f'{ANALYZER_VERSION}\0{tree_format or ""}\0'.encode('utf-8'))
+    digest.update(Path(CATALOG_FILE).read_bytes())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analyze_tree(path, tree_format=None, use_cache=True):
+    """分析依赖树文件，依赖树未变化时直接返回缓存结果"""
+    started = time.perf_counter()
+    digest = tree_digest(path, tree_format)
+    cache = None
+    if use_cache:
+        try:
+            cache = TreeCache()
+            cached = cache.get(digest)
+        except sqlite3.Error as e:
+            print(f"  ⚠ 依赖树缓存不可用: {e}")
+            cache, cached = None, None
+        if cached is not None:
+            cache.close()
+            cached['stats']['seconds'] = round(time.perf_counter() - started, 3)
+            return {**cached, 'cached': True}
+
+    graph, detected = parse_tree(path, tree_format)
+    result = {'format': detected, 'digest': digest, **analyze_graph(graph, load_namespace_rules())}
+    result['stats']['seconds'] = round(time.perf_counter() - started, 3)
+    if cache is not None:
+        try:
+            cache.put(digest, result)
+        except sqlite3.Error as e:
+            print(f"  ⚠ 写入依赖树缓存失败: {e}")
+        cache.close()
+    return {**result, 'cached': False}
+
+
+def print_result(result):
+    stats = result['stats']
+    source = '缓存' if result['cached'] else f"{result['format']}格式"
+    print(f"  ✓ {stats['modules']}个模块, {stats['nodes']}个依赖节点, {stats['artifacts']}个构件 "
+          f"({source}, {stats['seconds']}s)")
+
+    if not result['conflicts'] and not result['javax_dependencies']:
+        print("  ✓ 未发现javax依赖")
+        return
+
+    for title, entries in (('javax/jakarta命名空间冲突', result['conflicts']),
+                           ('仍使用javax命名空间的依赖', result['javax_dependencies'])):
+        if not entries:
+            continue
+        print(f"\n  ⚠ {title}: {len(entries)}处")
+        for entry in entries:
+            print(f"    [{entry['module']}] {entry['api']}")
+            for item in entry['jakarta']:
+                print(f"      jakarta: {' → '.join(item['path'][1:])}")
+            for item in entry['javax']:
+                print(f"      javax:   {' → '.join(item['path'][1:])}")
+
+    # 同一条排除建议只输出一次
+    suggestions = {}
+    for entry in result['conflicts'] + result['javax_dependencies']:
+        for item in entry['javax']:
+            suggestion = item['suggestion']
+            suggestions.setdefault((suggestion['dependency'], suggestion.get('exclusion')), suggestion)
+    print("\n  建议:")
+    for suggestion in suggestions.values():
+        if suggestion['action'] == 'replace':
+            print(f"    - 将直接依赖 {suggestion['dependency']} 替换为 {suggestion['replacement']}")
+        else:
+            print(f"    - 在 {suggestion['dependency']} 上排除 {suggestion['exclusion']}:")
+            for line in suggestion['xml'].splitlines():
+                print(f"        {line}")
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python analyze_dependency_tree.py <dependency-tree.txt> [--format text|dot|json] [--output PATH] [--no-cache]")
+        print("\n选项:")
+        print("  --format FMT     依赖树格式（默认按内容自动识别）：text为mvn dependency:tree的默认输出，"
+              "dot/json对应-DoutputType=dot/json")
+        print("  --output PATH    结果文件（默认为依赖树文件所在目录下的dependency_analysis.json）")
+        print("  --no-cache       不使用依赖树分析缓存")
+        sys.exit(1)
+
+    tree_path = Path(sys.argv[1])
+    if not tree_path.is_file():
+        print(f"错误: 依赖树文件不存在: {tree_path}")
+        sys.exit(1)
+    tree_format = get_option_value('--format')
+    if tree_format is not None and tree_format not in FORMATS:
+        print(f"错误: --format 参数必须为{'/'.join(FORMATS)}之一")
+        sys.exit(1)
+
+    print(f"分析依赖树: {tree_path}")
+    result = analyze_tree(tree_path, tree_format, use_cache='--no-cache' not in sys.argv)
+    print_result(result)
+
+    output = Path(get_option_value('--output') or tree_path.parent / 'dependency_analysis.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'analysis_time': datetime.now().isoformat(), 'tree_file': str(tree_path), **result},
+                  f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存: {output}")
+
+if __name__ == '__main__':
+    main()
@@ -7,49 +7,190 @@ JDK 8 to JDK 21 项目分析脚本
 import os
 import sys
 import re
+import io
 import json
+import random
+import hashlib
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
 import xml.etree.ElementTree as ET
 
+from analysis_cache import AnalysisCache
+from api_rules import load_api_rules
+from git_changes import changed_files, head_commit, is_ancestor
+from git_tree import GitTreeSource
+from instrumentation import PhaseRecorder, profile_session
+from jakarta_mapping import load_mapping_table
+from java_source import MIGRATION_MARKERS, contains_any, read_header, skip_ratio, source_buffer
+from pom_model import PomModel
+from scan_classes import ClassScanner, class_directories, class_files, summarize as summarize_classes
+from scan_jars import JarScanner, project_archives, summarize as summarize_jars
+from project_walker import DEFAULT_EXCLUDES, ProjectFiles, walk_project
+from sampling import StratifiedSample
+
 class ProjectAnalyzer:
-    def __init__(self, project_path):
+    def __init__(self, project_path, excludes=None, respect_gitignore=True, full_body=False, use_cache=True,
+                 since=None, rev=None, jsonl_path=None, sample_size=None, seed=None, scan_jars=False,
+                 scan_classes=False):
         self.project_path = Path(project_path)
+        self.jsonl_path = jsonl_path
+        self.full_body = full_body
+        self.use_cache = use_cache
+        self.since = since
+        self.scan_jars = scan_jars
+        self.scan_classes = scan_classes
+        
+        # 抽样模式：只扫描按模块分层抽取的文件并外推结果；缓存保存时会清理未扫描的文件记录，此模式下不使用
+        self.sample_size = sample_size
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        if sample_size is not None:
+            self.use_cache = False
+        
+        # --rev模式：直接读取指定提交中的文件，不检出、不写工作区；缓存按工作区文件状态记录，此模式下不使用
+        self.source = None
+        if rev is not None:
+            self.source = GitTreeSource(self.project_path, rev)
+            self.project_path = self.source.project_path
+            self.use_cache = False
+        self.changed_paths = None
+        self.cache = None
+        self.rule_version = None
+        self.excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+        self.respect_gitignore = respect_gitignore
+        self.files = None
+        self.recorder = PhaseRecorder()
+        self.pom_model = PomModel(self.source, self.recorder)
+        self.poms = None
         self.report = {
             'project_name': self.project_path.name,
             'analysis_time': datetime.now().isoformat(),
             'structure': {},
             'versions': {},
+            'module_versions': {},
             'javax_usage': defaultdict(int),
             'deprecated_apis': [],
+            'scan_stats': {},
             'risks': [],
             'workload_estimate': {}
         }
+        if self.source is not None:
+            self.report['revision'] = {'rev': rev, 'commit': self.source.commit}
     
     def analyze(self):
         """执行完整分析"""
         print(f"正在分析项目: {self.project_path}")
+        if self.source is not None:
+            print(f"分析提交: {self.source.rev} ({self.source.commit[:12]})")
         print("=" * 60)
         
-        self.analyze_structure()
-        self.analyze_pom()
-        self.analyze_java_files()
-        self.assess_risks()
-        self.estimate_workload()
-        
+        # 各阶段分别记录耗时、读取量和峰值内存
+        phases = [
+            ('collect', self.collect_files),
+            ('structure', self.analyze_structure),
+            ('pom', self.analyze_pom),
+            ('java_files', self.analyze_java_files),
+        ]
+        # 构建输出不在git提交中，--rev模式下不扫描依赖JAR和编译产物
+        if self.scan_jars and self.source is None:
+            phases.append(('jars', self.analyze_jars))
+        if self.scan_classes and self.source is None:
+            phases.append(('classes', self.analyze_classes))
+        phases += [
+            ('risks', self.assess_risks),
+            ('workload', self.estimate_workload),
+        ]
+        try:
+            for name, run_phase in phases:
+                with self.recorder.phase(name):
+                    run_phase()
+        finally:
+            if self.source is not None:
+                self.source.close()
+        
+        self.report['performance'] = self.recorder.to_dict()
+        self.print_performance()
         return self.report
     
+    def print_performance(self):
+        """输出各阶段耗时"""
+        print("\n  各阶段耗时:")
+        for phase in self.report['performance']['phases']:
+            print(f"    - {phase['name']:<11} {phase['wall_seconds']:.3f}s (CPU {phase['cpu_seconds']:.3f}s, "
+                  f"读取 {phase['files_opened']}个文件/{phase['bytes_read'] / 1024:.0f} KB, "
+                  f"跳过 {phase['files_skipped']}个)")
+    
+    def collect_files(self):
+        """单次遍历项目目录，收集各分析阶段共享的文件清单"""
+        if self.files is None and self.source is not None:
+            self.files = self.source.project_files(self.excludes)
+        if self.files is None and self.since is not None:
+            self.files = self.collect_changed_files()
+        if self.files is None:
+            self.files = walk_project(self.project_path, self.excludes, self.respect_gitignore)
+        return self.files
+    
+    def collect_changed_files(self):
+        """--since模式：以上次完整分析的缓存结果为基线，只需重新扫描变更文件
+        
+        变更文件按基线记录的提交计算（而不是REV），覆盖上次分析之后、REV之前的修改和新增；
+        基线中其余文件仍逐个检查大小和修改时间，覆盖当时未提交、之后又被还原的修改。
+        Java文件清单 = 基线文件 - 已删除文件 + 变更文件，POM从根pom.xml的<modules>解析，
+        无需遍历项目目录。没有可用基线或基线提交不是REV的祖先时返回None，退化为全量分析。
+        """
+        self.prepare_rules()
+        cache = self.open_cache()
+        if cache is None or not cache.rows or cache.baseline_commit is None:
+            print("  ⚠ 没有可用的分析基线（需先完成一次启用缓存的全量分析），执行全量分析")
+            return None
+        if not is_ancestor(self.project_path, cache.baseline_commit, self.since):
+            print(f"  ⚠ 分析基线 {cache.baseline_commit[:12]} 不是 {self.since} 的祖先，执行全量分析")
+            return None
+        
+        changes = changed_files(self.project_path, cache.baseline_commit, excludes=self.excludes)
+        root = self.project_path.resolve()
+        self.changed_paths = {path.relative_to(root).as_posix() for path in changes.changed}
+        deleted_paths = {path.relative_to(root).as_posix() for path in changes.deleted}
+        
+        files = ProjectFiles(self.project_path)
+        java_paths = (set(cache.rows) - deleted_paths) | self.changed_paths
+        files.java_files = [self.project_path / path for path in sorted(java_paths)]
+        
+        root_pom = self.project_path / 'pom.xml'
+        if root_pom.exists():
+            # 与全量遍历一致，只收集项目目录内的模块（<module>可以指向../sibling）
+            files.pom_files = [self.project_path / pom.path.relative_to(root)
+                               for pom in self.pom_model.load_reactor(root_pom)
+                               if root in pom.path.parents]
+        
+        self.report['scan_stats']['since'] = self.since
+        self.report['scan_stats']['baseline_commit'] = cache.baseline_commit
+        print(f"  ✓ 自分析基线 {cache.baseline_commit[:12]} 以来变更: {len(changes.changed)}个Java文件，"
+              f"删除: {len(changes.deleted)}个")
+        return files
+    
+    def load_poms(self):
+        """通过共享的POM模型解析全部pom.xml，每个文件只解析一次"""
+        if self.poms is None:
+            self.poms = []
+            for pom_path in self.collect_files().pom_files:
+                try:
+                    self.poms.append(self.pom_model.load(pom_path))
+                except (ET.ParseError, OSError) as e:
+                    print(f"  ⚠ 解析失败: {pom_path} ({e})")
+        return self.poms
+    
     def analyze_structure(self):
         """分析项目结构"""
         print("\n[1/5] 分析项目结构...")
         
-        pom_files = list(self.project_path.rglob('pom.xml'))
-        java_files = list(self.project_path.rglob('*.java'))
+        files = self.collect_files()
+        pom_files = files.pom_files
+        java_files = files.java_files
         
         # 判断项目类型
         is_multi_module = len(pom_files) > 1
-        has_spring_boot = any('spring-boot' in pom.read_text() for pom in pom_files)
+        has_spring_boot = any(self.pom_model.uses_spring_boot(pom) for pom in self.load_poms())
         
         self.report['structure'] = {
             'type': 'multi-module' if is_multi_module else 'single-module',
@@ -68,42 +209,31 @@ class ProjectAnalyzer:
         print("\n[2/5] 分析Maven配置...")
         
         pom_path = self.project_path / 'pom.xml'
-        if not pom_path.exists():
+        if not self.pom_model.source.is_file(pom_path):
             print("  ⚠ 根目录未找到pom.xml")
             return
         
         try:
-            tree = ET.parse(pom_path)
-            root = tree.getroot()
-            ns = {'m': 'http://maven.apache.org/POM/4.0.0'}
-            
-            # 提取版本信息
-            versions = {}
-            
-            # Java版本
-            java_version = root.find('.//m:properties/m:java.version', ns)
-            if java_version is not None:
-                versions['java'] = java_version.text
-            
-            # Spring Boot版本
-            parent = root.find('.//m:parent', ns)
-            if parent is not None:
-                artifact_id = parent.find('m:artifactId', ns)
-                version = parent.find('m:version', ns)
-                if artifact_id is not None and 'spring-boot' in artifact_id.text:
-                    versions['spring_boot'] = version.text if version is not None else 'unknown'
-            
-            # Spring Cloud版本
-            spring_cloud_version = root.find('.//m:properties/m:spring-cloud.version', ns)
-            if spring_cloud_version is not None:
-                versions['spring_cloud'] = spring_cloud_version.text
-            
+            # 版本取继承和属性展开后的有效值，根POM与各模块共用同一份解析结果
+            root_pom = self.pom_model.load(pom_path)
+            versions = dict(self.pom_model.effective_versions(root_pom))
             self.report['versions'] = versions
             
+            for pom in self.load_poms():
+                if pom is root_pom:
+                    continue
+                module = str(pom.path.parent.relative_to(self.project_path.resolve()))
+                self.report['module_versions'][module] = self.pom_model.effective_versions(pom)
+            
             print(f"  ✓ JDK版本: {versions.get('java', '未指定')}")
             print(f"  ✓ Spring Boot: {versions.get('spring_boot', '未使用')}")
             print(f"  ✓ Spring Cloud: {versions.get('spring_cloud', '未使用')}")
             
+            # 子模块单独声明的版本与根POM不一致时提示
+            for module, module_versions in self.report['module_versions'].items():
+                if module_versions != versions:
+                    print(f"  ⚠ 模块 {module} 的有效版本与根POM不同: {module_versions}")
+            
         except Exception as e:
             print(f"  ✗ 解析pom.xml失败: {e}")
     
@@ -111,59 +241,324 @@ class ProjectAnalyzer:
         """分析Java源代码"""
         print("\n[3/5] 分析Java源代码...")
         
-        java_files = list(self.project_path.rglob('*.java'))
-        
-        # javax命名空间使用统计
-        javax_patterns = {
-            'javax.servlet': r'import\s+javax\.servlet',
-            'javax.persistence': r'import\s+javax\.persistence',
-            'javax.validation': r'import\s+javax\.validation',
-            'javax.annotation': r'import\s+javax\.annotation',
-            'javax.transaction': r'import\s+javax\.transaction',
-            'javax.ws.rs': r'import\s+javax\.ws\.rs',
-        }
-        
-        # 过时API使用检测
-        deprecated_patterns = {
-            'sun.misc.Unsafe': r'import\s+sun\.misc\.Unsafe',
-            'com.sun.*': r'import\s+com\.sun\.',
-        }
-        
-        javax_files = defaultdict(set)
-        deprecated_files = defaultdict(set)
+        files = self.collect_files()
+        java_files = files.java_files
+        self.prepare_rules()
+        cache = self.open_cache()
+        
+        sample = None
+        scan_entries = [(None, java_file) for java_file in java_files]
+        if self.sample_size is not None:
+            sample = StratifiedSample(java_files, files.pom_files, self.project_path, self.sample_size, self.seed)
+            scan_entries = sample.files
+            print(f"  ✓ 分层抽样: {len(scan_entries)}/{len(java_files)}个文件，"
+                  f"{len(sample.population)}个模块 (种子 {self.seed})")
+        
+        # 流式模式下每条发现立即写出一行JSON，内存中只保留计数
+        stream = open(self.jsonl_path, 'w', encoding='utf-8', buffering=1) if self.jsonl_path else None
+        deprecated_counts = Counter()
+        deprecated_files = None if stream else defaultdict(list)
+        prefiltered = 0
+        seen_paths = set()
+        # 覆盖全部Java文件的运行记录扫描开始时的HEAD，作为后续--since的基线
+        baseline_commit = None
+        if cache is not None and sample is None:
+            baseline_commit = head_commit(self.project_path)
         
-        for java_file in java_files:
-            try:
-                content = java_file.read_text(encoding='utf-8')
+        try:
+            for module, java_file in scan_entries:
+                relative_path = java_file.relative_to(self.project_path).as_posix()
+                seen_paths.add(relative_path)
+                try:
+                    result = self.cached_scan(java_file, relative_path, cache)
+                except FileNotFoundError:
+                    # 基线中的未跟踪文件已被删除
+                    seen_paths.discard(relative_path)
+                    continue
+                except Exception as e:
+                    print(f"  ⚠ 读取文件失败: {java_file} - {e}")
+                    continue
+                
+                # 嵌套规则（javax.servlet与javax.servlet.http）归并到同一API族，每个文件每个族计一次
+                families = sorted({self.mapping_table.shortest_prefix(pkg) for pkg in result['javax']})
                 
-                # 检测javax使用
-                for pkg, pattern in javax_patterns.items():
-                    if re.search(pattern, content):
-                        self.report['javax_usage'][pkg] += 1
-                        javax_files[pkg].add(str(java_file.relative_to(self.project_path)))
+                if sample is not None:
+                    keys = [('javax', pkg) for pkg in families]
+                    keys += [('deprecated', api) for api in result['deprecated']]
+                    sample.record(module, keys, len(families))
                 
-                # 检测过时API
-                for api, pattern in deprecated_patterns.items():
-                    matches = re.findall(pattern, content)
-                    if matches:
-                        deprecated_files[api].add(str(java_file.relative_to(self.project_path)))
-                        
+                if result['prefiltered']:
+                    prefiltered += 1
+                    continue
+                
+                for pkg in families:
+                    self.report['javax_usage'][pkg] += 1
+                    if stream:
+                        self.write_finding(stream, {'type': 'javax', 'file': relative_path, 'package': pkg})
+                for api, lines in result['deprecated'].items():
+                    deprecated_counts[api] += 1
+                    if stream:
+                        self.write_finding(stream, {'type': 'deprecated_api', 'file': relative_path,
+                                                    'api': api, 'lines': lines})
+                    else:
+                        deprecated_files[api].append({'file': relative_path, 'lines': lines})
+            
+            if stream:
+                self.write_finding(stream, {'type': 'summary', 'scanned_files': len(scan_entries),
+                                            'javax_usage': dict(self.report['javax_usage']),
+                                            'deprecated_apis': dict(deprecated_counts)})
+        finally:
+            if stream:
+                stream.close()
+        
+        cache_hits = 0
+        if cache is not None:
+            cache_hits = cache.hits
+            try:
+                cache.save(seen_paths, baseline_commit)
             except Exception as e:
-                print(f"  ⚠ 读取文件失败: {java_file} - {e}")
+                print(f"  ⚠ 写入分析缓存失败: {e}")
+            cache.close()
+            self.cache = None
+        
+        if sample is not None:
+            deprecated_counts = self.extrapolate(sample, deprecated_counts)
+        
+        self.report['scan_stats'].update({
+            'scanned_files': len(scan_entries),
+            'prefiltered_files': prefiltered,
+            'skip_ratio': skip_ratio(prefiltered, len(scan_entries)),
+            'cache_hits': cache_hits,
+            'mode': 'full_body' if self.full_body else 'header'
+        })
+        print(f"  ✓ 预过滤跳过: {prefiltered}/{len(scan_entries)}个文件 "
+              f"(跳过比例 {self.report['scan_stats']['skip_ratio']:.1%})")
+        if cache is not None:
+            print(f"  ✓ 缓存命中: {cache_hits}/{len(scan_entries)}个文件")
         
         # 输出统计
-        print(f"\n  javax命名空间使用统计:")
+        estimates = self.report.get('sampling', {})
+        print(f"\n  javax命名空间使用统计{'（抽样估算）' if sample is not None else ''}:")
         for pkg, count in self.report['javax_usage'].items():
-            print(f"    - {pkg}: {count}个文件")
+            print(f"    - {pkg}: {count}个文件{self.format_range(estimates.get('javax_usage', {}).get(pkg))}")
         
-        if deprecated_files:
+        if deprecated_counts:
             print(f"\n  ⚠ 发现过时API使用:")
-            for api, files in deprecated_files.items():
-                print(f"    - {api}: {len(files)}个文件")
-                self.report['deprecated_apis'].append({
+            for api, count in deprecated_counts.items():
+                rule = self.api_rules.by_api[api]
+                print(f"    - [{rule['severity']}] {api}: {count}个文件"
+                      f"{self.format_range(estimates.get('deprecated_apis', {}).get(api))}")
+                api_info = {
                     'api': api,
-                    'files': list(files)
-                })
+                    'severity': rule['severity'],
+                    'description': rule['description'],
+                    'replacement': rule['replacement'],
+                    'file_count': count
+                }
+                if deprecated_files is not None:
+                    api_info['files'] = deprecated_files[api]
+                self.report['deprecated_apis'].append(api_info)
+        
+        if stream:
+            print(f"\n  ✓ 逐文件发现已写入: {self.jsonl_path}")
+    
+    def analyze_jars(self):
+        """扫描构建输出中的JAR/WAR，统计其中包含的javax类（只读取中央目录）"""
+        print("\n[3/5] 扫描依赖JAR...")
+        
+        archives = project_archives(self.project_path, self.excludes)
+        if not archives:
+            print("  ⚠ 未找到构建输出（请先执行mvn package）")
+            return
+        
+        scanner = JarScanner(jobs=os.cpu_count() or 1, use_cache=self.use_cache)
+        results = scanner.scan(archives)
+        self.recorder.add(files_opened=scanner.stats['parsed'] + scanner.stats['digest_hits'],
+                          files_skipped=scanner.stats['cache_hits'])
+        summary = summarize_jars(results)
+        self.report['jar_scan'] = {
+            'scan_stats': scanner.stats,
+            'javax_packages': summary['javax_packages'],
+            'archives_with_javax': [{'path': str(Path(archive['path']).relative_to(self.project_path)),
+                                     'javax_packages': archive['javax_packages']}
+                                    for archive in summary['archives_with_javax']]
+        }
+        
+        print(f"  ✓ 归档: {len(archives)}个 (缓存命中 {scanner.stats['cache_hits'] + scanner.stats['digest_hits']})")
+        for archive in self.report['jar_scan']['archives_with_javax']:
+            print(f"    - {archive['path']}: {', '.join(archive['javax_packages'])}")
+    
+    def analyze_classes(self):
+        """解析target/classes下的class文件常量池，找出源码扫描看不到的javax/内部API引用（如生成代码）"""
+        print("\n[3/5] 扫描编译产物...")
+        
+        files = class_files(class_directories(self.project_path, self.excludes))
+        if not files:
+            print("  ⚠ 未找到target/classes（请先执行mvn compile）")
+            return
+        
+        scanner = ClassScanner(jobs=os.cpu_count() or 1)
+        records, errors = scanner.scan(files)
+        self.recorder.add(bytes_read=scanner.stats['bytes_read'], files_opened=scanner.stats['classes'],
+                          files_skipped=scanner.stats['classes'] - scanner.stats['parsed'])
+        summary = summarize_classes(records, errors, self.project_path)
+        
+        # 字节码中引用、但源码扫描未发现的javax包（通常来自Lombok、MapStruct等生成的代码）
+        mapping_table = load_mapping_table()
+        bytecode_only = sorted(
+            package for package, info in summary['packages'].items()
+            if info['jakarta'] and mapping_table.shortest_prefix(package) not in self.report['javax_usage'])
+        self.report['class_scan'] = {
+            'scan_stats': scanner.stats,
+            'packages': summary['packages'],
+            'members': summary['members'],
+            'bytecode_only_packages': bytecode_only,
+            'classes': [{'class': record['class'], 'source': record['source'], 'types': record['types']}
+                        for record in summary['classes']]
+        }
+        
+        print(f"  ✓ class文件: {scanner.stats['classes']}个 ({scanner.stats['classes_per_second']}个/秒)，"
+              f"{scanner.stats['classes_with_references']}个类引用了javax/内部API")
+        for package in bytecode_only:
+            print(f"    - {package}: 仅出现在字节码中")
+    
+    def extrapolate(self, sample, deprecated_counts):
+        """用分层估计量把样本计数外推到全项目，区间写入report['sampling']"""
+        javax_estimates = {pkg: sample.estimate_key(('javax', pkg)) for pkg in self.report['javax_usage']}
+        deprecated_estimates = {api: sample.estimate_key(('deprecated', api)) for api in deprecated_counts}
+        self.report['javax_usage'] = defaultdict(int, {pkg: estimate['estimate']
+                                                       for pkg, estimate in javax_estimates.items()})
+        self.report['sampling'] = {
+            **sample.summary(),
+            'javax_total': sample.estimate_values(),
+            'javax_usage': javax_estimates,
+            'deprecated_apis': deprecated_estimates
+        }
+        return Counter({api: estimate['estimate'] for api, estimate in deprecated_estimates.items()})
+    
+    def format_range(self, estimate):
+        """抽样估算的置信区间文本"""
+        if not estimate:
+            return ''
+        return f" [{estimate['low']}, {estimate['high']}]"
+    
+    def format_hours_range(self):
+        """抽样模式下工作量的置信区间文本"""
+        hours_range = self.report['workload_estimate'].get('estimated_hours_range')
+        if not hours_range:
+            return ''
+        return f"（{self.report['sampling']['confidence']:.0%}置信区间 {hours_range[0]}-{hours_range[1]}小时）"
+    
+    def write_finding(self, stream, record):
+        """写出一行JSON Lines记录"""
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def prepare_rules(self):
+        """编译本次分析使用的规则，并计算规则集版本用于缓存失效"""
+        if self.rule_version is not None:
+            return
+        
+        # javax命名空间使用统计：与迁移脚本共用映射表，匹配时记录命中的最具体规则，统计时归并到最上层规则
+        # 文件头模式只匹配import语句，全文模式同时匹配代码中的全限定名引用
+        mapping_table = self.mapping_table = load_mapping_table()
+        if self.full_body:
+            self.javax_pattern = mapping_table.reference_pattern
+            self.javax_group = 1
+        else:
+            self.javax_pattern = mapping_table.import_pattern
+            self.javax_group = 2
+        
+        # 过时/已移除API检测：规则文件中的全部规则合并为一个正则，单次扫描得到命中规则和行号
+        # 文件头模式下import类规则只匹配文件头，代码类规则（SecurityManager、Thread.stop、finalize等）
+        # 仍作用于全文，但只对含代码规则标记的文件执行；全文模式下全部规则作用于全文
+        self.api_rules = load_api_rules()
+        self.rule_matcher = self.api_rules.matcher(self.full_body)
+        self.code_matcher = None if self.full_body else self.api_rules.matcher(True, kinds=('code',))
+        self.code_markers = self.code_matcher.markers if self.code_matcher else ()
+        # 预过滤标记：javax引用（与迁移脚本相同）加上各规则的字面量标记
+        self.markers = MIGRATION_MARKERS + self.rule_matcher.markers
+        
+        rule_source = json.dumps([mapping_table.version, self.api_rules.version, self.full_body, 'body-code-rules'])
+        self.rule_version = hashlib.sha256(rule_source.encode('utf-8')).hexdigest()
+    
+    def open_cache(self):
+        """打开项目的持久化分析缓存，不可用时退化为全量扫描"""
+        if not self.use_cache or self.cache is not None:
+            return self.cache
+        try:
+            self.cache = AnalysisCache(self.project_path, self.rule_version)
+        except Exception as e:
+            print(f"  ⚠ 分析缓存不可用，执行全量扫描: {e}")
+        return self.cache
+    
+    def cached_scan(self, java_file, relative_path, cache):
+        """优先使用缓存结果：大小和修改时间未变直接复用，仅修改时间变化时按内容哈希确认"""
+        if cache is None:
+            return self.scan_java_file(java_file)
+        
+        # --since模式下git报告变更的文件不信任大小和修改时间，直接按内容哈希确认
+        stat = java_file.stat()
+        changed = self.changed_paths is not None and relative_path in self.changed_paths
+        result = None if changed else cache.lookup(relative_path, stat)
+        if result is not None:
+            self.recorder.add(files_skipped=1)
+            return result
+        
+        result = self.scan_java_file(java_file, cache.known_hash(relative_path))
+        if result is None:
+            return cache.revalidate(relative_path, stat)
+        cache.store(relative_path, stat, result)
+        return result
+    
+    def scan_java_file(self, java_file, known_hash=None):
+        """扫描单个文件，返回命中的javax规则和过时API；内容哈希等于known_hash时返回None
+        
+        两种模式都读取整个文件：文件头模式只在类型声明之前的import中统计javax和import类规则，
+        代码类规则作用于全文；全文模式下全部规则作用于全文。
+        规则均为ASCII，直接匹配原始字节，不依赖源文件编码。
+        """
+        if self.source is not None:
+            data = self.source.read_bytes(java_file)
+            self.recorder.add(files_opened=1, bytes_read=len(data))
+            if self.full_body:
+                return self.match_source(data, known_hash)
+            header, _ = read_header(io.BytesIO(data))
+            return self.match_source(header, known_hash, data)
+        
+        if self.full_body:
+            with source_buffer(java_file) as data:
+                self.recorder.add(files_opened=1, bytes_read=len(data))
+                return self.match_source(data, known_hash)
+        
+        with open(java_file, 'rb') as f:
+            header, declaration = read_header(f)
+            body = header + declaration + f.read()
+        self.recorder.add(files_opened=1, bytes_read=len(body))
+        return self.match_source(header, known_hash, body)
+    
+    def match_source(self, content, known_hash=None, body=None):
+        """对源码字节执行预过滤和规则匹配
+        
+        文件头模式下content为文件头、body为整个文件：内容哈希覆盖整个文件，
+        代码类规则只在body含其标记时执行。
+        """
+        hashed = content if body is None else body
+        content_hash = hashlib.sha256(hashed).hexdigest() if self.use_cache else None
+        if content_hash is not None and content_hash == known_hash:
+            return None
+        
+        result = {'sha256': content_hash, 'prefiltered': False, 'javax': [], 'deprecated': {}}
+        code_candidate = body is not None and contains_any(body, self.code_markers)
+        if not code_candidate and not contains_any(content, self.markers):
+            result['prefiltered'] = True
+            return result
+        
+        result['javax'] = sorted({match.group(self.javax_group).decode('ascii')
+                                  for match in self.javax_pattern.finditer(content)})
+        result['deprecated'] = self.rule_matcher.find(content)
+        if code_candidate:
+            result['deprecated'].update(self.code_matcher.find(body))
+        return result
     
     def assess_risks(self):
         """评估升级风险"""
@@ -208,16 +603,27 @@ class ProjectAnalyzer:
                 'impact': '需要少量代码迁移工作'
             })
         
-        # 风险4: 过时API
+        # 风险4: 过时API，等级取命中规则中最高的一级
         if self.report['deprecated_apis']:
+            severities = {api_info['severity'] for api_info in self.report['deprecated_apis']}
             risks.append({
-                'level': 'HIGH',
+                'level': next(level for level in ('HIGH', 'MEDIUM', 'LOW') if level in severities),
                 'item': '使用过时API',
-                'description': f"发现{len(self.report['deprecated_apis'])}种过时API使用",
+                'description': f"发现{len(self.report['deprecated_apis'])}种过时或已移除的API使用",
                 'impact': '需要手动修复，可能无自动替代方案'
             })
         
-        # 风险5: 多模块项目
+        # 风险5: 依赖JAR中打包了javax类
+        jar_archives = self.report.get('jar_scan', {}).get('archives_with_javax', [])
+        if jar_archives:
+            risks.append({
+                'level': 'MEDIUM',
+                'item': '依赖JAR包含javax类',
+                'description': f'{len(jar_archives)}个构建输出中的归档包含javax类',
+                'impact': '需要升级或排除这些依赖，否则会与jakarta命名空间混用'
+            })
+        
+        # 风险6: 多模块项目
         if self.report['structure']['type'] == 'multi-module':
             module_count = self.report['structure']['pom_count']
             risks.append({
@@ -239,6 +645,33 @@ class ProjectAnalyzer:
         """估算工作量"""
         print("\n[5/5] 估算工作量...")
         
+        base_hours = self.workload_hours(sum(self.report['javax_usage'].values()))
+        
+        self.report['workload_estimate'] = {
+            'estimated_hours': round(base_hours, 1),
+            'estimated_days': round(base_hours / 8, 1),
+            'automation_coverage': '85%',
+            'manual_work_hours': round(base_hours * 0.15, 1)
+        }
+        
+        # 抽样模式下按javax使用总量的置信区间给出工作量范围
+        if 'sampling' in self.report:
+            javax_total = self.report['sampling']['javax_total']
+            self.report['workload_estimate']['estimated_hours_range'] = [
+                round(self.workload_hours(javax_total['low']), 1),
+                round(self.workload_hours(javax_total['high']), 1)
+            ]
+        
+        print(f"  ✓ 预估总工作量: {self.report['workload_estimate']['estimated_hours']}小时")
+        if 'estimated_hours_range' in self.report['workload_estimate']:
+            low, high = self.report['workload_estimate']['estimated_hours_range']
+            print(f"  ✓ {self.report['sampling']['confidence']:.0%}置信区间: {low}-{high}小时")
+        print(f"  ✓ 预估工作天数: {self.report['workload_estimate']['estimated_days']}天")
+        print(f"  ✓ 自动化覆盖: {self.report['workload_estimate']['automation_coverage']}")
+        print(f"  ✓ 需人工处理: {self.report['workload_estimate']['manual_work_hours']}小时")
+    
+    def workload_hours(self, javax_count):
+        """按项目规模、javax使用量、风险和模块数计算工作量（小时）"""
         # 基础工作量（小时）
         base_hours = 2
         
@@ -252,7 +685,6 @@ class ProjectAnalyzer:
             base_hours += 2
         
         # 根据javax使用量调整
-        javax_count = sum(self.report['javax_usage'].values())
         if javax_count > 0:
             base_hours += javax_count * 0.05  # 每个文件约3分钟
         
@@ -265,17 +697,7 @@ class ProjectAnalyzer:
             module_count = self.report['structure']['pom_count']
             base_hours += module_count * 0.5
         
-        self.report['workload_estimate'] = {
-            'estimated_hours': round(base_hours, 1),
-            'estimated_days': round(base_hours / 8, 1),
-            'automation_coverage': '85%',
-            'manual_work_hours': round(base_hours * 0.15, 1)
-        }
-        
-        print(f"  ✓ 预估总工作量: {self.report['workload_estimate']['estimated_hours']}小时")
-        print(f"  ✓ 预估工作天数: {self.report['workload_estimate']['estimated_days']}天")
-        print(f"  ✓ 自动化覆盖: {self.report['workload_estimate']['automation_coverage']}")
-        print(f"  ✓ 需人工处理: {self.report['workload_estimate']['manual_work_hours']}小时")
+        return base_hours
     
     def generate_report(self, output_path=None):
         """生成分析报告"""
@@ -298,16 +720,29 @@ class ProjectAnalyzer:
 - **JDK版本**: {self.report['versions'].get('java', '未指定')}
 - **Spring Boot**: {self.report['versions'].get('spring_boot', '未使用')}
 - **Spring Cloud**: {self.report['versions'].get('spring_cloud', '未使用')}
-
-## 三、代码迁移需求
-
-### javax命名空间使用统计
-
 """
         
+        differing = {module: versions for module, versions in self.report['module_versions'].items()
+                     if versions != self.report['versions']}
+        if differing:
+            report_content += "\n与根POM版本不同的模块:\n\n"
+            for module, versions in differing.items():
+                details = ', '.join(f"{key}={value}" for key, value in versions.items()) or '未指定'
+                report_content += f"- `{module}`: {details}\n"
+        
+        report_content += "\n## 三、代码迁移需求\n\n"
+        
+        estimates = self.report.get('sampling', {})
+        if estimates:
+            report_content += (f"> 抽样估算: 从{estimates['population_files']}个Java文件中按{estimates['strata']}个模块"
+                               f"分层抽取{estimates['sampled_files']}个（种子 {estimates['seed']}），"
+                               f"方括号内为{estimates['confidence']:.0%}置信区间\n\n")
+        
+        report_content += "### javax命名空间使用统计\n\n"
+        
         if self.report['javax_usage']:
             for pkg, count in self.report['javax_usage'].items():
-                report_content += f"- `{pkg}`: {count}个文件\n"
+                report_content += f"- `{pkg}`: {count}个文件{self.format_range(estimates.get('javax_usage', {}).get(pkg))}\n"
         else:
             report_content += "✅ 未发现javax命名空间使用\n"
         
@@ -315,10 +750,39 @@ class ProjectAnalyzer:
         
         if self.report['deprecated_apis']:
             for api_info in self.report['deprecated_apis']:
-                report_content += f"⚠️ **{api_info['api']}**: {len(api_info['files'])}个文件\n"
+                api_range = self.format_range(estimates.get('deprecated_apis', {}).get(api_info['api']))
+                report_content += (f"⚠️ **[{api_info['severity']}] {api_info['api']}**: "
+                                   f"{api_info['file_count']}个文件{api_range}\n"
+                                   f"   - {api_info['description']}\n"
+                                   f"   - 替代方案: {api_info['replacement']}\n")
+                for location in api_info.get('files', [])[:10]:
+                    lines = ', '.join(str(line) for line in location['lines'])
+                    report_content += f"   - `{location['file']}` 第{lines}行\n"
+                if len(api_info.get('files', [])) > 10:
+                    report_content += f"   - ……其余{len(api_info['files']) - 10}个文件见JSON报告\n"
         else:
             report_content += "✅ 未发现过时API使用\n"
         
+        if 'jar_scan' in self.report:
+            report_content += "\n### 依赖JAR中的javax类\n\n"
+            if self.report['jar_scan']['archives_with_javax']:
+                for archive in self.report['jar_scan']['archives_with_javax']:
+                    report_content += f"- `{archive['path']}`: {', '.join(archive['javax_packages'])}\n"
+            else:
+                report_content += "✅ 构建输出中未发现包含javax类的归档\n"
+        
+        if 'class_scan' in self.report:
+            class_scan = self.report['class_scan']
+            report_content += "\n### 编译产物中的引用\n\n"
+            if class_scan['packages']:
+                report_content += f"{class_scan['scan_stats']['classes_with_references']}个类在字节码中引用了以下包：\n\n"
+                for package, info in class_scan['packages'].items():
+                    target = f" → `{info['jakarta']}`" if info['jakarta'] else ''
+                    only = '（仅出现在字节码中）' if package in class_scan['bytecode_only_packages'] else ''
+                    report_content += f"- `{package}`: {info['classes']}个类{target}{only}\n"
+            else:
+                report_content += "✅ 字节码中未发现javax/内部API引用\n"
+        
         report_content += "\n## 四、风险评估\n\n"
         
         for risk in self.report['risks']:
@@ -329,7 +793,7 @@ class ProjectAnalyzer:
         
         report_content += f"""## 五、工作量估算
 
-- **预估总工作量**: {self.report['workload_estimate']['estimated_hours']}小时
+- **预估总工作量**: {self.report['workload_estimate']['estimated_hours']}小时{self.format_hours_range()}
 - **预估工作天数**: {self.report['workload_estimate']['estimated_days']}天
 - **自动化覆盖率**: {self.report['workload_estimate']['automation_coverage']}
 - **人工处理工作量**: {self.report['workload_estimate']['manual_work_hours']}小时
@@ -393,29 +857,95 @@ bash scripts/validate_upgrade.sh {self.project_path}
         
         return output_path
 
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
 def main():
     if len(sys.argv) < 2:
-        print("用法: python analyze_project.py <project_path>")
+        print("用法: python analyze_project.py <project_path> [--exclude DIR1,DIR2] [--no-gitignore] [--full-body] [--no-cache] [--since REV] [--rev REV] [--output-dir DIR] [--profile PATH] [--jsonl PATH] [--sample N] [--seed S] [--scan-jars] [--scan-classes]")
+        print("\n选项:")
+        print(f"  --exclude DIRS   额外排除的目录名（逗号分隔，支持通配符），默认排除: {','.join(DEFAULT_EXCLUDES)}（target/build仅限模块根目录）")
+        print("  --no-gitignore   不应用.gitignore规则")
+        print("  --full-body      全文模式：同时统计代码中的javax全限定名引用（默认只统计类型声明之前的import；代码类API规则两种模式均检查全文）")
+        print("  --no-cache       不使用持久化分析缓存，全量扫描所有文件")
+        print("  --since REV      只重新分析自REV以来git中变更的文件，其余文件沿用缓存中的上次结果")
+        print("  --rev REV        直接分析git提交REV中的文件，无需检出分支（报告默认输出到当前目录）")
+        print("  --output-dir DIR 报告输出目录（默认为项目目录）")
+        print("  --profile PATH   保存性能数据：.json为Chrome trace事件文件，其他后缀为cProfile数据")
+        print("  --jsonl PATH     逐条流式写出文件级发现（JSON Lines），报告中只保留计数")
+        print("  --sample N       快速估算：按模块分层随机抽取约N个Java文件扫描，外推结果并给出95%置信区间")
+        print("  --seed S         抽样随机种子（默认随机生成并记录在报告中，用于复现）")
+        print("  --scan-jars      同时扫描构建输出（target/）中的JAR/WAR，统计其中打包的javax类")
+        print("  --scan-classes   同时解析target/classes下的class文件，找出字节码中的javax/内部API引用")
         sys.exit(1)
     
     project_path = sys.argv[1]
     
+    excludes = list(DEFAULT_EXCLUDES)
+    extra_excludes = get_option_value('--exclude')
+    if extra_excludes:
+        excludes.extend(name.strip() for name in extra_excludes.split(',') if name.strip())
+    respect_gitignore = '--no-gitignore' not in sys.argv
+    full_body = '--full-body' in sys.argv
+    use_cache = '--no-cache' not in sys.argv
+    since = get_option_value('--since')
+    rev = get_option_value('--rev')
+    output_dir = get_option_value('--output-dir')
+    profile_path = get_option_value('--profile')
+    try:
+        sample_size = get_option_value('--sample')
+        sample_size = int(sample_size) if sample_size is not None else None
+        seed = get_option_value('--seed')
+        seed = int(seed) if seed is not None else None
+    except ValueError:
+        print("错误: --sample 和 --seed 参数必须为整数")
+        sys.exit(1)
+    if sample_size is not None and sample_size <= 0:
+        print("错误: --sample 参数必须为正整数")
+        sys.exit(1)
+    
     if not os.path.exists(project_path):
         print(f"错误: 项目路径不存在: {project_path}")
         sys.exit(1)
+    if since and rev:
+        print("错误: --since 与 --rev 不能同时使用")
+        sys.exit(1)
+    
+    try:
+        analyzer = ProjectAnalyzer(project_path, excludes=excludes, respect_gitignore=respect_gitignore,
+                                   full_body=full_body, use_cache=use_cache, since=since, rev=rev,
+                                   jsonl_path=get_option_value('--jsonl'), sample_size=sample_size, seed=seed,
+                                   scan_jars='--scan-jars' in sys.argv, scan_classes='--scan-classes' in sys.argv)
+        with profile_session(profile_path, analyzer.recorder):
+            analyzer.analyze()
+    except RuntimeError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
     
-    analyzer = ProjectAnalyzer(project_path)
-    analyzer.analyze()
+    # --rev模式不写工作区，报告文件名带上提交名以便比较多个分支；
+    # 清理后的提交名可能重名（如HEAD~1与HEAD^1），再附加解析出的短提交ID
+    if rev:
+        output_dir = Path(output_dir or '.')
+        suffix = '-' + re.sub(r'[^\w.-]+', '_', rev) + '-' + analyzer.source.commit[:12]
+    else:
+        output_dir = Path(output_dir or project_path)
+        suffix = ''
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # 生成报告
-    report_path = analyzer.generate_report()
+    report_path = analyzer.generate_report(output_dir / f'upgrade_analysis_report{suffix}.md')
     
     print("\n" + "=" * 60)
     print("分析完成! 请查看详细报告了解升级建议。")
     print("=" * 60)
     
     # 输出JSON格式（供其他脚本使用）
-    json_path = Path(project_path) / 'upgrade_analysis.json'
+    json_path = output_dir / f'upgrade_analysis{suffix}.json'
     with open(json_path, 'w', encoding='utf-8') as f:
         json.dump(analyzer.report, f, indent=2, ensure_ascii=False)
     print(f"\nJSON报告: {json_path}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+过时/已移除API检测规则
+解析references/api_rules.json，把全部规则编译为一个带命名分组的字节正则，
+每个文件只需一次扫描即可得到所有命中的规则及所在行号
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from java_source import blank_comments
+
+RULES_FILE = Path(__file__).resolve().parent.parent / 'references' / 'api_rules.json'
+
+SEVERITIES = ('HIGH', 'MEDIUM', 'LOW')
+
+# 进程内已加载的规则集，避免重复读取
+_loaded_rules = {}
+
+
+def count_newlines(content, start, end):
+    """统计区间内的换行数；mmap没有count方法，切片后再统计"""
+    if isinstance(content, bytes):
+        return content.count(b'\n', start, end)
+    return content[start:end].count(b'\n')
+
+
+class RuleMatcher:
+    """某一扫描模式下编译好的组合规则
+
+    文件头模式只包含import类规则并要求位于import语句中；
+    全文模式包含全部规则，import类规则匹配任意位置的全限定名。kinds可进一步限定规则类别。
+
+    每个名称/模式是组合正则的一个顶层分支，分支以字面量开头、以空的命名分组结尾：
+    re模块只有在所有顶层分支都以字面量开头时才能按首字符快速跳过不可能匹配的位置，
+    分组或断言放在开头会让每个位置都逐一尝试全部分支。
+    """
+
+    def __init__(self, rules, full_body, kinds=None):
+        self.rules = [rule for rule in rules if (full_body or rule['kind'] == 'import')
+                      and (kinds is None or rule['kind'] in kinds)]
+        self.full_body = full_body
+
+        alternatives = []
+        markers = []
+        for index, rule in enumerate(self.rules):
+            if rule['kind'] == 'import':
+                patterns = [self.name_pattern(name) for name in rule['names']]
+                markers.extend(rule['names'])
+            else:
+                patterns = rule['patterns']
+                markers.extend(rule['markers'])
+            # 分支末尾的空分组r<规则序号>_<分支序号>标识命中的规则
+            alternatives.extend(f'{pattern}(?P<r{index}_{branch}>)' for branch, pattern in enumerate(patterns))
+
+        # 所有规则合并为一个正则，按规则顺序优先匹配
+        pattern = '|'.join(alternatives)
+        if not full_body:
+            pattern = rf'import\s+(?:static\s+)?(?:{pattern})'
+        self.pattern = re.compile(pattern.encode('ascii')) if alternatives else None
+        self.markers = tuple(dict.fromkeys(marker.encode('ascii') for marker in markers))
+
+    def name_pattern(self, name):
+        """包名/类名前缀；全文模式下用名称之后的后行断言要求前面不是标识符或点"""
+        pattern = re.escape(name)
+        if not name.endswith('.'):
+            pattern += r'(?!\w)'
+        if self.full_body:
+            pattern += rf'(?<![\w.]{re.escape(name)})'
+        return pattern
+
+    def find(self, content):
+        """单次扫描内容，返回{规则api: [行号, ...]}，按首次命中顺序排列
+
+        注释中的代码不算命中：存在候选命中时才把注释替换为空格后再匹配，没有命中的文件不增加开销。
+        字符串字面量仍参与匹配（如getEngineByName("nashorn")依赖字面量内容）。
+        """
+        hits = {}
+        if self.pattern is None or self.pattern.search(content) is None:
+            return hits
+        content = blank_comments(content)
+
+        line = 1
+        position = 0
+        for match in self.pattern.finditer(content):
+            start = match.start()
+            line += count_newlines(content, position, start)
+            position = start
+            api = self.rules[int(match.lastgroup[1:].split('_')[0])]['api']
+            lines = hits.setdefault(api, [])
+            if not lines or lines[-1] != line:
+                lines.append(line)
+        return hits
+
+
+class ApiRuleSet:
+    """从规则文件加载的全部规则"""
+
+    def __init__(self, rules, version):
+        self.rules = rules
+        self.version = version
+        self.by_api = {rule['api']: rule for rule in rules}
+        self._matchers = {}
+
+    def matcher(self, full_body, kinds=None):
+        """返回指定扫描模式（及规则类别）下的组合规则（按参数缓存）"""
+        key = (full_body, kinds)
+        if key not in self._matchers:
+            self._matchers[key] = RuleMatcher(self.rules, full_body, kinds)
+        return self._matchers[key]
+
+
+def validate_rule(rule):
+    """检查规则格式：code类规则只能使用非捕获分组，否则无法按末尾的命名分组识别命中的规则"""
+    if rule.get('kind') not in ('import', 'code'):
+        raise ValueError(f"规则 {rule.get('api')} 的kind必须为import或code")
+    if rule.get('severity') not in SEVERITIES:
+        raise ValueError(f"规则 {rule['api']} 的severity必须为{'/'.join(SEVERITIES)}之一")
+    if rule['kind'] == 'import':
+        if not rule.get('names'):
+            raise ValueError(f"规则 {rule['api']} 缺少names")
+        return
+    if not rule.get('markers'):
+        raise ValueError(f"规则 {rule['api']} 缺少markers")
+    if not rule.get('patterns'):
+        raise ValueError(f"规则 {rule['api']} 缺少patterns")
+    for pattern in rule['patterns']:
+        if re.compile(pattern).groups:
+            raise ValueError(f"规则 {rule['api']} 的pattern只能使用非捕获分组(?:...)")
+
+
+def load_api_rules(rules_file=RULES_FILE):
+    """加载检测规则，版本为规则文件内容的哈希（用于分析缓存失效）"""
+    rules_file = Path(rules_file)
+    if rules_file in _loaded_rules:
+        return _loaded_rules[rules_file]
+
+    raw = rules_file.read_bytes()
+    rules = json.loads(raw.decode('utf-8'))['rules']
+    for rule in rules:
+        validate_rule(rule)
+
+    rule_set = ApiRuleSet(rules, hashlib.sha256(raw).hexdigest())
+    _loaded_rules[rules_file] = rule_set
+    return rule_set
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+原子批量写入工具
+修改后的内容先写入同目录下的临时文件，整批写完后逐个fsync、再重命名替换原文件，
+最后每个涉及的目录只同步一次，中途崩溃或Ctrl-C不会留下被截断的文件
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+# 临时文件后缀，便于识别和清理中断遗留的临时文件
+TEMP_SUFFIX = '.jdk21-upgrade.tmp'
+
+
+def write_temp(target, chunks):
+    """把内容写入目标文件的同级临时文件，返回临时文件路径
+
+    chunks为bytes或可读的二进制文件对象序列，文件对象会被流式复制。
+    临时文件继承原文件的权限位。
+    """
+    target = Path(target)
+    temp = target.with_name(f'.{target.name}.{os.getpid()}{TEMP_SUFFIX}')
+    try:
+        with open(temp, 'wb') as f:
+            for chunk in chunks:
+                if isinstance(chunk, (bytes, bytearray, memoryview)):
+                    f.write(chunk)
+                else:
+                    shutil.copyfileobj(chunk, f)
+        if target.exists():
+            shutil.copymode(target, temp)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return temp
+
+
+def fsync_file(path):
+    """让单个文件的内容落盘"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(path):
+    """让目录项（重命名结果）落盘；Windows不支持打开目录，跳过"""
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_stale_temps(targets):
+    """删除目标文件的同级临时文件（含工作进程写入、尚未登记的临时文件），每个目录只列出一次"""
+    by_directory = {}
+    for target in targets:
+        target = Path(target)
+        by_directory.setdefault(target.parent, set()).add(target.name)
+    for directory, names in by_directory.items():
+        try:
+            with os.scandir(directory) as it:
+                temps = [entry.path for entry in it
+                         if entry.name.startswith('.') and entry.name.endswith(TEMP_SUFFIX)
+                         and entry.name[1:-len(TEMP_SUFFIX)].rpartition('.')[0] in names]
+        except OSError:
+            continue
+        for temp in temps:
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+
+
+class AtomicBatchWriter:
+    """整批提交的原子写入器
+
+    stage/add只登记临时文件，不会中途提交；调用方处理完整批文件后调用commit，
+    先逐个fsync临时文件，再依次重命名替换原文件，最后每个涉及的目录同步一次。
+    未提交的临时文件在abort时删除，原文件保持不变。
+    """
+
+    def __init__(self):
+        self.pending = []
+        self.committed = 0
+
+    def stage(self, target, chunks):
+        """写入临时文件并登记到当前批次"""
+        temp = write_temp(target, chunks)
+        self.add(temp, target)
+        return temp
+
+    def add(self, temp, target):
+        """登记已写好的临时文件（如由工作进程写入）"""
+        self.pending.append((Path(temp), Path(target)))
+
+    def commit(self):
+        """提交当前批次：fsync临时文件 → 重命名 → 每个目录同步一次"""
+        if not self.pending:
+            return
+        for temp, _ in self.pending:
+            fsync_file(temp)
+        for temp, target in self.pending:
+            os.replace(temp, target)
+        for directory in {target.parent for _, target in self.pending}:
+            fsync_directory(directory)
+        self.committed += len(self.pending)
+        self.pending = []
+
+    def abort(self, dispatched=()):
+        """放弃当前批次，删除尚未提交的临时文件
+
+        dispatched为已交给工作进程/线程处理的目标文件：它们写好的临时文件可能还没有登记，
+        按文件名清理其同级临时文件。
+        """
+        for temp, _ in self.pending:
+            temp.unlink(missing_ok=True)
+        self.pending = []
+        if dispatched:
+            remove_stale_temps(dispatched)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+依赖升级目录
+由references/dependency_versions.json构建按(groupId, artifactId)索引的升级目录，
+支持通配artifactId和通配group前缀，查找开销与目录规模无关
+"""
+
+import json
+import re
+from pathlib import Path
+
+CATALOG_FILE = Path(__file__).resolve().parent.parent / 'references' / 'dependency_versions.json'
+
+# Maven版本限定符顺序（与ComparableVersion一致），未知限定符排在已知限定符之后
+QUALIFIER_RANKS = {
+    'alpha': 0, 'a': 0,
+    'beta': 1, 'b': 1,
+    'milestone': 2, 'm': 2,
+    'rc': 3, 'cr': 3,
+    'snapshot': 4,
+    '': 5, 'ga': 5, 'final': 5, 'release': 5,
+    'sp': 6,
+}
+RELEASE = (1, 5, '')
+
+# 进程内已加载的目录，一次运行只解析一次
+_loaded_catalogs = {}
+
+
+def version_key(version):
+    """把Maven版本号转换为可比较的键，如 1.5.5.Final < 1.18.36 < 3.2.4-SNAPSHOT < 3.2.4"""
+    key = []
+    for token in re.findall(r'\d+|[a-zA-Z]+', version.lower()):
+        if token.isdigit():
+            key.append((2, int(token), ''))
+        elif token in QUALIFIER_RANKS:
+            key.append((1, QUALIFIER_RANKS[token], ''))
+        else:
+            key.append((1, len(QUALIFIER_RANKS), token))
+
+    # 位于末尾或限定符之前的0和正式版限定符不影响大小（1.0 == 1.0.0 == 1.0.Final，1.0-rc1 == 1-rc1）
+    normalized = []
+    for item in reversed(key):
+        if (not normalized or normalized[-1][0] == 1) and item in ((2, 0, ''), RELEASE):
+            continue
+        normalized.append(item)
+    normalized.reverse()
+    normalized.append(RELEASE)
+    return tuple(normalized)
+
+
+def is_older(current, target):
+    """判断当前版本是否低于目标版本"""
+    return version_key(current) < version_key(target)
+
+
+class DependencyCatalog:
+    """依赖升级目录：精确坐标、通配artifactId、通配group前缀三级索引"""
+
+    def __init__(self, mappings):
+        self.entries = {}
+        self.exact = {}
+        self.group_prefixes = {}
+
+        for name, info in mappings.items():
+            entry = {
+                'name': name,
+                # jdk21_version形如"3.2.4+"，表示最低兼容版本，升级时使用该版本
+                'version': info['jdk21_version'].rstrip('+').strip(),
+                'notes': info.get('notes', ''),
+                'critical': info.get('critical', False),
+                # Spring Boot主次版本 -> 兼容的Spring Cloud发布列车
+                'boot_release_trains': info.get('boot_release_trains', {})
+            }
+            self.entries[name] = entry
+
+            for coordinate in info.get('coordinates', []):
+                group_id, artifact_id = coordinate.split(':', 1)
+                if group_id.endswith('.*'):
+                    self.group_prefixes[(group_id[:-2], artifact_id)] = entry
+                else:
+                    self.exact[(group_id, artifact_id)] = entry
+
+    @property
+    def versions(self):
+        """按名称索引的目标版本，如 {'lombok': '1.18.36', ...}"""
+        return {name: entry['version'] for name, entry in self.entries.items()}
+
+    def lookup(self, group_id, artifact_id):
+        """查找依赖对应的目录条目，返回(条目, 是否精确匹配)，未收录时返回(None, False)"""
+        entry = self.exact.get((group_id, artifact_id))
+        if entry is not None:
+            return entry, True
+
+        entry = self.exact.get((group_id, '*'))
+        if entry is not None:
+            return entry, False
+
+        if self.group_prefixes:
+            # 按group层级由深到浅匹配前缀，次数只取决于groupId的段数
+            segments = group_id.split('.')
+            for i in range(len(segments) - 1, 0, -1):
+                prefix = '.'.join(segments[:i])
+                entry = self.group_prefixes.get((prefix, artifact_id)) or self.group_prefixes.get((prefix, '*'))
+                if entry is not None:
+                    return entry, False
+
+        return None, False
+
+
+def load_catalog(catalog_file=CATALOG_FILE):
+    """加载依赖升级目录（每个进程只解析一次）"""
+    catalog_file = Path(catalog_file)
+    if catalog_file not in _loaded_catalogs:
+        with open(catalog_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        _loaded_catalogs[catalog_file] = DependencyCatalog(data['mappings'])
+    return _loaded_catalogs[catalog_file]
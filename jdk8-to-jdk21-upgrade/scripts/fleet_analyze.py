@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+批量项目分析脚本
+并发分析大量服务仓库的JDK 21升级准备度，逐个项目流式写出结果，
+并汇总各javax包、风险等级和Spring Boot版本的统计
+"""
+
+import os
+import sys
+import json
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from analyze_project import ProjectAnalyzer
+from project_walker import DEFAULT_EXCLUDES
+
+
+def discover_projects(target):
+    """读取项目列表：目录时取其下包含pom.xml的直接子目录，文件时每行一个项目路径（#开头为注释）"""
+    target = Path(target)
+    if target.is_dir():
+        with os.scandir(target) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'pom.xml')):
+                yield Path(entry.path)
+        return
+
+    with open(target, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield Path(line)
+
+
+def analyze_one(project_path, options):
+    """在工作进程中分析单个项目，只返回汇总所需的精简结果"""
+    result = {'project': Path(project_path).name, 'path': str(project_path)}
+    try:
+        # 单项目分析的逐步输出在批量模式下没有意义，丢弃
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            analyzer = ProjectAnalyzer(project_path, **options)
+            report = analyzer.analyze()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    result.update({
+        'versions': report['versions'],
+        'structure': {key: report['structure'].get(key) for key in
+                      ('type', 'is_spring_boot', 'pom_count', 'java_files_count')},
+        'javax_usage': dict(report['javax_usage']),
+        'deprecated_apis': {api['api']: api['file_count'] for api in report['deprecated_apis']},
+        'risks': [{'level': risk['level'], 'item': risk['item']} for risk in report['risks']],
+        'workload_estimate': report['workload_estimate'],
+        'scan_stats': report['scan_stats']
+    })
+    if 'revision' in report:
+        result['revision'] = report['revision']
+    return result
+
+
+class FleetAggregate:
+    """批量分析的汇总计数器，只保存计数，不保留单个项目的结果"""
+
+    def __init__(self):
+        self.projects = 0
+        self.failed = []
+        self.java_files = 0
+        self.estimated_hours = 0.0
+        self.javax_files = Counter()
+        self.javax_projects = Counter()
+        self.deprecated_projects = Counter()
+        self.risk_levels = Counter()
+        self.risk_items = Counter()
+        self.spring_boot_versions = Counter()
+        self.java_versions = Counter()
+
+    def add(self, result):
+        self.projects += 1
+        if 'error' in result:
+            self.failed.append({'path': result['path'], 'error': result['error']})
+            return
+
+        self.java_files += result['structure']['java_files_count'] or 0
+        self.estimated_hours += result['workload_estimate'].get('estimated_hours', 0)
+        for pkg, count in result['javax_usage'].items():
+            self.javax_files[pkg] += count
+            self.javax_projects[pkg] += 1
+        for api in result['deprecated_apis']:
+            self.deprecated_projects[api] += 1
+        for risk in result['risks']:
+            self.risk_levels[risk['level']] += 1
+            self.risk_items[risk['item']] += 1
+        self.spring_boot_versions[result['versions'].get('spring_boot', '未使用')] += 1
+        self.java_versions[result['versions'].get('java', '未指定')] += 1
+
+    def to_dict(self):
+        return {
+            'analysis_time': datetime.now().isoformat(),
+            'projects': self.projects,
+            'failed_projects': len(self.failed),
+            'failures': self.failed,
+            'java_files': self.java_files,
+            'estimated_hours': round(self.estimated_hours, 1),
+            'javax_usage': {pkg: {'files': self.javax_files[pkg], 'projects': self.javax_projects[pkg]}
+                            for pkg, _ in self.javax_files.most_common()},
+            'deprecated_apis': dict(self.deprecated_projects.most_common()),
+            'risk_levels': dict(self.risk_levels.most_common()),
+            'risk_items': dict(self.risk_items.most_common()),
+            'spring_boot_versions': dict(sorted(self.spring_boot_versions.items())),
+            'java_versions': dict(sorted(self.java_versions.items()))
+        }
+
+    def to_markdown(self):
+        summary = self.to_dict()
+        content = f"""# JDK 21 批量升级评估汇总
+
+**分析时间**: {summary['analysis_time']}
+
+- **项目数量**: {summary['projects']}（失败 {summary['failed_projects']}）
+- **Java文件总数**: {summary['java_files']}
+- **预估总工作量**: {summary['estimated_hours']}小时
+
+## javax命名空间使用
+
+| 包 | 文件数 | 项目数 |
+|----|--------|--------|
+"""
+        for pkg, counts in summary['javax_usage'].items():
+            content += f"| `{pkg}` | {counts['files']} | {counts['projects']} |\n"
+
+        content += "\n## 风险等级\n\n"
+        for level, count in summary['risk_levels'].items():
+            content += f"- **{level}**: {count}\n"
+
+        content += "\n## Spring Boot版本分布\n\n"
+        for version, count in summary['spring_boot_versions'].items():
+            content += f"- {version}: {count}个项目\n"
+
+        content += "\n## JDK版本分布\n\n"
+        for version, count in summary['java_versions'].items():
+            content += f"- {version}: {count}个项目\n"
+
+        if self.failed:
+            content += "\n## 分析失败的项目\n\n"
+            for failure in self.failed:
+                content += f"- `{failure['path']}`: {failure['error']}\n"
+        return content
+
+
+def run_fleet(projects, output_path, options, jobs):
+    """有界并发地分析项目，每完成一个就写出一行JSONL并计入汇总
+
+    同时在途的任务数不超过工作进程数的两倍，内存占用不随项目数量增长。
+    """
+    aggregate = FleetAggregate()
+    projects = iter(projects)
+    max_pending = jobs * 2
+
+    with open(output_path, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                project = next(projects, None)
+                if project is None:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(analyze_one, str(project), options))
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                out.flush()
+                aggregate.add(result)
+                status = '✗' if 'error' in result else '✓'
+                print(f"  {status} [{aggregate.projects}] {result['path']}")
+
+    return aggregate
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python fleet_analyze.py <项目列表文件|项目根目录> [--jobs N] [--output-dir DIR] "
+              "[--rev REV] [--full-body] [--no-cache] [--exclude DIR1,DIR2]")
+        print("\n选项:")
+        print("  --jobs N          并发分析的进程数（默认使用全部CPU核数）")
+        print("  --output-dir DIR  结果输出目录（默认当前目录）")
+        print("  --rev REV         分析每个仓库中的git提交REV，无需检出")
+        print("  --full-body       全文模式：同时统计代码中的全限定名引用")
+        print("  --no-cache        不使用持久化分析缓存")
+        print(f"  --exclude DIRS    额外排除的目录名，默认排除: {','.join(DEFAULT_EXCLUDES)}（target/build仅限模块根目录）")
+        sys.exit(1)
+
+    target = sys.argv[1]
+    if not os.path.exists(target):
+        print(f"错误: 路径不存在: {target}")
+        sys.exit(1)
+
+    try:
+        jobs = int(get_option_value('--jobs', '0'))
+    except ValueError:
+        print("错误: --jobs 参数必须为整数")
+        sys.exit(1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    excludes = list(DEFAULT_EXCLUDES)
+    extra_excludes = get_option_value('--exclude')
+    if extra_excludes:
+        excludes.extend(name.strip() for name in extra_excludes.split(',') if name.strip())
+    options = {
+        'excludes': excludes,
+        'full_body': '--full-body' in sys.argv,
+        'use_cache': '--no-cache' not in sys.argv,
+        'rev': get_option_value('--rev')
+    }
+
+    output_dir = Path(get_option_value('--output-dir', '.'))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / 'fleet_analysis.jsonl'
+
+    print(f"批量分析: {target} (并发 {jobs})")
+    print("=" * 60)
+    aggregate = run_fleet(discover_projects(target), output_path, options, jobs)
+
+    summary_path = output_dir / 'fleet_summary.json'
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(aggregate.to_dict(), f, indent=2, ensure_ascii=False)
+    report_path = output_dir / 'fleet_summary.md'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(aggregate.to_markdown())
+
+    print("\n" + "=" * 60)
+    print(f"完成: {aggregate.projects}个项目，失败 {len(aggregate.failed)}个")
+    print(f"逐项目结果: {output_path}")
+    print(f"汇总: {summary_path}")
+    print(f"报告: {report_path}")
+
+if __name__ == '__main__':
+    main()
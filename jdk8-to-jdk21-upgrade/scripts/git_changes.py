@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Git变更文件收集
+从本地git仓库读取自某个提交以来变化的文件（已提交、暂存、未暂存及未跟踪），
+供分析和迁移脚本只处理变化的文件
+"""
+
+import subprocess
+from pathlib import Path
+
+from project_walker import BUILD_OUTPUT_DIRS, DEFAULT_EXCLUDES, MODULE_FILES, is_excluded_dir
+
+
+class ChangeSet:
+    """相对某个提交的变更：仍存在的文件和已删除的文件（均为绝对路径）"""
+
+    def __init__(self, since):
+        self.since = since
+        self.changed = []
+        self.deleted = []
+
+
+def run_git(cwd, *args):
+    """执行git命令并返回标准输出（bytes），失败时抛出RuntimeError"""
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise RuntimeError("未找到git命令")
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} 失败: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout
+
+
+def git_toplevel(path):
+    """返回path所在git仓库的根目录"""
+    output = run_git(path, 'rev-parse', '--show-toplevel')
+    return Path(output.decode('utf-8').strip()).resolve()
+
+
+def head_commit(path):
+    """path所在仓库HEAD的提交ID，不在git仓库中或没有提交时返回None"""
+    try:
+        return run_git(path, 'rev-parse', '--verify', '-q', 'HEAD^{commit}').decode('ascii').strip() or None
+    except RuntimeError:
+        return None
+
+
+def is_ancestor(path, ancestor, rev):
+    """ancestor是否为rev的祖先（或同一提交）"""
+    try:
+        result = subprocess.run(['git', 'merge-base', '--is-ancestor', ancestor, rev], cwd=path,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        raise RuntimeError("未找到git命令")
+    return result.returncode == 0
+
+
+def is_excluded(rel_path, excludes, is_module_root):
+    """路径中任一级目录命中排除规则时返回True，规则与项目目录遍历一致
+
+    is_module_root(相对目录)判断该目录是否含构建文件，target/build只在模块根目录下排除。
+    """
+    parts = rel_path.parts[:-1]
+    return any(is_excluded_dir(part, excludes, part in BUILD_OUTPUT_DIRS and is_module_root(Path(*parts[:i])))
+               for i, part in enumerate(parts))
+
+
+def filesystem_module_root(root):
+    """按工作区文件判断模块根目录（结果按目录缓存）"""
+    cache = {}
+
+    def is_module_root(rel_dir):
+        if rel_dir not in cache:
+            cache[rel_dir] = any((root / rel_dir / name).is_file() for name in MODULE_FILES)
+        return cache[rel_dir]
+    return is_module_root
+
+
+def changed_files(root, since, suffixes=('.java',), excludes=None):
+    """收集root目录下自since以来变化的文件
+
+    包括since之后的提交、暂存区和工作区中的修改，以及未被.gitignore忽略的未跟踪文件。
+    重命名按删除旧路径、新增新路径处理。
+    """
+    root = Path(root).resolve()
+    excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+    toplevel = git_toplevel(root)
+    is_module_root = filesystem_module_root(root)
+
+    # 与工作区比较，同时覆盖已提交和未提交的修改；-z输出避免路径转义
+    names = run_git(toplevel, 'diff', '--name-only', '--no-renames', '-z', since, '--')
+    names += run_git(toplevel, 'ls-files', '--others', '--exclude-standard', '-z')
+
+    changes = ChangeSet(since)
+    seen = set()
+    for name in names.split(b'\0'):
+        if not name:
+            continue
+        path = toplevel / name.decode('utf-8', 'surrogateescape')
+        if path in seen or not path.name.endswith(suffixes):
+            continue
+        seen.add(path)
+
+        try:
+            rel_path = path.relative_to(root)
+        except ValueError:
+            continue
+        if is_excluded(rel_path, excludes, is_module_root):
+            continue
+
+        if path.is_file():
+            changes.changed.append(path)
+        else:
+            changes.deleted.append(path)
+
+    changes.changed.sort()
+    changes.deleted.sort()
+    return changes
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+直接读取git提交中的文件
+通过 git ls-tree 列出指定提交的文件，再经由一个常驻的 git cat-file --batch 进程
+按需读取blob内容，无需检出分支，也不写入工作区
+"""
+
+import io
+import os
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from git_changes import git_toplevel, is_excluded, run_git
+from project_walker import DEFAULT_EXCLUDES, MODULE_FILES, ProjectFiles
+
+
+def normalize(path):
+    """规范化路径中的..等成分（文件不一定存在于工作区，不能依赖resolve）"""
+    return Path(os.path.normpath(path))
+
+
+def walk_order(path):
+    """与目录遍历一致的顺序：同一目录下先文件后子目录，均按名称排序"""
+    return [(1, part) for part in path.parent.parts] + [(0, path.name)]
+
+
+class GitTreeSource:
+    """某个提交的只读文件视图
+
+    路径均为工作区中对应位置的绝对路径（文件本身不必存在），
+    提供与PomModel文件源相同的is_file/is_dir/parse接口，以及read_bytes读取任意blob。
+    """
+
+    def __init__(self, project_path, rev):
+        self.project_path = Path(project_path).resolve()
+        self.toplevel = git_toplevel(self.project_path)
+        self.rev = rev
+        self.commit = run_git(self.toplevel, 'rev-parse', '--verify', f'{rev}^{{commit}}').decode('ascii').strip()
+
+        # 路径 -> (blob对象ID, 大小)
+        self.blobs = {}
+        self.dirs = set()
+        prefix = self.project_path.relative_to(self.toplevel).as_posix()
+        args = ['ls-tree', '-r', '-l', '-z', self.commit]
+        if prefix != '.':
+            args += ['--', prefix]
+        for record in run_git(self.toplevel, *args).split(b'\0'):
+            if not record:
+                continue
+            meta, name = record.split(b'\t', 1)
+            _, obj_type, oid, size = meta.split()
+            if obj_type != b'blob':
+                continue
+            path = self.toplevel / name.decode('utf-8', 'surrogateescape')
+            self.blobs[path] = (oid, int(size))
+            for parent in path.parents:
+                if parent in self.dirs or parent == self.toplevel:
+                    break
+                self.dirs.add(parent)
+        self.dirs.add(self.toplevel)
+
+        self.process = None
+
+    def project_files(self, excludes=None):
+        """按项目目录遍历的规则收集提交中的pom.xml和Java文件"""
+        excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+        files = ProjectFiles(self.project_path)
+        for path in sorted(self.blobs, key=walk_order):
+            try:
+                rel_path = path.relative_to(self.project_path)
+            except ValueError:
+                continue
+            if is_excluded(rel_path, excludes, self.is_module_root):
+                continue
+            if path.name == 'pom.xml':
+                files.pom_files.append(path)
+            elif path.name.endswith('.java'):
+                files.java_files.append(path)
+        return files
+
+    def is_module_root(self, rel_dir):
+        """提交中该目录（相对项目目录）是否含构建文件"""
+        directory = self.project_path / rel_dir
+        return any(directory / name in self.blobs for name in MODULE_FILES)
+
+    def is_file(self, path):
+        return normalize(path) in self.blobs
+
+    def is_dir(self, path):
+        return normalize(path) in self.dirs
+
+    def size(self, path):
+        return self.blobs[normalize(path)][1]
+
+    def read_bytes(self, path):
+        """通过常驻的cat-file进程读取blob内容"""
+        oid, _ = self.blobs[normalize(path)]
+        if self.process is None:
+            self.process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.toplevel,
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.process.stdin.write(oid + b'\n')
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b'blob':
+            raise RuntimeError(f"读取git对象失败: {oid.decode('ascii')} ({path})")
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)
+        return data
+
+    def parse(self, path):
+        return ET.parse(io.BytesIO(self.read_bytes(path)))
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
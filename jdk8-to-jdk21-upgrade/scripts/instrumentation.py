@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+分阶段性能记录
+记录每个阶段的墙钟时间、CPU时间、读取字节数、打开/跳过的文件数和主进程的阶段峰值RSS，
+结果写入各脚本的JSON输出，并可导出为Chrome trace事件文件或cProfile数据
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块，不记录峰值内存
+    resource = None
+
+COUNTERS = ('bytes_read', 'files_opened', 'files_skipped')
+
+# Linux下可清零进程的RSS高水位（VmHWM），从而分阶段测量峰值
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+
+def process_peak_rss_mb():
+    """整个运行期间当前进程及已回收子进程（如进程池）的峰值RSS（MB），不能用于区分阶段"""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak * scale / 1024 / 1024, 1)
+
+
+def read_rss_high_water():
+    """当前进程自上次清零以来的RSS高水位（KB），不支持时返回None"""
+    try:
+        with open(PROC_STATUS, 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_rss_high_water():
+    """把RSS高水位清零为当前RSS，成功时返回True"""
+    try:
+        with open(PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def cpu_seconds():
+    """当前进程及已回收子进程的CPU时间"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class PhaseRecorder:
+    """按阶段记录耗时和计数"""
+
+    def __init__(self):
+        self.phases = []
+        self.current = None
+        self.origin = time.perf_counter()
+        # 阶段开始时清零高水位；清零前先把已达到的峰值记入外层阶段和整个运行期间的峰值
+        self.high_water = {}
+        self.process_high_water = 0
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个阶段，阶段内通过add累加计数"""
+        record = {'name': name, **{counter: 0 for counter in COUNTERS}}
+        previous = self.current
+        self.note_high_water(previous)
+        tracked = reset_rss_high_water()
+        self.current = record
+        start_wall = time.perf_counter()
+        start_cpu = cpu_seconds()
+        try:
+            yield record
+        finally:
+            end_wall = time.perf_counter()
+            record['start_seconds'] = round(start_wall - self.origin, 6)
+            record['wall_seconds'] = round(end_wall - start_wall, 6)
+            record['cpu_seconds'] = round(cpu_seconds() - start_cpu, 6)
+            # 阶段峰值只统计主进程；工作进程的峰值见total中的process_peak_rss_mb
+            record['peak_rss_mb'] = None
+            if tracked:
+                self.note_high_water(record)
+                peak = self.high_water.pop(id(record), None)
+                if peak is not None:
+                    record['peak_rss_mb'] = round(peak / 1024, 1)
+                    if previous is not None:
+                        self.high_water[id(previous)] = max(self.high_water.get(id(previous), 0), peak)
+            self.phases.append(record)
+            self.current = previous
+
+    def note_high_water(self, record):
+        """把当前高水位计入阶段记录（可为None）和整个运行期间的峰值"""
+        peak = read_rss_high_water()
+        if peak is None:
+            return
+        self.process_high_water = max(self.process_high_water, peak)
+        if record is not None:
+            self.high_water[id(record)] = max(self.high_water.get(id(record), 0), peak)
+
+    def add(self, **counts):
+        """累加当前阶段的计数（bytes_read、files_opened、files_skipped）"""
+        if self.current is None:
+            return
+        for counter, value in counts.items():
+            self.current[counter] += value
+
+    def to_dict(self):
+        totals = {counter: sum(phase[counter] for phase in self.phases) for counter in COUNTERS}
+        totals['wall_seconds'] = round(sum(phase['wall_seconds'] for phase in self.phases), 6)
+        totals['cpu_seconds'] = round(sum(phase['cpu_seconds'] for phase in self.phases), 6)
+        # 清零高水位后ru_maxrss同样被清零，需与各阶段记录的峰值合并
+        self.note_high_water(None)
+        peaks = [process_peak_rss_mb(), round(self.process_high_water / 1024, 1) if self.process_high_water else None]
+        peaks = [peak for peak in peaks if peak is not None]
+        totals['process_peak_rss_mb'] = max(peaks) if peaks else None
+        if totals['wall_seconds']:
+            totals['mb_per_sec'] = round(totals['bytes_read'] / 1024 / 1024 / totals['wall_seconds'], 2)
+            totals['files_per_sec'] = round(totals['files_opened'] / totals['wall_seconds'], 1)
+        return {'phases': self.phases, 'total': totals}
+
+    def write_trace(self, path):
+        """导出为Chrome trace事件格式（可在chrome://tracing或Perfetto中打开）"""
+        events = [{
+            'name': phase['name'],
+            'ph': 'X',
+            'ts': int(phase['start_seconds'] * 1e6),
+            'dur': int(phase['wall_seconds'] * 1e6),
+            'pid': os.getpid(),
+            'tid': 0,
+            'args': {key: value for key, value in phase.items()
+                     if key not in ('name', 'start_seconds', 'wall_seconds')}
+        } for phase in self.phases]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
+
+
+@contextmanager
+def profile_session(path, recorder):
+    """--profile输出：.json后缀导出Chrome trace，其余后缀保存cProfile数据（可用pstats/snakeviz查看）"""
+    if not path:
+        yield
+        return
+
+    profiler = None
+    if not str(path).endswith('.json'):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            recorder.write_trace(path)
+        print(f"性能数据已保存: {path}")
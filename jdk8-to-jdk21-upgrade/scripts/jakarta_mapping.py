@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+javax到jakarta映射表加载器
+解析references/javax_jakarta_mapping.json，编译为包名前缀树及对应的单个字节正则，
+编译结果按映射文件哈希缓存到磁盘，迁移脚本和分析脚本共用同一套规则
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from upgrade_cache import get_cache_dir
+
+MAPPING_FILE = Path(__file__).resolve().parent.parent / 'references' / 'javax_jakarta_mapping.json'
+
+# 编译格式版本，生成逻辑变化时旧缓存自动失效
+COMPILED_FORMAT = 1
+
+# 进程内已加载的映射表，避免重复读取
+_loaded_tables = {}
+
+
+class MappingTable:
+    """编译后的映射表：包名映射、前缀树和由前缀树生成的正则"""
+
+    def __init__(self, mappings, trie, package_regex, version):
+        self.mappings = mappings
+        self.trie = trie
+        self.package_regex = package_regex
+        self.version = version
+
+        # 包名均为ASCII，正则直接作用于原始字节，与源文件编码无关
+        pattern = package_regex.encode('ascii')
+        self.target_bytes = {old: new.encode('ascii') for old, new in mappings.items()}
+
+        # import语句: 分组1为static修饰，分组2为命中的最具体包前缀，分组3为剩余部分
+        self.import_pattern = re.compile(
+            rb'import\s+(static\s+)?(' + pattern + rb')\.([a-zA-Z0-9_.*]+);')
+
+        # 代码中任意位置的全限定名引用（包括import语句）: 分组1为命中的包前缀
+        self.reference_pattern = re.compile(rb'(?<![\w.])(' + pattern + rb')(?=\.[a-zA-Z_*])')
+
+    def longest_prefix(self, qualified_name, separator='.'):
+        """返回限定名命中的最具体映射规则（javax包名），未命中时返回None"""
+        node = self.trie
+        matched = None
+        parts = qualified_name.split(separator)
+        for i, part in enumerate(parts):
+            node = node['children'].get(part)
+            if node is None:
+                break
+            if 'target' in node:
+                matched = '.'.join(parts[:i + 1])
+        return matched
+
+
+    def shortest_prefix(self, qualified_name, separator='.'):
+        """返回限定名命中的最上层映射规则（如javax.servlet.http.HttpServlet -> javax.servlet），未命中时返回None
+
+        映射表中存在嵌套规则（javax.servlet与javax.servlet.http），按API族统计时归并到最上层规则。
+        """
+        node = self.trie
+        parts = qualified_name.split(separator)
+        for i, part in enumerate(parts):
+            node = node['children'].get(part)
+            if node is None:
+                return None
+            if 'target' in node:
+                return '.'.join(parts[:i + 1])
+        return None
+
+
+def build_trie(mappings):
+    """按包名分段构建前缀树，映射规则的终点节点记录目标包名"""
+    trie = {'children': {}}
+    for old_pkg, new_pkg in mappings.items():
+        node = trie
+        for segment in old_pkg.split('.'):
+            node = node['children'].setdefault(segment, {'children': {}})
+        node['target'] = new_pkg
+    return trie
+
+
+def trie_regex(node):
+    """由前缀树生成正则：公共前缀只匹配一次，子规则可选且优先匹配更具体的包"""
+    alternatives = []
+    for segment in sorted(node['children'], key=lambda s: (-len(s), s)):
+        child = node['children'][segment]
+        part = re.escape(segment)
+        if child['children']:
+            sub = trie_regex(child)
+            part += rf'(?:\.{sub})?' if 'target' in child else rf'\.{sub}'
+        alternatives.append(part)
+
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+def load_mapping_table(mapping_file=MAPPING_FILE):
+    """加载映射表，优先使用按文件哈希缓存的编译结果"""
+    mapping_file = Path(mapping_file)
+    if mapping_file in _loaded_tables:
+        return _loaded_tables[mapping_file]
+
+    raw = mapping_file.read_bytes()
+    version = hashlib.sha256(raw + f'format={COMPILED_FORMAT}'.encode('ascii')).hexdigest()
+
+    compiled = None
+    cache_file = None
+    try:
+        cache_file = get_cache_dir() / f'javax_jakarta_mapping-{version[:16]}.json'
+        if cache_file.exists():
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                compiled = json.load(f)
+            if compiled.get('version') != version:
+                compiled = None
+    except (OSError, ValueError):
+        compiled = None
+
+    if compiled is None:
+        mappings = json.loads(raw.decode('utf-8'))['package_mappings']
+        trie = build_trie(mappings)
+        compiled = {
+            'version': version,
+            'mappings': mappings,
+            'trie': trie,
+            'package_regex': trie_regex(trie)
+        }
+        if cache_file is not None:
+            try:
+                temp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(compiled, f, ensure_ascii=False)
+                os.replace(temp_file, cache_file)
+            except OSError:
+                pass
+
+    table = MappingTable(compiled['mappings'], compiled['trie'], compiled['package_regex'], version)
+    _loaded_tables[mapping_file] = table
+    return table
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Java源文件读取工具
+按原始字节读取源文件，在正则匹配之前用字节级预过滤跳过无关文件
+"""
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+# 超过该大小的文件通过mmap读取，预过滤时无需把整个文件复制进内存
+MMAP_THRESHOLD = 1024 * 1024
+
+# 迁移只关心javax引用（分析脚本在此基础上加入API规则的标记）
+MIGRATION_MARKERS = (b'javax.',)
+
+# 注释以及字符串/字符字面量（含文本块）；字面量整体匹配，其中的//、/*不会被当作注释开始
+COMMENT_OR_LITERAL = re.compile(
+    rb'"""[\s\S]*?"""|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|//[^\n]*|/\*[\s\S]*?\*/')
+NOT_NEWLINE = re.compile(rb'[^\n]')
+
+
+def blank_comment(match):
+    text = match.group()
+    if text[:1] != b'/':
+        return text
+    return NOT_NEWLINE.sub(b' ', text)
+
+
+def blank_comments(content):
+    """把注释替换为空格（保留换行，行号不变），字符串字面量原样保留"""
+    return COMMENT_OR_LITERAL.sub(blank_comment, content)
+
+
+@contextmanager
+def source_buffer(path):
+    """以只读方式打开源文件，小文件返回bytes，大文件返回mmap"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+        else:
+            yield f.read()
+
+
+def contains_any(buffer, markers):
+    """字节级判断缓冲区中是否包含任一标记"""
+    return any(buffer.find(marker) != -1 for marker in markers)
+
+
+def skip_ratio(skipped, scanned):
+    """计算预过滤跳过比例"""
+    return round(skipped / scanned, 4) if scanned else 0.0
+
+
+# 顶层类型声明：可选的注解和修饰符之后紧跟class/interface/enum/record/@interface
+TYPE_DECLARATION = re.compile(
+    rb'\s*(?:@(?!interface\b)[\w.]+(?:\s*\([^)]*\))?\s*)*'
+    rb'(?:(?:public|protected|private|abstract|final|static|strictfp|sealed|non-sealed)\s+)*'
+    rb'(?:class|interface|enum|record|@interface)\b'
+)
+
+
+def strip_comments(line, in_comment):
+    """去掉一行中的注释部分，返回(代码部分, 行尾是否仍处于块注释中)"""
+    code = []
+    pos = 0
+    while pos < len(line):
+        if in_comment:
+            end = line.find(b'*/', pos)
+            if end == -1:
+                break
+            in_comment = False
+            pos = end + 2
+            continue
+
+        block = line.find(b'/*', pos)
+        single = line.find(b'//', pos)
+        if single != -1 and (block == -1 or single < block):
+            code.append(line[pos:single])
+            break
+        if block == -1:
+            code.append(line[pos:])
+            break
+        code.append(line[pos:block])
+        in_comment = True
+        pos = block + 2
+    return b' '.join(code), in_comment
+
+
+def read_header(stream):
+    """从二进制流中读取第一个顶层类型声明之前的文件头（package/import部分）
+
+    返回(文件头字节, 声明所在行)，流停在声明行之后，其余内容可原样复制。
+    没有类型声明的文件（如package-info.java）整体作为文件头返回。
+    """
+    header = []
+    in_comment = False
+    for line in stream:
+        code, in_comment = strip_comments(line, in_comment)
+        if code.strip() and TYPE_DECLARATION.match(code):
+            return b''.join(header), line
+        header.append(line)
+    return b''.join(header), b''
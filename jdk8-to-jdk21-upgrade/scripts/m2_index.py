@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+本地Maven仓库构件版本索引
+遍历 ~/.m2/repository，按groupId:artifactId记录本地可用的版本，持久化到用户缓存目录。
+每个目录记录修改时间和子目录列表，再次刷新时修改时间未变的目录不再列出内容，只需逐个stat；
+查询直接读取索引，不再搜索文件系统。供离线环境下选择本地已有的JDK 21兼容版本
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from dependency_catalog import QUALIFIER_RANKS, version_key
+from upgrade_cache import get_cache_dir
+
+# 索引结构版本，变化时旧索引自动重建
+INDEX_VERSION = 1
+
+DEFAULT_M2_REPOSITORY = Path.home() / '.m2' / 'repository'
+
+# 本地install的构件在构件目录中记录的元数据
+LOCAL_METADATA = 'maven-metadata-local.xml'
+
+ARTIFACT_SUFFIXES = ('.pom', '.jar')
+
+# 正式版对应的限定符排名，低于该值的为alpha/beta/milestone/rc/snapshot
+RELEASE_RANK = QUALIFIER_RANKS['']
+
+
+def index_path_for(repository):
+    """仓库对应的索引数据库路径（按仓库绝对路径区分）"""
+    repository = Path(repository).resolve()
+    key = hashlib.sha256(str(repository).encode('utf-8')).hexdigest()[:16]
+    return get_cache_dir() / 'm2' / f'{repository.name}-{key}.sqlite'
+
+
+def metadata_versions(path):
+    """读取maven-metadata-local.xml中列出的版本"""
+    try:
+        root = ET.parse(path).getroot()
+    except (ET.ParseError, OSError):
+        return []
+    return [element.text.strip() for element in root.iter('version')
+            if element.text and element.text.strip()] if root.tag == 'metadata' else []
+
+
+def coordinate_of(relative_dir):
+    """版本目录的相对路径（group/.../artifactId/version）对应的groupId:artifactId和版本"""
+    parts = relative_dir.split('/')
+    if len(parts) < 3:
+        return None, None
+    return f"{'.'.join(parts[:-2])}:{parts[-2]}", parts[-1]
+
+
+class M2Index:
+    """本地仓库版本索引
+
+    dirs表记录每个目录的修改时间、子目录列表、是否为版本目录（含"artifactId-版本"开头的pom/jar），
+    以及构件目录中maven-metadata-local.xml列出的版本；versions表由此派生出每个groupId:artifactId
+    的可用版本。目录中新增或删除条目都会改变该目录的修改时间，因此修改时间未变的目录可直接沿用记录。
+    """
+
+    def __init__(self, repository=DEFAULT_M2_REPOSITORY, db_path=None):
+        self.repository = Path(repository)
+        self.db_path = Path(db_path) if db_path else index_path_for(self.repository)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats = {'directories': 0, 'rescanned': 0, 'removed': 0, 'artifacts': 0, 'versions': 0, 'seconds': 0.0}
+        self._versions = {}
+
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS dirs ('
+            ' path TEXT PRIMARY KEY,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' subdirs TEXT NOT NULL,'
+            ' artifact INTEGER NOT NULL,'
+            ' metadata TEXT)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS versions ('
+            ' coordinate TEXT NOT NULL,'
+            ' version TEXT NOT NULL,'
+            ' PRIMARY KEY (coordinate, version))')
+        meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+        if meta.get('index_version') != str(INDEX_VERSION):
+            with self.conn:
+                self.conn.execute('DELETE FROM dirs')
+                self.conn.execute('DELETE FROM versions')
+                self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                  ('index_version', str(INDEX_VERSION)))
+
+    def refresh(self):
+        """增量更新索引：只重新列出修改时间变化的目录，返回统计信息"""
+        started = time.perf_counter()
+        dirs = {path: (mtime_ns, subdirs, artifact, metadata) for path, mtime_ns, subdirs, artifact, metadata in
+                self.conn.execute('SELECT path, mtime_ns, subdirs, artifact, metadata FROM dirs')}
+
+        updates = []
+        added = []
+        deleted = []
+        seen = set()
+        pending = ['']
+        while pending:
+            relative = pending.pop()
+            path = os.path.join(self.repository, relative) if relative else str(self.repository)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(relative)
+
+            known = dirs.get(relative)
+            if known is not None and known[0] == mtime_ns:
+                subdirs = json.loads(known[1])
+            else:
+                subdirs, artifact, metadata = self.scan_directory(path, relative)
+                updates.append((relative, mtime_ns, json.dumps(subdirs), int(artifact),
+                                json.dumps(metadata) if metadata is not None else None))
+                was_artifact = known is not None and known[2]
+                if artifact and not was_artifact:
+                    added.append(coordinate_of(relative))
+                elif was_artifact and not artifact:
+                    deleted.append(coordinate_of(relative))
+                # 构件目录的元数据变化时，其中列出且目录存在的版本同样计入
+                if metadata:
+                    added.extend((coordinate_of(f'{relative}/{version}')[0], version)
+                                 for version in metadata if version in subdirs)
+            pending.extend(f'{relative}/{name}' if relative else name for name in reversed(subdirs))
+
+        # 被删除的目录可能是版本目录（含仅由元数据列出的版本），删除不存在的版本记录不产生影响
+        removed = [path for path in dirs if path not in seen]
+        deleted.extend(coordinate_of(path) for path in removed)
+
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO dirs (path, mtime_ns, subdirs, artifact, metadata) VALUES (?, ?, ?, ?, ?)',
+                updates)
+            self.conn.executemany('DELETE FROM dirs WHERE path = ?', [(path,) for path in removed])
+            self.conn.executemany('DELETE FROM versions WHERE coordinate = ? AND version = ?',
+                                  [item for item in deleted if item[0]])
+            self.conn.executemany('INSERT OR IGNORE INTO versions (coordinate, version) VALUES (?, ?)',
+                                  [item for item in added if item[0]])
+        self._versions = {}
+
+        self.stats['directories'] = len(seen)
+        self.stats['rescanned'] = len(updates)
+        self.stats['removed'] = len(removed)
+        self.stats['artifacts'], self.stats['versions'] = self.conn.execute(
+            'SELECT COUNT(DISTINCT coordinate), COUNT(*) FROM versions').fetchone()
+        self.stats['seconds'] = round(time.perf_counter() - started, 3)
+        return self.stats
+
+    def scan_directory(self, path, relative):
+        """列出目录内容，返回(子目录列表, 是否为版本目录, maven-metadata-local.xml中的版本)"""
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            return [], False, None
+        subdirs.sort()
+
+        # 版本目录中的构件文件名以"artifactId-"开头（快照版本带时间戳，不一定包含目录名）
+        parent = relative.rpartition('/')[0].rpartition('/')[2]
+        prefix = f'{parent}-'
+        artifact = bool(parent) and any(name.startswith(prefix) and name.endswith(ARTIFACT_SUFFIXES)
+                                        for name in files)
+        metadata = metadata_versions(os.path.join(path, LOCAL_METADATA)) if LOCAL_METADATA in files else None
+        return subdirs, artifact, metadata
+
+    def sorted_versions(self, group_id, artifact_id):
+        """本地可用版本的(比较键, 版本)列表，从旧到新排列；每个构件只查询和解析一次"""
+        coordinate = f'{group_id}:{artifact_id}'
+        versions = self._versions.get(coordinate)
+        if versions is None:
+            rows = self.conn.execute('SELECT version FROM versions WHERE coordinate = ?', (coordinate,))
+            versions = self._versions[coordinate] = sorted((version_key(row[0]), row[0]) for row in rows)
+        return versions
+
+    def versions(self, group_id, artifact_id):
+        """本地可用的全部版本，按Maven版本顺序从旧到新排列"""
+        return [version for _, version in self.sorted_versions(group_id, artifact_id)]
+
+    def has(self, group_id, artifact_id, version):
+        """本地是否存在该版本"""
+        return any(candidate == version for _, candidate in self.sorted_versions(group_id, artifact_id))
+
+    def newest(self, group_id, artifact_id, minimum=None, allow_prerelease=False, line=None):
+        """不低于minimum的最新本地版本（默认跳过预发布版本），没有时返回None
+
+        line为版本前缀（如'3'、'2023.0'），指定时只在开头各段与之相同的版本中选择，用于限定主版本或发布列车。
+        """
+        floor = version_key(minimum) if minimum else None
+        line_parts = line.split('.') if line else None
+        for key, version in reversed(self.sorted_versions(group_id, artifact_id)):
+            if floor is not None and key < floor:
+                return None
+            if line_parts and re.split(r'[.-]', version)[:len(line_parts)] != line_parts:
+                continue
+            if allow_prerelease or not any(kind == 1 and rank < RELEASE_RANK for kind, rank, _ in key):
+                return version
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("用法: python m2_index.py [repository] [--query groupId:artifactId] [--min VERSION [--line PREFIX]]")
+        print("\n选项:")
+        print(f"  repository              本地Maven仓库路径（默认 {DEFAULT_M2_REPOSITORY}）")
+        print("  --query G:A             查询构件的本地可用版本")
+        print("  --min VERSION           与--query一起使用：输出不低于该版本的最新正式版")
+        print("  --line PREFIX           与--min一起使用：只在该版本前缀（如 3 或 2023.0）内选择")
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('--'):
+        repository = Path(sys.argv[1])
+    else:
+        repository = DEFAULT_M2_REPOSITORY
+    if not repository.is_dir():
+        print(f"错误: 本地Maven仓库不存在: {repository}")
+        sys.exit(1)
+
+    index = M2Index(repository)
+    stats = index.refresh()
+    print(f"本地仓库索引: {repository}")
+    print(f"  ✓ {stats['directories']}个目录 (重新列出 {stats['rescanned']}个，移除 {stats['removed']}个，{stats['seconds']}s)")
+    print(f"  ✓ {stats['artifacts']}个构件, {stats['versions']}个版本")
+    print(f"  索引文件: {index.db_path}")
+
+    query = get_option_value('--query')
+    if query:
+        if query.count(':') != 1:
+            print("错误: --query 参数格式应为 groupId:artifactId")
+            sys.exit(1)
+        group_id, artifact_id = query.split(':')
+        versions = index.versions(group_id, artifact_id)
+        print(f"\n{query}: {', '.join(versions) if versions else '本地无可用版本'}")
+        minimum = get_option_value('--min')
+        if minimum:
+            line = get_option_value('--line')
+            newest = index.newest(group_id, artifact_id, minimum, line=line)
+            scope = f"（{line}.x）" if line else ''
+            print(f"  不低于 {minimum} 的最新正式版{scope}: {newest or '无'}")
+    index.close()
+
+if __name__ == '__main__':
+    main()
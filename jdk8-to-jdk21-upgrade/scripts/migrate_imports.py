@@ -6,15 +6,30 @@ Java源代码import语句迁移脚本
 
 import os
 import sys
-import re
+import hashlib
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import json
 
+from atomic_write import AtomicBatchWriter, write_temp
+from git_changes import changed_files
+from instrumentation import PhaseRecorder, profile_session
+from jakarta_mapping import load_mapping_table
+from java_source import MIGRATION_MARKERS, contains_any, read_header, skip_ratio, source_buffer
+
 class ImportMigrator:
-    def __init__(self, src_path, dry_run=False):
+    # 清单文件格式版本，格式变化时旧清单自动失效
+    MANIFEST_VERSION = 1
+    
+    def __init__(self, src_path, dry_run=False, jobs=1, manifest_path=None, full_body=False, since=None):
         self.src_path = Path(src_path)
         self.dry_run = dry_run
+        self.jobs = jobs
+        self.full_body = full_body
+        self.since = since
+        self.recorder = PhaseRecorder()
+        self.manifest_path = Path(manifest_path) if manifest_path else None
         
         # 加载映射配置
         self.load_mappings()
@@ -23,140 +38,277 @@ class ImportMigrator:
             'total_files': 0,
             'modified_files': 0,
             'total_replacements': 0,
+            'skipped_files': 0,
+            'prefiltered_files': 0,
+            'prefilter_skip_ratio': 0.0,
             'by_package': {}
         }
     
     def load_mappings(self):
-        """加载javax到jakarta的映射"""
-        self.mappings = {
-            # Servlet
-            'javax.servlet': 'jakarta.servlet',
-            
-            # Persistence (JPA)
-            'javax.persistence': 'jakarta.persistence',
-            
-            # Bean Validation
-            'javax.validation': 'jakarta.validation',
-            
-            # Common Annotations
-            'javax.annotation': 'jakarta.annotation',
-            
-            # Transaction
-            'javax.transaction': 'jakarta.transaction',
-            
-            # WebSocket
-            'javax.websocket': 'jakarta.websocket',
-            
-            # JAX-RS
-            'javax.ws.rs': 'jakarta.ws.rs',
-            
-            # JSON Processing
-            'javax.json': 'jakarta.json',
-            
-            # JSON Binding
-            'javax.json.bind': 'jakarta.json.bind',
-            
-            # XML Binding (JAXB)
-            'javax.xml.bind': 'jakarta.xml.bind',
-            
-            # JavaMail
-            'javax.mail': 'jakarta.mail',
-            
-            # Activation
-            'javax.activation': 'jakarta.activation',
-            
-            # EJB
-            'javax.ejb': 'jakarta.ejb',
-            
-            # JMS
-            'javax.jms': 'jakarta.jms',
-            
-            # Security
-            'javax.security.auth': 'jakarta.security.auth',
-            'javax.security.enterprise': 'jakarta.security.enterprise',
-            
-            # Inject
-            'javax.inject': 'jakarta.inject',
-            
-            # Interceptors
-            'javax.interceptor': 'jakarta.interceptor',
-            
-            # Decorator
-            'javax.decorator': 'jakarta.decorator',
-            
-            # Expression Language
-            'javax.el': 'jakarta.el',
-            
-            # JSF
-            'javax.faces': 'jakarta.faces',
-            
-            # Server Pages
-            'javax.servlet.jsp': 'jakarta.servlet.jsp',
+        """加载javax到jakarta的映射（references/javax_jakarta_mapping.json，与分析脚本共用）"""
+        self.mapping_table = load_mapping_table()
+        self.mappings = self.mapping_table.mappings
+        
+        # 由前缀树生成的单个正则，一次扫描完成全部替换，嵌套前缀优先匹配最具体的规则
+        self.import_pattern = self.mapping_table.import_pattern
+        self.reference_pattern = self.mapping_table.reference_pattern
+        
+        # 映射表版本：规则或扫描模式变化后清单中的记录全部失效
+        mapping_source = json.dumps([self.mapping_table.version, self.full_body])
+        self.mapping_version = hashlib.sha256(mapping_source.encode('utf-8')).hexdigest()
+    
+    def load_manifest(self):
+        """加载增量迁移清单，映射规则变化或格式不符时返回空清单"""
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return {}
+        
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ 清单文件无法读取，将全量处理: {e}")
+            return {}
+        
+        if (manifest.get('version') != self.MANIFEST_VERSION
+                or manifest.get('mapping_version') != self.mapping_version):
+            print("  ⚠ 映射规则已变化，清单失效，将全量处理")
+            return {}
+        
+        return manifest.get('files', {})
+    
+    def save_manifest(self, files):
+        """保存增量迁移清单"""
+        manifest = {
+            'version': self.MANIFEST_VERSION,
+            'mapping_version': self.mapping_version,
+            'updated_at': datetime.now().isoformat(),
+            'files': files
         }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
     
     def migrate(self):
         """执行迁移"""
         print(f"{'[预览模式] ' if self.dry_run else ''}开始迁移: {self.src_path}")
+        print(f"扫描模式: {'全文' if self.full_body else '文件头（仅import）'}")
         print("=" * 60)
         
-        # 查找所有Java文件
-        java_files = list(self.src_path.rglob('*.java'))
-        self.stats['total_files'] = len(java_files)
+        with self.recorder.phase('collect'):
+            pending_files, known_hashes = self.collect_files()
         
-        print(f"找到 {len(java_files)} 个Java文件")
-        print()
+        # 迁移每个文件（结果按文件列表顺序汇总，保证与串行执行输出一致）
+        # 修改内容先写入临时文件，全部处理完成后统一落盘并替换；中途失败时原文件保持不变
+        self.writer = AtomicBatchWriter()
+        try:
+            with self.recorder.phase('migrate'):
+                if self.jobs > 1 and len(pending_files) > 1:
+                    chunksize = max(1, len(pending_files) // (self.jobs * 8))
+                    with ProcessPoolExecutor(max_workers=self.jobs,
+                                             initializer=init_worker,
+                                             initargs=(str(self.src_path), self.dry_run, self.full_body)) as executor:
+                        for result in executor.map(migrate_in_worker, pending_files, known_hashes,
+                                                   chunksize=chunksize):
+                            self.record_result(result)
+                else:
+                    for java_file, known_hash in zip(pending_files, known_hashes):
+                        self.record_result(self.migrate_file(java_file, known_hash))
+            
+            with self.recorder.phase('commit'):
+                self.writer.commit()
+        except BaseException:
+            # 并行模式下工作进程可能已写好临时文件但尚未返回给主进程登记，一并清理
+            self.writer.abort(pending_files if self.jobs > 1 else ())
+            raise
         
-        # 迁移每个文件
-        for java_file in java_files:
-            self.migrate_file(java_file)
+        scanned_files = self.stats['total_files'] - self.stats['skipped_files']
+        self.stats['prefilter_skip_ratio'] = skip_ratio(self.stats['prefiltered_files'], scanned_files)
+        
+        # 保存清单（预览模式不落盘）
+        if self.manifest_path is not None and not self.dry_run:
+            with self.recorder.phase('manifest'):
+                self.save_manifest(self.manifest_files)
+        
+        self.stats['performance'] = self.recorder.to_dict()
         
         # 输出统计
         self.print_stats()
         
         return self.stats
     
-    def migrate_file(self, file_path):
-        """迁移单个Java文件"""
+    def collect_files(self):
+        """列出待处理的Java文件，并按增量清单筛掉未变化的文件，返回(待处理文件, 清单中的内容哈希)"""
+        previous = self.load_manifest()
+        self.manifest_files = {}
+        
+        # 查找Java文件：--since模式只取git报告的变更文件，其余文件的清单记录原样保留
+        if self.since is not None:
+            changes = changed_files(self.src_path, self.since, excludes=[])
+            root = self.src_path.resolve()
+            current = {path.relative_to(root).as_posix() for path in changes.changed + changes.deleted}
+            self.manifest_files = {path: entry for path, entry in previous.items() if path not in current}
+            java_files = [self.src_path / path.relative_to(root) for path in changes.changed]
+            print(f"自 {self.since} 以来变更 {len(java_files)} 个Java文件，删除 {len(changes.deleted)} 个")
+        else:
+            java_files = list(self.src_path.rglob('*.java'))
+            print(f"找到 {len(java_files)} 个Java文件")
+        self.stats['total_files'] = len(java_files)
+        print()
+        
+        # 根据清单筛选：大小和修改时间均未变化的文件直接跳过，不再打开
+        pending_files = []
+        known_hashes = []
+        for java_file in java_files:
+            relative_path = java_file.relative_to(self.src_path).as_posix()
+            entry = previous.get(relative_path)
+            if entry is not None:
+                stat = java_file.stat()
+                if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                    self.manifest_files[relative_path] = entry
+                    self.stats['skipped_files'] += 1
+                    self.recorder.add(files_skipped=1)
+                    continue
+            pending_files.append(java_file)
+            known_hashes.append(entry['sha256'] if entry else None)
+        return pending_files, known_hashes
+    
+    def migrate_file(self, file_path, known_hash=None):
+        """迁移单个Java文件，返回该文件的处理结果
+        
+        known_hash为清单中记录的内容哈希，内容未变化时跳过规则匹配。
+        """
+        result = {
+            'path': file_path,
+            'replacements': 0,
+            'by_package': {},
+            'skipped': False,
+            'prefiltered': False,
+            'staged': None,
+            'manifest_entry': None,
+            'bytes_read': 0,
+            'error': None
+        }
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
+            original_content = None
+            if self.full_body:
+                # 全文模式：整个文件参与匹配
+                with source_buffer(file_path) as data:
+                    result['bytes_read'] = len(data)
+                    content_hash = hashlib.sha256(data).hexdigest()
+                    if not self.check_skip(result, content_hash, known_hash, data):
+                        original_content = data[:]
+            else:
+                # 文件头模式：只读取到第一个类型声明为止，清单哈希也只针对文件头
+                with open(file_path, 'rb') as f:
+                    header, declaration = read_header(f)
+                result['bytes_read'] = len(header) + len(declaration)
+                content_hash = hashlib.sha256(header).hexdigest()
+                if not self.check_skip(result, content_hash, known_hash, header):
+                    original_content = header
             
-            modified_content = original_content
-            file_replacements = 0
-            
-            # 对每个映射规则进行替换
-            for old_pkg, new_pkg in self.mappings.items():
-                # 匹配import语句
-                pattern = rf'import\s+{re.escape(old_pkg)}\.([a-zA-Z0-9_.*]+);'
-                replacement = rf'import {new_pkg}.\1;'
-                
-                # 执行替换并统计
-                new_content, count = re.subn(pattern, replacement, modified_content)
+            if original_content is not None:
+                by_package = result['by_package']
+                target_bytes = self.mapping_table.target_bytes
                 
-                if count > 0:
-                    modified_content = new_content
-                    file_replacements += count
+                # 直接在字节上匹配和替换（包名均为ASCII），任何源文件编码均可处理，
+                # 且不需要逐文件解码/编码，未命中的字节保持不变
+                if self.full_body:
+                    pattern = self.reference_pattern
                     
-                    # 统计
-                    if old_pkg not in self.stats['by_package']:
-                        self.stats['by_package'][old_pkg] = 0
-                    self.stats['by_package'][old_pkg] += count
-            
-            # 如果有修改
-            if modified_content != original_content:
-                self.stats['modified_files'] += 1
-                self.stats['total_replacements'] += file_replacements
+                    def replace(match):
+                        old_pkg = match.group(1).decode('ascii')
+                        by_package[old_pkg] = by_package.get(old_pkg, 0) + 1
+                        return target_bytes[old_pkg]
+                else:
+                    pattern = self.import_pattern
+                    
+                    def replace(match):
+                        static, old_pkg, rest = match.groups()
+                        old_pkg = old_pkg.decode('ascii')
+                        by_package[old_pkg] = by_package.get(old_pkg, 0) + 1
+                        return b'import ' + (static or b'') + target_bytes[old_pkg] + b'.' + rest + b';'
                 
-                relative_path = file_path.relative_to(self.src_path)
-                print(f"  ✓ {relative_path} ({file_replacements}处修改)")
+                # 单次扫描替换所有映射规则
+                modified_content, file_replacements = pattern.subn(replace, original_content)
                 
-                # 写回文件（非预览模式）
-                if not self.dry_run:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(modified_content)
+                # 如果有修改
+                if modified_content != original_content:
+                    result['replacements'] = file_replacements
+                    
+                    # 预览模式下文件仍待迁移，不记入清单
+                    if self.dry_run:
+                        return result
+                    
+                    # 写入同级临时文件（文件头模式下类型声明之后的内容按字节流式复制），
+                    # 由主进程在全部文件处理完成后统一落盘并替换原文件
+                    if self.full_body:
+                        result['staged'] = write_temp(file_path, [modified_content])
+                    else:
+                        with open(file_path, 'rb') as f:
+                            f.seek(len(header))
+                            result['staged'] = write_temp(file_path, [modified_content, f])
+                    content_hash = hashlib.sha256(modified_content).hexdigest()
+            
+            # 重命名不改变修改时间，清单直接记录临时文件的大小和修改时间
+            stat = os.stat(result['staged'] or file_path)
+            result['manifest_entry'] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': content_hash
+            }
         
         except Exception as e:
-            print(f"  ✗ 处理失败: {file_path} - {e}")
+            if result['staged'] is not None:
+                result['staged'].unlink(missing_ok=True)
+                result['staged'] = None
+            result['error'] = str(e)
+        
+        return result
+    
+    def check_skip(self, result, content_hash, known_hash, data):
+        """判断文件是否可跳过匹配：内容与清单一致，或不含javax引用"""
+        if known_hash is not None and content_hash == known_hash:
+            # 仅修改时间变化（如rebase后），内容已处理过
+            result['skipped'] = True
+        elif not contains_any(data, MIGRATION_MARKERS):
+            # 不含javax引用，跳过正则匹配
+            result['prefiltered'] = True
+        return result['skipped'] or result['prefiltered']
+    
+    def record_result(self, result):
+        """合并单个文件的处理结果到统计信息并输出"""
+        self.recorder.add(files_opened=1, bytes_read=result['bytes_read'])
+        if result['error'] is not None:
+            print(f"  ✗ 处理失败: {result['path']} - {result['error']}")
+            return
+        
+        if result['staged'] is not None:
+            self.writer.add(result['staged'], result['path'])
+        
+        relative_path = result['path'].relative_to(self.src_path)
+        if result['manifest_entry'] is not None:
+            self.manifest_files[relative_path.as_posix()] = result['manifest_entry']
+        
+        if result['skipped']:
+            self.stats['skipped_files'] += 1
+            self.recorder.add(files_skipped=1)
+            return
+        
+        if result['prefiltered']:
+            self.stats['prefiltered_files'] += 1
+            return
+        
+        # 统计
+        for old_pkg, count in result['by_package'].items():
+            if old_pkg not in self.stats['by_package']:
+                self.stats['by_package'][old_pkg] = 0
+            self.stats['by_package'][old_pkg] += count
+        
+        if result['replacements'] > 0:
+            self.stats['modified_files'] += 1
+            self.stats['total_replacements'] += result['replacements']
+            
+            print(f"  ✓ {relative_path} ({result['replacements']}处修改)")
     
     def print_stats(self):
         """打印统计信息"""
@@ -166,36 +318,88 @@ class ImportMigrator:
         print(f"总文件数: {self.stats['total_files']}")
         print(f"修改文件数: {self.stats['modified_files']}")
         print(f"总替换数: {self.stats['total_replacements']}")
+        print(f"跳过未变更文件数: {self.stats['skipped_files']}")
+        print(f"预过滤跳过文件数: {self.stats['prefiltered_files']} "
+              f"(跳过比例 {self.stats['prefilter_skip_ratio']:.1%})")
         
         if self.stats['by_package']:
             print("\n按包统计:")
             for pkg, count in sorted(self.stats['by_package'].items(), key=lambda x: x[1], reverse=True):
                 print(f"  {pkg}: {count}处")
         
+        print("\n各阶段耗时:")
+        for phase in self.stats['performance']['phases']:
+            print(f"  {phase['name']:<9} {phase['wall_seconds']:.3f}s (CPU {phase['cpu_seconds']:.3f}s, "
+                  f"读取 {phase['files_opened']}个文件/{phase['bytes_read'] / 1024:.0f} KB, "
+                  f"跳过 {phase['files_skipped']}个)")
+        
         if self.dry_run:
             print("\n⚠️  这是预览模式，未实际修改文件")
             print("   移除 --dry-run 参数执行实际迁移")
         else:
             print("\n✅ 迁移完成!")
 
+# 工作进程内的迁移器实例（由init_worker创建，每个进程只加载一次映射）
+_worker_migrator = None
+
+def init_worker(src_path, dry_run, full_body):
+    """进程池初始化：在每个工作进程中创建迁移器"""
+    global _worker_migrator
+    _worker_migrator = ImportMigrator(src_path, dry_run=dry_run, full_body=full_body)
+
+def migrate_in_worker(file_path, known_hash):
+    """在工作进程中迁移单个文件"""
+    return _worker_migrator.migrate_file(file_path, known_hash)
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
 def main():
     if len(sys.argv) < 2:
-        print("用法: python migrate_imports.py <src目录路径> [--dry-run]")
+        print("用法: python migrate_imports.py <src目录路径> [--dry-run] [--jobs N] [--no-manifest] [--full-body] [--since REV] [--profile PATH]")
         print("\n选项:")
-        print("  --dry-run  预览模式，不实际修改文件")
+        print("  --dry-run      预览模式，不实际修改文件")
+        print("  --jobs N       使用N个进程并行迁移（0表示使用全部CPU核数，默认1）")
+        print("  --no-manifest  不使用增量清单，全量处理所有文件")
+        print("  --full-body    全文模式：同时迁移代码中的全限定名引用（默认只处理类型声明之前的import）")
+        print("  --since REV    只迁移自REV以来git中变更的文件（含未提交和未跟踪的文件）")
+        print("  --profile PATH 保存性能数据：.json为Chrome trace事件文件，其他后缀为cProfile数据")
         sys.exit(1)
     
     src_path = sys.argv[1]
     dry_run = '--dry-run' in sys.argv
     
+    try:
+        jobs = int(get_option_value('--jobs', '1'))
+    except ValueError:
+        print("错误: --jobs 参数必须为整数")
+        sys.exit(1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    
     if not os.path.exists(src_path):
         print(f"错误: 目录不存在: {src_path}")
         sys.exit(1)
     
-    migrator = ImportMigrator(src_path, dry_run=dry_run)
+    # 增量清单与统计结果保存在同一目录
+    manifest_path = None
+    if '--no-manifest' not in sys.argv:
+        manifest_path = Path(src_path).parent / 'import_migration_manifest.json'
+    
+    full_body = '--full-body' in sys.argv
+    since = get_option_value('--since')
+    
+    migrator = ImportMigrator(src_path, dry_run=dry_run, jobs=jobs,
+                              manifest_path=manifest_path, full_body=full_body, since=since)
     
     try:
-        stats = migrator.migrate()
+        with profile_session(get_option_value('--profile'), migrator.recorder):
+            stats = migrator.migrate()
         
         # 保存统计结果
         if not dry_run and stats['modified_files'] > 0:
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Maven POM模型
+每个pom.xml只解析一次，按<modules>发现reactor中的全部模块，解析父子继承关系，
+并带缓存地计算各模块继承后的属性及有效的Java、Spring Boot、Spring Cloud版本
+"""
+
+import re
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+POM_NS = 'http://maven.apache.org/POM/4.0.0'
+NS = {'m': POM_NS}
+
+PROPERTY_REF = re.compile(r'\$\{([^}]+)\}')
+
+# 属性嵌套引用的最大展开深度，防止循环引用
+MAX_INTERPOLATION_DEPTH = 10
+
+SPRING_BOOT_GROUP = 'org.springframework.boot'
+SPRING_BOOT_BOMS = ('spring-boot-starter-parent', 'spring-boot-dependencies')
+SPRING_CLOUD_BOM = ('org.springframework.cloud', 'spring-cloud-dependencies')
+
+
+def child_text(elem, tag):
+    """读取子元素文本，不存在时返回None"""
+    if elem is None:
+        return None
+    child = elem.find(f'm:{tag}', NS)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+class PomFile:
+    """解析后的单个POM"""
+
+    def __init__(self, path, tree):
+        self.path = path
+        self.tree = tree
+        self.root = tree.getroot()
+
+        parent = self.root.find('m:parent', NS)
+        self.parent = None
+        if parent is not None:
+            relative_path = parent.find('m:relativePath', NS)
+            self.parent = {
+                'group_id': child_text(parent, 'groupId'),
+                'artifact_id': child_text(parent, 'artifactId'),
+                'version': child_text(parent, 'version'),
+                # 未声明relativePath时Maven默认查找../pom.xml，声明为空表示不从本地查找
+                'relative_path': '../pom.xml' if relative_path is None else (relative_path.text or '').strip()
+            }
+
+        self.artifact_id = child_text(self.root, 'artifactId')
+        self.group_id = child_text(self.root, 'groupId') or (self.parent or {}).get('group_id')
+        self.version = child_text(self.root, 'version') or (self.parent or {}).get('version')
+
+        modules = self.root.find('m:modules', NS)
+        self.modules = [] if modules is None else [
+            module.text.strip() for module in modules.findall('m:module', NS) if module.text
+        ]
+
+        # 本地父POM（由PomModel解析），父POM不在本地时为None
+        self.parent_pom = None
+
+    def local_properties(self):
+        """本POM中直接声明的<properties>"""
+        properties = {}
+        elem = self.root.find('m:properties', NS)
+        if elem is not None:
+            for prop in elem:
+                if isinstance(prop.tag, str) and prop.text is not None:
+                    properties[prop.tag.rsplit('}', 1)[-1]] = prop.text.strip()
+        return properties
+
+    def iter_coordinates(self):
+        """遍历parent、依赖、插件等节点的(groupId, artifactId, version, scope)"""
+        tags = ('parent', 'dependency', 'plugin')
+        for elem in self.root.iter():
+            if not isinstance(elem.tag, str) or elem.tag.rsplit('}', 1)[-1] not in tags:
+                continue
+            yield (child_text(elem, 'groupId'), child_text(elem, 'artifactId'),
+                   child_text(elem, 'version'), child_text(elem, 'scope'))
+
+    @property
+    def coordinates(self):
+        return f"{self.group_id}:{self.artifact_id}"
+
+
+class FileSystemSource:
+    """从工作区读取POM"""
+
+    @staticmethod
+    def is_file(path):
+        return path.is_file()
+
+    @staticmethod
+    def is_dir(path):
+        return path.is_dir()
+
+    @staticmethod
+    def size(path):
+        return path.stat().st_size
+
+    @staticmethod
+    def parse(path):
+        return ET.parse(path)
+
+
+class PomModel:
+    """共享的POM模型：按路径缓存解析结果，同一文件只解析一次
+
+    source提供is_file/is_dir/size/parse，默认读取工作区，也可以直接读取git对象（见git_tree.py）。
+    recorder为可选的PhaseRecorder，用于统计读取的文件数和字节数。
+    """
+
+    def __init__(self, source=None, recorder=None):
+        self.source = source or FileSystemSource()
+        self.recorder = recorder
+        self.poms = {}
+        self.properties_cache = {}
+        self.versions_cache = {}
+
+    def load(self, pom_path):
+        """解析POM并缓存，同时解析本地父POM"""
+        pom_path = Path(pom_path).resolve()
+        if pom_path in self.poms:
+            return self.poms[pom_path]
+
+        pom = PomFile(pom_path, self.source.parse(pom_path))
+        if self.recorder is not None:
+            self.recorder.add(files_opened=1, bytes_read=self.source.size(pom_path))
+        self.poms[pom_path] = pom
+        pom.parent_pom = self.resolve_parent(pom)
+        return pom
+
+    def resolve_parent(self, pom):
+        """按relativePath查找本地父POM，坐标不一致时视为外部父POM"""
+        if pom.parent is None or not pom.parent['relative_path']:
+            return None
+
+        parent_path = pom.path.parent / pom.parent['relative_path']
+        if self.source.is_dir(parent_path):
+            parent_path = parent_path / 'pom.xml'
+        if not self.source.is_file(parent_path):
+            return None
+
+        parent_pom = self.load(parent_path)
+        if (parent_pom.group_id, parent_pom.artifact_id) != (pom.parent['group_id'], pom.parent['artifact_id']):
+            return None
+        return parent_pom
+
+    def load_reactor(self, root_pom):
+        """从根POM出发递归解析<modules>，按广度优先返回reactor中的全部模块（根POM在前）"""
+        ordered = []
+        seen = set()
+        queue = [Path(root_pom).resolve()]
+        while queue:
+            pom_path = queue.pop(0)
+            if pom_path in seen:
+                continue
+            seen.add(pom_path)
+
+            pom = self.load(pom_path)
+            ordered.append(pom)
+            for module in pom.modules:
+                module_path = pom_path.parent / module
+                if self.source.is_dir(module_path):
+                    module_path = module_path / 'pom.xml'
+                if self.source.is_file(module_path):
+                    queue.append(module_path.resolve())
+                else:
+                    print(f"  ⚠ 模块不存在: {module} ({pom_path})")
+        return ordered
+
+    def effective_properties(self, pom):
+        """继承后的属性：父POM属性被子模块同名属性覆盖，并补充project.*内置属性"""
+        if pom.path in self.properties_cache:
+            return self.properties_cache[pom.path]
+
+        properties = {}
+        if pom.parent_pom is not None:
+            properties.update(self.effective_properties(pom.parent_pom))
+        properties.update(pom.local_properties())
+        for key, value in (('project.groupId', pom.group_id), ('project.artifactId', pom.artifact_id),
+                           ('project.version', pom.version)):
+            if value is not None:
+                properties[key] = value
+        if pom.parent is not None and pom.parent['version']:
+            properties['project.parent.version'] = pom.parent['version']
+
+        self.properties_cache[pom.path] = properties
+        return properties
+
+    def interpolate(self, pom, value):
+        """展开值中的${property}引用，无法解析的引用保持原样"""
+        if not value or '${' not in value:
+            return value
+
+        properties = self.effective_properties(pom)
+        for _ in range(MAX_INTERPOLATION_DEPTH):
+            expanded = PROPERTY_REF.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+            if expanded == value:
+                break
+            value = expanded
+        return value
+
+    def effective_versions(self, pom):
+        """模块继承后的有效Java、Spring Boot、Spring Cloud版本"""
+        if pom.path in self.versions_cache:
+            return self.versions_cache[pom.path]
+
+        inherited = self.effective_versions(pom.parent_pom) if pom.parent_pom is not None else {}
+        properties = self.effective_properties(pom)
+        versions = {}
+
+        # Java版本：本模块声明的java.version/maven.compiler.*属性优先，其次为本模块的compiler plugin配置，
+        # 两者都没有时才沿用父POM的有效版本（父POM的属性不能覆盖子模块自己的compiler plugin配置）
+        local_properties = pom.local_properties()
+        for key in ('java.version', 'maven.compiler.release', 'maven.compiler.source', 'maven.compiler.target'):
+            if local_properties.get(key):
+                versions['java'] = self.interpolate(pom, local_properties[key])
+                break
+        else:
+            java = self.compiler_plugin_release(pom) or inherited.get('java')
+            if java:
+                versions['java'] = java
+
+        # Spring Boot版本：spring-boot-starter-parent/BOM版本，或spring-boot.version属性
+        spring_boot = None
+        for group_id, artifact_id, version, _ in pom.iter_coordinates():
+            if group_id == SPRING_BOOT_GROUP and artifact_id in SPRING_BOOT_BOMS and version:
+                spring_boot = self.interpolate(pom, version)
+                break
+        spring_boot = spring_boot or properties.get('spring-boot.version') or inherited.get('spring_boot')
+        if spring_boot:
+            versions['spring_boot'] = self.interpolate(pom, spring_boot)
+
+        # Spring Cloud版本：spring-cloud-dependencies BOM版本，或spring-cloud.version属性
+        spring_cloud = None
+        for group_id, artifact_id, version, _ in pom.iter_coordinates():
+            if (group_id, artifact_id) == SPRING_CLOUD_BOM and version:
+                spring_cloud = self.interpolate(pom, version)
+                break
+        spring_cloud = spring_cloud or properties.get('spring-cloud.version') or inherited.get('spring_cloud')
+        if spring_cloud:
+            versions['spring_cloud'] = self.interpolate(pom, spring_cloud)
+
+        self.versions_cache[pom.path] = versions
+        return versions
+
+    def compiler_plugin_release(self, pom):
+        """读取本POM中maven-compiler-plugin配置的release/source"""
+        for plugin in pom.root.iter(f'{{{POM_NS}}}plugin'):
+            if child_text(plugin, 'artifactId') != 'maven-compiler-plugin':
+                continue
+            configuration = plugin.find('m:configuration', NS)
+            for tag in ('release', 'source'):
+                value = child_text(configuration, tag)
+                if value:
+                    return self.interpolate(pom, value)
+        return None
+
+    def uses_spring_boot(self, pom):
+        """模块本身或其本地父POM是否引用了Spring Boot构件"""
+        while pom is not None:
+            if any(group_id == SPRING_BOOT_GROUP for group_id, _, _, _ in pom.iter_coordinates()):
+                return True
+            pom = pom.parent_pom
+        return False
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+项目目录遍历工具
+单次os.scandir遍历收集分析所需的各类文件，支持排除目录和.gitignore规则
+"""
+
+import os
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+# 默认排除的目录（构建产物、版本控制、依赖缓存、IDE配置）
+DEFAULT_EXCLUDES = ['target', 'build', '.git', '.svn', 'node_modules', '.idea', '.gradle']
+
+# 构建输出目录只在模块根目录（与构建文件同级）时排除，源码中同名的包目录（如com/acme/build）照常扫描
+BUILD_OUTPUT_DIRS = ('target', 'build')
+MODULE_FILES = ('pom.xml', 'build.gradle', 'build.gradle.kts')
+
+
+def is_excluded_dir(name, excludes, module_root):
+    """目录名是否命中排除规则；target/build只在module_root（所在目录含构建文件）为True时命中"""
+    return any(fnmatch(name, pattern) and (module_root or pattern not in BUILD_OUTPUT_DIRS)
+               for pattern in excludes)
+
+
+class GitIgnoreRule:
+    """单条.gitignore规则"""
+
+    def __init__(self, base, pattern):
+        self.base = base
+        self.negated = pattern.startswith('!')
+        if self.negated:
+            pattern = pattern[1:]
+
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+
+        # 含有斜杠的规则相对于.gitignore所在目录锚定，否则匹配任意层级的文件名
+        self.anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        self.regex = re.compile(self.translate(pattern) + r'\Z')
+
+    @staticmethod
+    def translate(pattern):
+        """将gitignore通配符转换为正则表达式"""
+        result = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                result.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+                result.append('/.*')
+                i += 3
+            elif pattern.startswith('**', i):
+                result.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                result.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                result.append('[^/]')
+                i += 1
+            elif pattern[i] == '[':
+                end = pattern.find(']', i + 1)
+                if end == -1:
+                    result.append(re.escape(pattern[i]))
+                    i += 1
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    result.append('[' + body.replace('\\', '\\\\') + ']')
+                    i = end + 1
+            elif pattern[i] == '\\' and i + 1 < len(pattern):
+                result.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                result.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(result)
+
+    def matches(self, rel_path, is_dir):
+        """判断相对项目根目录的路径是否命中该规则"""
+        if self.dir_only and not is_dir:
+            return False
+
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+
+        if self.anchored:
+            return self.regex.match(rel_path) is not None
+        return self.regex.match(rel_path.rsplit('/', 1)[-1]) is not None
+
+
+def load_gitignore(directory, base):
+    """读取目录下的.gitignore，返回规则列表"""
+    rules = []
+    try:
+        with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\n').rstrip('\r')
+                if not line.endswith('\\ '):
+                    line = line.rstrip(' ')
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('\\#') or line.startswith('\\!'):
+                    line = line[1:]
+                rules.append(GitIgnoreRule(base, line))
+    except OSError:
+        pass
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """按顺序应用规则，最后一条命中的规则决定结果"""
+    ignored = False
+    for rule in rules:
+        if rule.negated == ignored and rule.matches(rel_path, is_dir):
+            ignored = not rule.negated
+    return ignored
+
+
+class ProjectFiles:
+    """单次遍历得到的项目文件清单，供各分析阶段共享"""
+
+    def __init__(self, root):
+        self.root = root
+        self.pom_files = []
+        self.java_files = []
+        self.skipped_dirs = 0
+
+
+def walk_project(root, excludes=None, respect_gitignore=True):
+    """遍历项目目录，一次收集pom.xml和Java源文件
+
+    excludes为目录名（支持通配符）列表，命中的目录整体剪枝，不再深入（target/build仅限模块根目录）。
+    """
+    root = Path(root)
+    excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+    files = ProjectFiles(root)
+
+    # 栈中元素: (目录绝对路径, 相对根目录的路径, 生效的gitignore规则)
+    stack = [(str(root), '', [])]
+    while stack:
+        directory, rel_dir, rules = stack.pop()
+
+        if respect_gitignore:
+            local_rules = load_gitignore(directory, rel_dir)
+            if local_rules:
+                rules = rules + local_rules
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        module_root = any(entry.name in MODULE_FILES for entry in entries)
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+
+            if entry.is_dir(follow_symlinks=False):
+                if is_excluded_dir(entry.name, excludes, module_root) \
+                        or (rules and is_ignored(rules, rel_path, True)):
+                    files.skipped_dirs += 1
+                    continue
+                subdirs.append((entry.path, rel_path, rules))
+                continue
+
+            if entry.name == 'pom.xml':
+                target = files.pom_files
+            elif entry.name.endswith('.java'):
+                target = files.java_files
+            else:
+                continue
+
+            if rules and is_ignored(rules, rel_path, False):
+                continue
+            target.append(Path(entry.path))
+
+        # 逆序入栈，保证按名称顺序深度优先遍历
+        stack.extend(reversed(subdirs))
+
+    return files
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+分层抽样估算
+按模块分层随机抽取Java文件，只扫描样本，再用分层估计量外推全项目的
+javax使用量和过时API文件数，并给出95%置信区间，用于超大仓库的快速评估
+"""
+
+import math
+import random
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# 95%置信区间对应的正态分位数
+CONFIDENCE = 0.95
+CONFIDENCE_Z = 1.96
+
+
+def module_of(path, module_dirs):
+    """文件所属模块：包含该文件的最深一层pom.xml所在目录"""
+    for parent in Path(path).parents:
+        if parent in module_dirs:
+            return module_dirs[parent]
+    return '.'
+
+
+def allocate(population, size):
+    """按各层文件数比例分配样本量，每层至少1个，余额按小数部分从大到小补齐"""
+    total = sum(population.values())
+    if size >= total:
+        return dict(population)
+
+    quotas = {module: size * count / total for module, count in population.items()}
+    allocation = {module: min(population[module], max(1, int(quota))) for module, quota in quotas.items()}
+    remaining = size - sum(allocation.values())
+    order = sorted(population, key=lambda module: quotas[module] - int(quotas[module]), reverse=True)
+    while remaining > 0:
+        progressed = False
+        for module in order:
+            if remaining > 0 and allocation[module] < population[module]:
+                allocation[module] += 1
+                remaining -= 1
+                progressed = True
+        if not progressed:
+            break
+    return allocation
+
+
+class StratifiedSample:
+    """按模块分层的Java文件样本及外推估计
+
+    每层只保留样本数、命中数和平方和等累加量，不保存逐文件结果。
+    """
+
+    def __init__(self, java_files, pom_files, project_path, size, seed):
+        module_dirs = {pom.parent: pom.parent.relative_to(project_path).as_posix() for pom in pom_files}
+        strata = defaultdict(list)
+        for java_file in java_files:
+            strata[module_of(java_file, module_dirs)].append(java_file)
+
+        self.seed = seed
+        self.population = {module: len(files) for module, files in strata.items()}
+        allocation = allocate(self.population, size)
+        rng = random.Random(seed)
+        # (模块, 文件)，按模块排序保证相同种子得到相同样本
+        self.files = [(module, java_file) for module in sorted(strata)
+                      for java_file in sorted(rng.sample(strata[module], allocation[module]))]
+
+        self.sampled = Counter()
+        self.hits = defaultdict(Counter)
+        self.values = Counter()
+        self.squares = Counter()
+
+    def record(self, module, keys, value):
+        """记录一个已扫描的样本文件：命中的规则键和该文件的javax包数"""
+        self.sampled[module] += 1
+        for key in keys:
+            self.hits[key][module] += 1
+        self.values[module] += value
+        self.squares[module] += value * value
+
+    def estimate_total(self, totals, squares, observed):
+        """分层估计总量及置信区间（含有限总体校正）"""
+        estimate = 0.0
+        variance = 0.0
+        for module, count in self.population.items():
+            n = self.sampled[module]
+            if n == 0:
+                continue
+            mean = totals[module] / n
+            estimate += count * mean
+            if 1 < n < count:
+                sample_variance = max(0.0, (squares[module] - n * mean * mean) / (n - 1))
+                variance += count * count * (1 - n / count) * sample_variance / n
+        margin = CONFIDENCE_Z * math.sqrt(variance)
+        # 样本中实际观察到的命中数是确定的下限
+        return {
+            'estimate': round(estimate),
+            'low': max(observed, math.floor(estimate - margin)),
+            'high': math.ceil(estimate + margin),
+            'sample_hits': observed
+        }
+
+    def estimate_key(self, key):
+        """估算命中某条规则的文件数（0/1变量，平方和等于命中数）"""
+        hits = self.hits[key]
+        estimate = self.estimate_total(hits, hits, sum(hits.values()))
+        estimate['high'] = min(estimate['high'], sum(self.population.values()))
+        return estimate
+
+    def estimate_values(self):
+        """估算全项目javax使用总量（各文件javax包数之和）"""
+        return self.estimate_total(self.values, self.squares, sum(self.values.values()))
+
+    def summary(self):
+        return {
+            'seed': self.seed,
+            'population_files': sum(self.population.values()),
+            'sampled_files': sum(self.sampled.values()),
+            'strata': len(self.population),
+            'confidence': CONFIDENCE
+        }
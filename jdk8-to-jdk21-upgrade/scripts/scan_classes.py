@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+编译产物（.class）常量池扫描脚本
+直接解析target/classes下以及JAR中的class文件常量池，统计每个类对javax/*、sun/misc/*、com/sun/*的
+类、方法和字段引用。源码正则无法覆盖反射字符串以外的生成代码（Lombok、MapStruct、注解处理器输出），
+字节码中的引用才是运行时真正需要的。
+
+常量池解析基于memoryview按偏移读取，不构造常量对象；不含目标前缀字节的类在解析前即被跳过
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from jakarta_mapping import load_mapping_table
+from java_source import contains_any
+from project_walker import DEFAULT_EXCLUDES, walk_project
+from scan_jars import NESTED_LIB_DIRS, project_archives
+from zip_index import STORED, Zip64Required, entry_data_offset, read_central_directory, read_entry
+
+# 需要报告的内部名前缀（常量池中使用/分隔的内部名）
+TARGET_PREFIXES = (b'javax/', b'sun/misc/', b'com/sun/')
+TYPE_INITIALS = frozenset(prefix[0] for prefix in TARGET_PREFIXES)
+
+CLASS_MAGIC = b'\xca\xfe\xba\xbe'
+
+# 常量池标签
+CONSTANT_UTF8 = 1
+CONSTANT_LONG = 5
+CONSTANT_DOUBLE = 6
+CONSTANT_CLASS = 7
+CONSTANT_FIELDREF = 9
+CONSTANT_INTERFACE_METHODREF = 11
+
+# 按标签索引的常量定长内容字节数（Utf8为变长），0表示非法标签
+CONSTANT_SIZES = bytes([0, 0, 0, 4, 4, 8, 8, 2, 2, 4, 4, 4, 4, 0, 0, 3, 2, 4, 4, 2, 2]).ljust(256, b'\0')
+
+# 字段/方法描述符、泛型签名和注解中的类型引用（这些类型不一定有CONSTANT_Class条目）
+DESCRIPTOR_REF = re.compile(rb'L((?:javax|sun/misc|com/sun)/[\w/$]+)[;<]')
+
+U2 = struct.Struct('>H').unpack_from
+U2U2 = struct.Struct('>HH').unpack_from
+
+
+class ClassFormatError(ValueError):
+    """class文件格式错误"""
+
+
+def parse_constant_pool(view):
+    """遍历常量池，返回各常量内容的偏移、Class常量和成员引用常量的序号，以及常量池之后的位置
+
+    只记录偏移，不构造任何常量对象；Utf8内容在需要时才按偏移切片读取
+    """
+    count = U2(view, 8)[0]
+    offsets = [0] * count
+    classes = []
+    members = []
+    sizes = CONSTANT_SIZES
+    position = 10
+    index = 1
+    while index < count:
+        tag = view[position]
+        position += 1
+        offsets[index] = position
+        if tag == CONSTANT_UTF8:
+            position += 2 + (view[position] << 8 | view[position + 1])
+        else:
+            size = sizes[tag]
+            if not size:
+                raise ClassFormatError(f'非法的常量池标签 {tag}')
+            position += size
+            if tag == CONSTANT_CLASS:
+                classes.append(index)
+            elif CONSTANT_FIELDREF <= tag <= CONSTANT_INTERFACE_METHODREF:
+                members.append(index)
+            elif tag == CONSTANT_LONG or tag == CONSTANT_DOUBLE:
+                # long/double占用两个常量池槽位
+                index += 1
+        index += 1
+    return offsets, classes, members, position
+
+
+def target_type(name):
+    """CONSTANT_Class名称（可能为数组描述符）属于目标前缀时返回点分类名，否则返回None"""
+    if not name or (name[0] not in TYPE_INITIALS and name[0] != 0x5B):
+        return None
+    name = name.tobytes()
+    if name[0] == 0x5B:
+        name = name.lstrip(b'[')
+        if not (name.startswith(b'L') and name.endswith(b';')):
+            return None
+        name = name[1:-1]
+    if not name.startswith(TARGET_PREFIXES):
+        return None
+    return name.decode('utf-8', 'replace').replace('/', '.')
+
+
+def scan_class(data):
+    """解析单个class文件，返回(类名, 引用类型集合, 方法引用集合, 字段引用集合)"""
+    view = memoryview(data)
+    if view[:4] != CLASS_MAGIC:
+        raise ClassFormatError('缺少class文件魔数')
+    offsets, classes, members, end = parse_constant_pool(view)
+
+    def utf8(index):
+        offset = offsets[index]
+        return view[offset + 2:offset + 2 + U2(view, offset)[0]]
+
+    def class_name(index):
+        return utf8(U2(view, offsets[index])[0])
+
+    types = set()
+    for index in classes:
+        name = target_type(class_name(index))
+        if name is not None:
+            types.add(name)
+
+    methods = set()
+    fields = set()
+    for index in members:
+        class_index, name_and_type = U2U2(view, offsets[index])
+        owner = target_type(class_name(class_index))
+        if owner is None:
+            continue
+        member = f"{owner}#{bytes(class_name(name_and_type)).decode('utf-8', 'replace')}"
+        # 成员引用常量的标签位于内容偏移之前
+        (fields if view[offsets[index] - 1] == CONSTANT_FIELDREF else methods).add(member)
+
+    for match in DESCRIPTOR_REF.finditer(view):
+        types.add(match.group(1).decode('ascii').replace('/', '.'))
+
+    this_class = bytes(class_name(U2(view, end + 2)[0])).decode('utf-8', 'replace').replace('/', '.')
+    return this_class, types, methods, fields
+
+
+def new_batch():
+    return {'classes': 0, 'parsed': 0, 'bytes_read': 0, 'records': [], 'errors': []}
+
+
+def scan_into(batch, data, source):
+    """扫描一个class文件的内容并累计到批结果中；不含目标前缀的类直接跳过"""
+    batch['classes'] += 1
+    batch['bytes_read'] += len(data)
+    if not contains_any(data, TARGET_PREFIXES):
+        return
+    batch['parsed'] += 1
+    try:
+        this_class, types, methods, fields = scan_class(data)
+    except (ClassFormatError, IndexError, struct.error) as e:
+        batch['errors'].append({'source': source, 'error': f"{type(e).__name__}: {e}"})
+        return
+    if types or methods or fields:
+        batch['records'].append({'class': this_class, 'source': source, 'types': sorted(types),
+                                 'methods': sorted(methods), 'fields': sorted(fields)})
+
+
+def scan_class_files(paths):
+    """扫描一批独立的class文件"""
+    batch = new_batch()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            batch['errors'].append({'source': path, 'error': f"{type(e).__name__}: {e}"})
+            continue
+        scan_into(batch, data, path)
+    return batch
+
+
+def is_class_entry(name):
+    return name.endswith('.class') and not name.endswith('module-info.class')
+
+
+def scan_zip(batch, f, start, end, prefix):
+    """扫描位于文件[start, end)区间内的ZIP中的class条目；嵌套JAR递归扫描"""
+    entries = read_central_directory(f, start, end).entries()
+    for entry in entries:
+        source = f'{prefix}!/{entry.name}'
+        if is_class_entry(entry.name):
+            # 单个条目损坏（本地头错误、压缩流损坏）只记录该条目，不影响同一归档中的其他条目
+            try:
+                data = read_entry(f, entry)
+            except (zipfile.BadZipFile, zlib.error) as e:
+                batch['errors'].append({'source': source, 'error': f"{type(e).__name__}: {e}"})
+                continue
+            scan_into(batch, data, source)
+        elif entry.name.endswith('.jar') and entry.name.startswith(NESTED_LIB_DIRS):
+            # 未压缩的嵌套JAR在外层文件中原位读取，压缩存储的解压到内存后读取
+            try:
+                if entry.method == STORED:
+                    nested_start = entry_data_offset(f, entry)
+                    scan_zip(batch, f, nested_start, nested_start + entry.compressed_size, source)
+                else:
+                    nested = io.BytesIO(read_entry(f, entry))
+                    scan_zip(batch, nested, 0, None, source)
+            except (zipfile.BadZipFile, Zip64Required, struct.error, zlib.error, OSError) as e:
+                batch['errors'].append({'source': source, 'error': f"{type(e).__name__}: {e}"})
+
+
+def scan_archive_classes(path):
+    """扫描JAR/WAR中的全部class文件（含嵌套依赖JAR）"""
+    batch = new_batch()
+    try:
+        with open(path, 'rb') as f:
+            try:
+                scan_zip(batch, f, 0, None, path)
+            except Zip64Required:
+                with zipfile.ZipFile(f) as archive:
+                    for info in archive.infolist():
+                        if not is_class_entry(info.filename):
+                            continue
+                        source = f'{path}!/{info.filename}'
+                        try:
+                            data = archive.read(info)
+                        except (zipfile.BadZipFile, zlib.error) as e:
+                            batch['errors'].append({'source': source, 'error': f"{type(e).__name__}: {e}"})
+                            continue
+                        scan_into(batch, data, source)
+    except (OSError, zipfile.BadZipFile, struct.error, zlib.error, EOFError) as e:
+        batch['errors'].append({'source': path, 'error': f"{type(e).__name__}: {e}"})
+    return batch
+
+
+def scan_task(task):
+    """工作进程入口：('files', [路径...]) 或 ('archive', 路径)"""
+    kind, target = task
+    return scan_class_files(target) if kind == 'files' else scan_archive_classes(target)
+
+
+def class_directories(project_path, excludes=None, include_tests=False):
+    """项目各模块的编译输出目录（target/classes，可选target/test-classes）"""
+    excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+    names = ('classes', 'test-classes') if include_tests else ('classes',)
+    directories = []
+    for pom in walk_project(project_path, excludes, respect_gitignore=False).pom_files:
+        for name in names:
+            directory = pom.parent / 'target' / name
+            if directory.is_dir():
+                directories.append(directory)
+    return directories
+
+
+def class_files(directories):
+    """编译输出目录下的全部class文件"""
+    files = []
+    for directory in directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            files.extend(os.path.join(dirpath, name) for name in sorted(filenames) if is_class_entry(name))
+    return files
+
+
+class ClassScanner:
+    """并行扫描class文件和归档：独立class文件按批分发，每个归档作为一个任务"""
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self.stats = {'classes': 0, 'parsed': 0, 'classes_with_references': 0, 'archives': 0,
+                      'bytes_read': 0, 'errors': 0, 'seconds': 0.0, 'classes_per_second': 0}
+
+    def scan(self, files=(), archives=()):
+        """返回(引用记录列表, 错误列表)，记录按输入顺序排列"""
+        started = time.perf_counter()
+        files = [str(path) for path in files]
+        batches = max(1, self.jobs * 8)
+        size = max(1, -(-len(files) // batches))
+        tasks = [('files', files[i:i + size]) for i in range(0, len(files), size)]
+        tasks += [('archive', str(path)) for path in archives]
+
+        if self.jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                results = list(executor.map(scan_task, tasks))
+        else:
+            results = [scan_task(task) for task in tasks]
+
+        records = []
+        errors = []
+        for result in results:
+            records.extend(result['records'])
+            errors.extend(result['errors'])
+            for key in ('classes', 'parsed', 'bytes_read'):
+                self.stats[key] += result[key]
+        elapsed = time.perf_counter() - started
+        self.stats['archives'] = len(archives)
+        self.stats['classes_with_references'] = len(records)
+        self.stats['errors'] = len(errors)
+        self.stats['seconds'] = round(elapsed, 3)
+        self.stats['classes_per_second'] = round(self.stats['classes'] / elapsed) if elapsed > 0 else 0
+        return records, errors
+
+
+def summarize(records, errors=(), base=None):
+    """按包汇总引用的类数量，给出javax包对应的jakarta包；base不为空时来源改为相对路径"""
+    mapping_table = load_mapping_table()
+    packages = {}
+    members = Counter()
+    if base is not None:
+        for item in list(records) + list(errors):
+            item['source'] = os.path.relpath(item['source'], base)
+    for record in records:
+        for package in sorted({name.rpartition('.')[0] for name in record['types']}):
+            info = packages.get(package)
+            if info is None:
+                info = packages[package] = {'classes': 0, 'jakarta': None}
+                prefix = mapping_table.longest_prefix(package)
+                if prefix is not None:
+                    info['jakarta'] = mapping_table.mappings[prefix] + package[len(prefix):]
+            info['classes'] += 1
+        members.update(record['methods'])
+        members.update(record['fields'])
+    return {
+        'packages': dict(sorted(packages.items())),
+        'members': dict(members.most_common()),
+        'classes': records,
+        'errors': list(errors)
+    }
+
+
+def print_summary(summary, stats, limit=20):
+    print(f"  ✓ class文件: {stats['classes']}个 (解析 {stats['parsed']}个，"
+          f"{stats['seconds']}s，{stats['classes_per_second']}个/秒)")
+    if stats['errors']:
+        print(f"  ⚠ {stats['errors']}个文件解析失败")
+    if not summary['packages']:
+        print("  ✓ 字节码中未发现javax/sun.misc/com.sun引用")
+        return
+    print(f"  ⚠ {stats['classes_with_references']}个类引用了目标包:")
+    for package, info in summary['packages'].items():
+        target = f" → {info['jakarta']}" if info['jakarta'] else ''
+        print(f"    - {package}: {info['classes']}个类{target}")
+    if summary['members']:
+        print(f"  引用最多的成员（前{limit}个）:")
+        for member, count in list(summary['members'].items())[:limit]:
+            print(f"    - {member}: {count}个类")
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python scan_classes.py <project_path|jar|classes_dir> [--jars] [--include-tests] [--jobs N] [--output PATH]")
+        print("\n选项:")
+        print("  --jars           同时扫描构建输出（target/）中的JAR/WAR及其中的依赖JAR")
+        print("  --include-tests  同时扫描target/test-classes")
+        print("  --jobs N         并行扫描的进程数（默认使用全部CPU核数）")
+        print("  --output PATH    结果文件（默认为项目目录下的class_scan.json）")
+        sys.exit(1)
+
+    target = Path(sys.argv[1])
+    if not target.exists():
+        print(f"错误: 路径不存在: {target}")
+        sys.exit(1)
+
+    try:
+        jobs = int(get_option_value('--jobs', '0'))
+    except ValueError:
+        print("错误: --jobs 参数必须为整数")
+        sys.exit(1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    # 参数可以是单个归档、Maven项目或任意class目录
+    archives = []
+    if target.is_file():
+        base = target.parent
+        files = []
+        archives = [target]
+    elif (target / 'pom.xml').is_file():
+        base = target
+        files = class_files(class_directories(target, include_tests='--include-tests' in sys.argv))
+        if '--jars' in sys.argv:
+            archives = project_archives(target)
+    else:
+        base = target
+        files = class_files([target])
+    print(f"待扫描: {len(files)}个class文件, {len(archives)}个归档")
+
+    print("=" * 60)
+    scanner = ClassScanner(jobs=jobs)
+    records, errors = scanner.scan(files, archives)
+    summary = summarize(records, errors, base)
+    print_summary(summary, scanner.stats)
+
+    output = Path(get_option_value('--output') or base / 'class_scan.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'scan_time': datetime.now().isoformat(), 'scan_stats': scanner.stats, **summary},
+                  f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存: {output}")
+
+if __name__ == '__main__':
+    main()
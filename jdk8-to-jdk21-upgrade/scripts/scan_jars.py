@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+依赖JAR中的javax类扫描脚本
+扫描项目构建输出（target/下的JAR/WAR/EAR及解包的WEB-INF/lib）和本地Maven仓库中的JAR，
+只读取每个归档的中央目录列出javax/**下的类，不解压任何内容。
+各归档并行处理，结果按中央目录校验和缓存，同一构件在不同项目、不同路径下只需解析一次
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import struct
+import zipfile
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from jakarta_mapping import load_mapping_table
+from m2_index import DEFAULT_M2_REPOSITORY
+from project_walker import DEFAULT_EXCLUDES, walk_project
+from upgrade_cache import get_cache_dir
+from zip_index import STORED, Zip64Required, entry_data_offset, read_central_directory, zipfile_entries
+
+# 扫描结果格式版本，变化时旧缓存自动失效
+SCANNER_VERSION = 1
+
+ARCHIVE_SUFFIXES = ('.jar', '.war', '.ear')
+SKIPPED_SUFFIXES = ('-sources.jar', '-javadoc.jar')
+
+# WAR/可执行JAR中自身类所在的目录
+CLASS_ROOTS = ('WEB-INF/classes/', 'BOOT-INF/classes/')
+
+# 嵌套依赖JAR所在的目录
+NESTED_LIB_DIRS = ('WEB-INF/lib/', 'BOOT-INF/lib/', 'lib/')
+
+NAMESPACES = ('javax', 'jakarta')
+
+# 工作进程中只读打开的缓存库，按中央目录校验和查找已解析的结果
+_worker_cache = None
+
+
+def class_package(name):
+    """条目对应类的包名，不是javax/jakarta下的类时返回None"""
+    if not name.endswith('.class') or name.endswith('module-info.class'):
+        return None
+    for root in CLASS_ROOTS:
+        if name.startswith(root):
+            name = name[len(root):]
+            break
+    if name.split('/', 1)[0] not in NAMESPACES:
+        return None
+    return name.rpartition('/')[0].replace('/', '.')
+
+
+def summarize_entries(entries):
+    """统计归档条目中的javax/jakarta类"""
+    packages = {namespace: Counter() for namespace in NAMESPACES}
+    javax_classes = []
+    for entry in entries:
+        package = class_package(entry.name)
+        if package is None:
+            continue
+        namespace = package.split('.', 1)[0]
+        packages[namespace][package] += 1
+        if namespace == 'javax':
+            javax_classes.append(f"{package}.{entry.name.rpartition('/')[2][:-len('.class')]}")
+    return {
+        'javax_packages': dict(sorted(packages['javax'].items())),
+        'jakarta_packages': dict(sorted(packages['jakarta'].items())),
+        'javax_classes': sorted(javax_classes)
+    }
+
+
+def scan_nested(f, entries):
+    """原位读取未压缩存储的嵌套JAR的中央目录；压缩存储的嵌套JAR需要解压，只计数不扫描"""
+    nested = []
+    skipped = 0
+    for entry in entries:
+        if not entry.name.endswith('.jar') or not entry.name.startswith(NESTED_LIB_DIRS):
+            continue
+        if entry.method != STORED:
+            skipped += 1
+            continue
+        try:
+            start = entry_data_offset(f, entry)
+            directory = read_central_directory(f, start, start + entry.compressed_size)
+            summary = summarize_entries(directory.entries())
+        except (zipfile.BadZipFile, Zip64Required, struct.error):
+            skipped += 1
+            continue
+        if summary['javax_packages'] or summary['jakarta_packages']:
+            nested.append({'name': entry.name, **summary})
+    return nested, skipped
+
+
+def scan_archive(path):
+    """扫描单个归档，返回javax/jakarta类统计；中央目录校验和已在缓存中时直接返回缓存结果"""
+    result = {'path': str(path)}
+    try:
+        with open(path, 'rb') as f:
+            try:
+                directory = read_central_directory(f)
+            except Zip64Required:
+                # ZIP64归档由zipfile列出条目，同样按其条目校验和查找和写入缓存
+                entries, digest = zipfile_entries(path)
+                cached = worker_cache_lookup(digest)
+                if cached is not None:
+                    result.update(cached, cached=True)
+                    return result
+                result.update(digest=digest, entry_count=len(entries), **summarize_entries(entries))
+                result['nested'], result['nested_skipped'] = [], 0
+                return result
+
+            cached = worker_cache_lookup(directory.digest)
+            if cached is not None:
+                result.update(cached, cached=True)
+                return result
+
+            entries = directory.entries()
+            result.update(digest=directory.digest, entry_count=len(entries), **summarize_entries(entries))
+            result['nested'], result['nested_skipped'] = scan_nested(f, entries)
+    except (OSError, zipfile.BadZipFile, struct.error) as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def init_worker(db_path):
+    """工作进程初始化：只读打开缓存库"""
+    global _worker_cache
+    _worker_cache = None
+    if db_path is not None:
+        try:
+            _worker_cache = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=30)
+        except sqlite3.Error:
+            _worker_cache = None
+
+
+def worker_cache_lookup(digest):
+    if _worker_cache is None:
+        return None
+    try:
+        row = _worker_cache.execute('SELECT result FROM archives WHERE digest = ?', (digest,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+class JarCache:
+    """归档扫描结果缓存（所有项目共用）
+
+    archives表以中央目录校验和为键保存扫描结果；paths表记录路径、大小和修改时间对应的校验和，
+    文件未变化时无需读取。
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else get_cache_dir() / 'jars.sqlite'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.path_updates = []
+        self.archive_updates = {}
+
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS archives (digest TEXT PRIMARY KEY, result TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS paths ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' digest TEXT NOT NULL)')
+        meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+        if meta.get('scanner_version') != str(SCANNER_VERSION):
+            with self.conn:
+                self.conn.execute('DELETE FROM archives')
+                self.conn.execute('DELETE FROM paths')
+                self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                  ('scanner_version', str(SCANNER_VERSION)))
+
+        self.paths = {path: (size, mtime_ns, digest) for path, size, mtime_ns, digest in
+                      self.conn.execute('SELECT path, size, mtime_ns, digest FROM paths')}
+
+    def lookup(self, path, stat):
+        """路径、大小和修改时间均未变化时直接返回缓存结果"""
+        known = self.paths.get(path)
+        if known is None or known[:2] != (stat.st_size, stat.st_mtime_ns):
+            return None
+        row = self.conn.execute('SELECT result FROM archives WHERE digest = ?', (known[2],)).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return {'path': path, **json.loads(row[0]), 'cached': True}
+
+    def store(self, path, stat, result):
+        if 'error' in result:
+            return
+        self.path_updates.append((path, stat.st_size, stat.st_mtime_ns, result['digest']))
+        if not result.get('cached'):
+            stored = {key: value for key, value in result.items() if key not in ('path', 'cached')}
+            self.archive_updates[result['digest']] = json.dumps(stored, ensure_ascii=False)
+
+    def save(self):
+        """单个事务内写入本次新解析的结果和路径记录"""
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO archives (digest, result) VALUES (?, ?)',
+                                  self.archive_updates.items())
+            self.conn.executemany('INSERT OR REPLACE INTO paths (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)',
+                                  self.path_updates)
+        self.path_updates = []
+        self.archive_updates = {}
+
+    def close(self):
+        self.conn.close()
+
+
+def is_archive(name):
+    return name.endswith(ARCHIVE_SUFFIXES) and not name.endswith(SKIPPED_SUFFIXES)
+
+
+def project_archives(project_path, excludes=None):
+    """项目各模块target/下的归档，以及解包的WAR目录中WEB-INF/lib下的JAR"""
+    excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+    archives = []
+    for pom in walk_project(project_path, excludes, respect_gitignore=False).pom_files:
+        target = pom.parent / 'target'
+        if not target.is_dir():
+            continue
+        with os.scandir(target) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_file() and is_archive(entry.name):
+                archives.append(Path(entry.path))
+            elif entry.is_dir():
+                lib = Path(entry.path) / 'WEB-INF' / 'lib'
+                if lib.is_dir():
+                    archives.extend(sorted(path for path in lib.iterdir() if is_archive(path.name)))
+    return archives
+
+
+def repository_archives(repository):
+    """本地Maven仓库中的全部构件JAR（不含源码和文档JAR）"""
+    for dirpath, dirnames, filenames in os.walk(repository):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.jar') and not name.endswith(SKIPPED_SUFFIXES):
+                yield Path(dirpath) / name
+
+
+class JarScanner:
+    """并行扫描归档，结果按中央目录校验和缓存"""
+
+    def __init__(self, jobs=1, use_cache=True):
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.stats = {'archives': 0, 'cache_hits': 0, 'digest_hits': 0, 'parsed': 0, 'errors': 0, 'nested_skipped': 0}
+
+    def scan(self, archives):
+        """扫描全部归档，返回结果列表（顺序与输入一致）"""
+        cache = None
+        if self.use_cache:
+            try:
+                cache = JarCache()
+            except (sqlite3.Error, OSError) as e:
+                print(f"  ⚠ JAR扫描缓存不可用: {e}")
+
+        results = []
+        pending = []
+        stats = {}
+        for path in archives:
+            path = str(path)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                results.append({'path': path, 'error': f"{type(e).__name__}: {e}"})
+                continue
+            stats[path] = stat
+            cached = cache.lookup(path, stat) if cache is not None else None
+            results.append(cached)
+            if cached is None:
+                pending.append((len(results) - 1, path))
+
+        db_path = str(cache.db_path) if cache is not None else None
+        paths = [path for _, path in pending]
+        if self.jobs > 1 and len(paths) > 1:
+            chunksize = max(1, len(paths) // (self.jobs * 8))
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker,
+                                     initargs=(db_path,)) as executor:
+                scanned = list(executor.map(scan_archive, paths, chunksize=chunksize))
+        else:
+            init_worker(db_path)
+            scanned = [scan_archive(path) for path in paths]
+            init_worker(None)
+
+        for (index, path), result in zip(pending, scanned):
+            results[index] = result
+            if cache is not None:
+                cache.store(path, stats[path], result)
+
+        if cache is not None:
+            self.stats['cache_hits'] = cache.hits
+            try:
+                cache.save()
+            except sqlite3.Error as e:
+                print(f"  ⚠ 写入JAR扫描缓存失败: {e}")
+            cache.close()
+
+        self.stats['archives'] = len(results)
+        self.stats['digest_hits'] = sum(1 for result in scanned if result.get('cached'))
+        self.stats['parsed'] = sum(1 for result in scanned if 'error' not in result and not result.get('cached'))
+        self.stats['errors'] = sum(1 for result in results if 'error' in result)
+        self.stats['nested_skipped'] = sum(result.get('nested_skipped', 0) for result in results)
+        return results
+
+
+def summarize(results):
+    """汇总各javax包出现在哪些归档中，并给出对应的jakarta包"""
+    mapping_table = load_mapping_table()
+    packages = {}
+    archives = []
+    for result in results:
+        sources = [(result['path'], result)] if 'error' not in result else []
+        sources += [(f"{result['path']}!/{nested['name']}", nested) for nested in result.get('nested', [])]
+        for path, summary in sources:
+            if not summary['javax_packages']:
+                continue
+            archives.append({'path': path, 'javax_packages': summary['javax_packages'],
+                             'javax_classes': summary['javax_classes']})
+            for package, count in summary['javax_packages'].items():
+                info = packages.setdefault(package, {'archives': 0, 'classes': 0, 'jakarta': None})
+                info['archives'] += 1
+                info['classes'] += count
+                prefix = mapping_table.longest_prefix(package)
+                if prefix is not None:
+                    info['jakarta'] = mapping_table.mappings[prefix] + package[len(prefix):]
+    return {
+        'javax_packages': dict(sorted(packages.items())),
+        'archives_with_javax': archives,
+        'errors': [{'path': result['path'], 'error': result['error']} for result in results if 'error' in result]
+    }
+
+
+def print_summary(summary, stats):
+    print(f"  ✓ 归档: {stats['archives']}个 (缓存命中 {stats['cache_hits'] + stats['digest_hits']}，"
+          f"新解析 {stats['parsed']}，失败 {stats['errors']})")
+    if stats['nested_skipped']:
+        print(f"  ⚠ {stats['nested_skipped']}个压缩存储的嵌套JAR需要解压，未扫描")
+    if not summary['javax_packages']:
+        print("  ✓ 未发现包含javax类的归档")
+        return
+    print(f"  ⚠ {len(summary['archives_with_javax'])}个归档包含javax类:")
+    for package, info in summary['javax_packages'].items():
+        target = f" → {info['jakarta']}" if info['jakarta'] else '（无jakarta对应包）'
+        print(f"    - {package}: {info['archives']}个归档, {info['classes']}个类{target}")
+
+
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python scan_jars.py <project_path> [--m2] [--m2-repo PATH] [--jobs N] [--no-cache] [--output PATH]")
+        print("\n选项:")
+        print("  --m2             同时扫描本地Maven仓库 ~/.m2/repository")
+        print("  --m2-repo PATH   扫描指定的本地Maven仓库（隐含--m2）")
+        print("  --jobs N         并行扫描的进程数（默认使用全部CPU核数）")
+        print("  --no-cache       不使用JAR扫描缓存")
+        print("  --output PATH    结果文件（默认为项目目录下的jar_scan.json）")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    if not project_path.is_dir():
+        print(f"错误: 项目路径不存在: {project_path}")
+        sys.exit(1)
+
+    try:
+        jobs = int(get_option_value('--jobs', '0'))
+    except ValueError:
+        print("错误: --jobs 参数必须为整数")
+        sys.exit(1)
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    archives = project_archives(project_path)
+    print(f"项目构建输出: {len(archives)}个归档")
+    repository = get_option_value('--m2-repo')
+    if repository or '--m2' in sys.argv:
+        repository = Path(repository or DEFAULT_M2_REPOSITORY)
+        if not repository.is_dir():
+            print(f"错误: 本地Maven仓库不存在: {repository}")
+            sys.exit(1)
+        repository_jars = list(repository_archives(repository))
+        print(f"本地Maven仓库: {len(repository_jars)}个JAR ({repository})")
+        archives += repository_jars
+
+    print("=" * 60)
+    scanner = JarScanner(jobs=jobs, use_cache='--no-cache' not in sys.argv)
+    results = scanner.scan(archives)
+    summary = summarize(results)
+    print_summary(summary, scanner.stats)
+
+    output = Path(get_option_value('--output') or project_path / 'jar_scan.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'scan_time': datetime.now().isoformat(), 'scan_stats': scanner.stats, **summary},
+                  f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存: {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+升级工具缓存目录
+各脚本的持久化缓存统一存放在用户缓存目录下
+"""
+
+import os
+from pathlib import Path
+
+# 可通过环境变量指定缓存目录（如CI中挂载的持久化目录）
+CACHE_DIR_ENV = 'JDK21_UPGRADE_CACHE_DIR'
+
+
+def get_cache_dir(create=True):
+    """返回缓存目录，默认为 $XDG_CACHE_HOME/jdk8-to-jdk21-upgrade"""
+    if os.environ.get(CACHE_DIR_ENV):
+        cache_dir = Path(os.environ[CACHE_DIR_ENV])
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        cache_dir = Path(base) / 'jdk8-to-jdk21-upgrade'
+
+    if create:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
@@ -7,31 +7,93 @@ POM.xml自动升级脚本
 import os
 import sys
 import re
+import io
 import shutil
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 
+from atomic_write import AtomicBatchWriter, write_temp
+from dependency_catalog import is_older, load_catalog
+from m2_index import DEFAULT_M2_REPOSITORY, M2Index
+from pom_model import PomModel
+
+# 通过属性配置的版本在本地仓库中对应的构件
+PROPERTY_ARTIFACTS = {
+    'spring_boot': ('org.springframework.boot', 'spring-boot-dependencies'),
+    'spring_cloud': ('org.springframework.cloud', 'spring-cloud-dependencies'),
+}
+
+# Spring Boot各构件版本一致，离线模式下统一使用选出的Boot版本
+SPRING_BOOT_GROUP = 'org.springframework.boot'
+
+def major_line(version, parts=1):
+    """版本号开头的数字部分，如 major_line('3.2.4') == '3'，major_line('3.2.4', 2) == '3.2'"""
+    return '.'.join(re.split(r'[.-]', version)[:parts])
+
 class PomUpgrader:
-    def __init__(self, pom_path, use_parent=False, backup=True):
+    def __init__(self, pom_path, use_parent=False, backup=True, offline_repo=None):
         self.pom_path = Path(pom_path)
         self.use_parent = use_parent
         self.backup = backup
         self.ns = {'m': 'http://maven.apache.org/POM/4.0.0'}
         
-        # 版本配置
-        self.versions = {
-            'spring_boot': '3.2.4',
-            'spring_cloud': '2023.0.1',
-            'lombok': '1.18.36',
-            'mapstruct': '1.5.5.Final',
-            'guava': '33.2.1-jre',
-            'hutool': '5.8.25',
-            'mybatis_plus': '3.5.5',
-            'mysql_connector': '8.3.0',
-            'redisson': '3.27.2',
-            'fastjson2': '2.0.47',
-        }
+        # 版本配置（来自references/dependency_versions.json，每次运行只加载一次）
+        self.catalog = load_catalog()
+        self.versions = self.catalog.versions
+        
+        # 共享的POM模型，同一文件只解析一次，并提供继承后的有效版本
+        self.model = PomModel()
+        
+        # 离线模式：目录中的版本作为最低要求，实际使用本地Maven仓库中同一主版本内已有的最新版本
+        self.m2_index = None
+        self.offline_spring = None
+        if offline_repo is not None:
+            self.m2_index = M2Index(offline_repo)
+            stats = self.m2_index.refresh()
+            print(f"✓ 本地仓库索引: {stats['artifacts']}个构件, {stats['versions']}个版本 "
+                  f"(重新列出 {stats['rescanned']}个目录，{stats['seconds']}s)")
+    
+    def local_version(self, group_id, artifact_id, minimum):
+        """升级使用的版本，本地没有可用版本时返回None
+        
+        离线模式下为本地仓库中不低于minimum、且与minimum主版本相同的最新正式版，避免静默跨主版本升级；
+        Spring Boot构件统一使用选出的Boot版本，Spring Cloud按该Boot版本对应的发布列车选择。
+        """
+        if self.m2_index is None:
+            return minimum
+        
+        if group_id == SPRING_BOOT_GROUP:
+            version = self.offline_spring_versions()['spring_boot']
+            if version is not None and not self.m2_index.has(group_id, artifact_id, version):
+                version = None
+        elif (group_id, artifact_id) == PROPERTY_ARTIFACTS['spring_cloud']:
+            version = self.offline_spring_versions()['spring_cloud']
+        else:
+            version = self.m2_index.newest(group_id, artifact_id, minimum, line=major_line(minimum))
+        
+        if version is None:
+            print(f"  ⚠ 本地仓库中没有 {group_id}:{artifact_id} 可用的兼容版本（最低 {minimum}）")
+        return version
+    
+    def offline_spring_versions(self):
+        """离线模式下选择Spring Boot及与之匹配的Spring Cloud版本（只计算一次）"""
+        if self.offline_spring is None:
+            boot_minimum = self.versions['spring_boot']
+            boot = self.m2_index.newest(*PROPERTY_ARTIFACTS['spring_boot'], boot_minimum,
+                                        line=major_line(boot_minimum))
+            
+            cloud = None
+            train = self.catalog.entries['spring_cloud']['boot_release_trains'].get(major_line(boot, 2)) if boot else None
+            if train:
+                # 目录最低版本属于同一发布列车时以其为下限，否则从该列车的第一个版本起选择
+                cloud_minimum = self.versions['spring_cloud']
+                if major_line(cloud_minimum, 2) != train:
+                    cloud_minimum = train
+                cloud = self.m2_index.newest(*PROPERTY_ARTIFACTS['spring_cloud'], cloud_minimum, line=train)
+            self.offline_spring = {'spring_boot': boot, 'spring_cloud': cloud}
+        return self.offline_spring
     
     def upgrade(self):
         """执行升级"""
@@ -43,8 +105,9 @@ class PomUpgrader:
             self.create_backup()
         
         # 解析POM
-        tree = ET.parse(self.pom_path)
-        root = tree.getroot()
+        pom = self.model.load(self.pom_path)
+        tree, root = pom.tree, pom.root
+        self.print_current_versions(pom)
         
         # 注册命名空间
         ET.register_namespace('', 'http://maven.apache.org/POM/4.0.0')
@@ -69,11 +132,85 @@ class PomUpgrader:
         if self.backup:
             print(f"   备份: {self.pom_path}.backup")
     
-    def create_backup(self):
+    def upgrade_reactor(self, jobs=4):
+        """多模块reactor模式：从根POM出发一次性解析全部模块，按继承关系在合适的位置升级
+        
+        parent/BOM和compiler plugin只配置在继承链顶端的POM中，继承reactor内父POM的子模块
+        只更新自身已声明的版本属性、依赖版本和compiler plugin，不重复复制父POM的配置。
+        """
+        print(f"正在升级reactor: {self.pom_path}")
+        print("=" * 60)
+        
+        ET.register_namespace('', 'http://maven.apache.org/POM/4.0.0')
+        ET.register_namespace('xsi', 'http://www.w3.org/2001/XMLSchema-instance')
+        
+        modules = self.model.load_reactor(self.pom_path)
+        reactor_paths = {pom.path for pom in modules}
+        print(f"✓ 发现 {len(modules)} 个模块")
+        
+        for pom in modules:
+            # 父POM在reactor内时，由父POM统一管理的配置不在子模块中重复添加
+            inherited = pom.parent_pom is not None and pom.parent_pom.path in reactor_paths
+            # <module>可以指向根目录之外（如../sibling），仅用于显示
+            relative_path = os.path.relpath(pom.path, Path(self.pom_path).resolve().parent)
+            print(f"\n>>> 模块: {pom.coordinates} ({relative_path}){' [继承reactor父POM]' if inherited else ''}")
+            self.print_current_versions(pom)
+            
+            if self.backup:
+                self.create_backup(pom.path)
+            
+            if not inherited:
+                if self.use_parent:
+                    self.upgrade_to_ym_parent(pom.root)
+                else:
+                    self.upgrade_with_bom(pom.root)
+            
+            self.upgrade_properties(pom.root, inherited=inherited)
+            self.upgrade_dependencies(pom.root, inherited=inherited,
+                                      property_roots=self.property_roots(pom, reactor_paths))
+            self.add_compiler_plugin(pom.root, inherited=inherited)
+        
+        # 各模块文件相互独立，并行序列化后统一原子替换
+        writer = AtomicBatchWriter()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                for pom, temp in zip(modules, executor.map(self.write_temp_pom, modules)):
+                    writer.add(temp, pom.path)
+            writer.commit()
+        except BaseException:
+            writer.abort([pom.path for pom in modules])
+            raise
+        
+        print(f"\n✅ Reactor升级完成! 共 {len(modules)} 个模块")
+    
+    def print_current_versions(self, pom):
+        """输出升级前继承和属性展开后的有效版本"""
+        versions = self.model.effective_versions(pom)
+        print(f"  当前版本: JDK {versions.get('java', '未指定')}, "
+              f"Spring Boot {versions.get('spring_boot', '未使用')}, "
+              f"Spring Cloud {versions.get('spring_cloud', '未使用')}")
+    
+    def property_roots(self, pom, reactor_paths):
+        """依赖版本属性的查找顺序：本模块及reactor内的各级父POM"""
+        roots = []
+        while pom is not None and pom.path in reactor_paths:
+            roots.append(pom.root)
+            pom = pom.parent_pom
+        return roots
+    
+    def write_temp_pom(self, pom):
+        """格式化并序列化POM到临时文件"""
+        self.pretty_print(pom.tree, pom.root)
+        buffer = io.BytesIO()
+        pom.tree.write(buffer, encoding='UTF-8', xml_declaration=True)
+        return write_temp(pom.path, [buffer.getvalue()])
+    
+    def create_backup(self, pom_path=None):
         """创建备份文件"""
+        pom_path = pom_path or self.pom_path
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_path = f"{self.pom_path}.backup-{timestamp}"
-        shutil.copy2(self.pom_path, backup_path)
+        backup_path = f"{pom_path}.backup-{timestamp}"
+        shutil.copy2(pom_path, backup_path)
         print(f"✓ 已创建备份: {backup_path}")
     
     def upgrade_to_ym_parent(self, root):
@@ -136,13 +273,19 @@ class PomUpgrader:
         
         print("  ✓ 已添加ym-dependencies-bom")
     
-    def upgrade_properties(self, root):
-        """升级properties配置"""
+    def upgrade_properties(self, root, inherited=False):
+        """升级properties配置
+        
+        inherited为True时属性由父POM提供，只更新本模块中已声明（覆盖）的属性。
+        """
         print("\n[2/5] 升级版本属性...")
         
         # 查找或创建properties
         properties = root.find('m:properties', self.ns)
         if properties is None:
+            if inherited:
+                print("  ✓ 继承父POM属性，无需修改")
+                return
             properties = ET.SubElement(root, '{http://maven.apache.org/POM/4.0.0}properties')
         
         # 更新JDK版本
@@ -156,6 +299,8 @@ class PomUpgrader:
         for key, value in java_properties.items():
             prop = properties.find(f'm:{key}', self.ns)
             if prop is None:
+                if inherited:
+                    continue
                 prop = ET.SubElement(properties, f'{{http://maven.apache.org/POM/4.0.0}}{key}')
             prop.text = value
         
@@ -164,47 +309,92 @@ class PomUpgrader:
         # 更新Spring版本（如果存在）
         spring_boot_prop = properties.find('m:spring-boot.version', self.ns)
         if spring_boot_prop is not None:
-            spring_boot_prop.text = self.versions['spring_boot']
-            print(f"  ✓ Spring Boot版本: {self.versions['spring_boot']}")
+            target = self.local_version(*PROPERTY_ARTIFACTS['spring_boot'], self.versions['spring_boot'])
+            if target:
+                spring_boot_prop.text = target
+                print(f"  ✓ Spring Boot版本: {target}")
         
         spring_cloud_prop = properties.find('m:spring-cloud.version', self.ns)
         if spring_cloud_prop is not None:
-            spring_cloud_prop.text = self.versions['spring_cloud']
-            print(f"  ✓ Spring Cloud版本: {self.versions['spring_cloud']}")
+            target = self.local_version(*PROPERTY_ARTIFACTS['spring_cloud'], self.versions['spring_cloud'])
+            if target:
+                spring_cloud_prop.text = target
+                print(f"  ✓ Spring Cloud版本: {target}")
     
-    def upgrade_dependencies(self, root):
-        """升级依赖版本"""
+    def upgrade_dependencies(self, root, inherited=False, property_roots=None):
+        """升级依赖版本
+        
+        inherited为True时未声明版本的依赖由父POM的dependencyManagement管理，不添加version。
+        版本为${property}引用时更新定义该属性的POM（property_roots依次为本模块及reactor内的各级父POM）。
+        """
         print("\n[3/5] 升级依赖版本...")
         
-        # 依赖版本映射
-        dependency_upgrades = {
-            ('org.projectlombok', 'lombok'): self.versions['lombok'],
-            ('org.mapstruct', 'mapstruct'): self.versions['mapstruct'],
-            ('com.google.guava', 'guava'): self.versions['guava'],
-            ('cn.hutool', 'hutool-all'): self.versions['hutool'],
-            ('com.baomidou', 'mybatis-plus-boot-starter'): self.versions['mybatis_plus'],
-            ('com.mysql', 'mysql-connector-j'): self.versions['mysql_connector'],
-            ('org.redisson', 'redisson-spring-boot-starter'): self.versions['redisson'],
-            ('com.alibaba.fastjson2', 'fastjson2'): self.versions['fastjson2'],
-        }
+        property_roots = property_roots or [root]
+        
+        # 单次遍历全部dependency节点，每个节点只遍历一次子元素
+        for dependency in root.iter('{http://maven.apache.org/POM/4.0.0}dependency'):
+            fields = {child.tag.rsplit('}', 1)[-1]: child for child in dependency}
+            group_id = fields.get('groupId')
+            artifact_id = fields.get('artifactId')
+            if group_id is None or artifact_id is None or not group_id.text or not artifact_id.text:
+                continue
+            
+            entry, exact = self.catalog.lookup(group_id.text.strip(), artifact_id.text.strip())
+            if entry is None:
+                continue
+            
+            # 先排除不会写入的依赖，再查询本地仓库，避免为它们输出缺少版本的警告
+            version = fields.get('version')
+            # 通配规则命中的依赖通常由BOM管理，只升级已显式声明的版本
+            if version is None and (inherited or not exact):
+                continue
+            current = (version.text or '').strip() if version is not None else ''
+            property_ref = re.fullmatch(r'\$\{([^}]+)\}', current)
+            if property_ref and property_ref.group(1).startswith('project.'):
+                continue
+            
+            target = self.local_version(group_id.text.strip(), artifact_id.text.strip(), entry['version'])
+            if target is None:
+                continue
+            
+            if property_ref:
+                self.upgrade_version_property(property_ref.group(1), target, property_roots)
+                continue
+            
+            if current and not is_older(current, target):
+                continue
+            if version is None:
+                version = ET.SubElement(dependency, '{http://maven.apache.org/POM/4.0.0}version')
+            version.text = target
+            print(f"  ✓ 升级: {artifact_id.text} -> {target}")
+    
+    def upgrade_version_property(self, name, target, property_roots):
+        """升级依赖版本引用的属性，而不是在依赖上写入字面版本号"""
+        if name.startswith('project.'):
+            return
+        
+        for root in property_roots:
+            prop = root.find(f'm:properties/m:{name}', self.ns)
+            if prop is None:
+                continue
+            current = (prop.text or '').strip()
+            if current and not is_older(current, target):
+                return
+            prop.text = target
+            print(f"  ✓ 升级属性: ${{{name}}} -> {target}")
+            return
         
-        # 查找所有dependencies节点
-        for dependencies in root.findall('.//m:dependencies', self.ns):
-            for dependency in dependencies.findall('m:dependency', self.ns):
-                group_id = dependency.find('m:groupId', self.ns)
-                artifact_id = dependency.find('m:artifactId', self.ns)
-                
-                if group_id is not None and artifact_id is not None:
-                    key = (group_id.text, artifact_id.text)
-                    if key in dependency_upgrades:
-                        version = dependency.find('m:version', self.ns)
-                        if version is None:
-                            version = ET.SubElement(dependency, '{http://maven.apache.org/POM/4.0.0}version')
-                        version.text = dependency_upgrades[key]
-                        print(f"  ✓ 升级: {artifact_id.text} -> {dependency_upgrades[key]}")
+        print(f"  ⚠ 属性 ${{{name}}} 未在本地POM中定义，请手动升级到 {target}")
     
-    def add_compiler_plugin(self, root):
-        """添加compiler plugin配置（仅BOM模式需要）"""
+    def add_compiler_plugin(self, root, inherited=False):
+        """添加compiler plugin配置（仅BOM模式需要）
+        
+        inherited为True时插件配置由父POM提供，只把本模块已有的compiler plugin对齐到21。
+        """
+        if inherited:
+            self.align_compiler_plugin(root)
+            return
+        
         if self.use_parent:
             print("\n[4/5] 跳过compiler plugin配置（由parent提供）")
             return
@@ -262,23 +452,19 @@ class PomUpgrader:
         # annotationProcessorPaths
         processor_paths = ET.SubElement(configuration, '{http://maven.apache.org/POM/4.0.0}annotationProcessorPaths')
         
-        # Lombok
-        lombok_path = ET.SubElement(processor_paths, '{http://maven.apache.org/POM/4.0.0}path')
-        lombok_group = ET.SubElement(lombok_path, '{http://maven.apache.org/POM/4.0.0}groupId')
-        lombok_group.text = 'org.projectlombok'
-        lombok_artifact = ET.SubElement(lombok_path, '{http://maven.apache.org/POM/4.0.0}artifactId')
-        lombok_artifact.text = 'lombok'
-        lombok_version = ET.SubElement(lombok_path, '{http://maven.apache.org/POM/4.0.0}version')
-        lombok_version.text = self.versions['lombok']
-        
-        # MapStruct
-        mapstruct_path = ET.SubElement(processor_paths, '{http://maven.apache.org/POM/4.0.0}path')
-        mapstruct_group = ET.SubElement(mapstruct_path, '{http://maven.apache.org/POM/4.0.0}groupId')
-        mapstruct_group.text = 'org.mapstruct'
-        mapstruct_artifact = ET.SubElement(mapstruct_path, '{http://maven.apache.org/POM/4.0.0}artifactId')
-        mapstruct_artifact.text = 'mapstruct-processor'
-        mapstruct_version = ET.SubElement(mapstruct_path, '{http://maven.apache.org/POM/4.0.0}version')
-        mapstruct_version.text = self.versions['mapstruct']
+        # Lombok、MapStruct注解处理器（离线模式下本地仓库没有兼容版本时不添加，避免写入无法解析的版本）
+        processors = [
+            ('org.projectlombok', 'lombok', self.versions['lombok']),
+            ('org.mapstruct', 'mapstruct-processor', self.versions['mapstruct']),
+        ]
+        for processor_group, processor_artifact, minimum in processors:
+            processor_version = self.local_version(processor_group, processor_artifact, minimum)
+            if processor_version is None:
+                continue
+            path = ET.SubElement(processor_paths, '{http://maven.apache.org/POM/4.0.0}path')
+            ET.SubElement(path, '{http://maven.apache.org/POM/4.0.0}groupId').text = processor_group
+            ET.SubElement(path, '{http://maven.apache.org/POM/4.0.0}artifactId').text = processor_artifact
+            ET.SubElement(path, '{http://maven.apache.org/POM/4.0.0}version').text = processor_version
         
         # compilerArgs
         compiler_args = ET.SubElement(configuration, '{http://maven.apache.org/POM/4.0.0}compilerArgs')
@@ -297,6 +483,27 @@ class PomUpgrader:
         
         print("  ✓ 已配置maven-compiler-plugin")
     
+    def align_compiler_plugin(self, root):
+        """将子模块中覆盖的compiler plugin的source/target/release对齐到21"""
+        print("\n[4/5] 检查compiler plugin覆盖配置...")
+        
+        for plugin in root.findall('.//m:plugins/m:plugin', self.ns):
+            artifact_id = plugin.find('m:artifactId', self.ns)
+            if artifact_id is None or artifact_id.text != 'maven-compiler-plugin':
+                continue
+            
+            configuration = plugin.find('m:configuration', self.ns)
+            if configuration is None:
+                continue
+            for tag in ('source', 'target', 'release'):
+                elem = configuration.find(f'm:{tag}', self.ns)
+                if elem is not None:
+                    elem.text = '21'
+            print("  ✓ 已将模块内compiler plugin配置对齐到21")
+            return
+        
+        print("  ✓ 使用父POM的compiler plugin配置")
+    
     def pretty_print(self, tree, root):
         """格式化XML输出"""
         self.indent(root)
@@ -317,26 +524,56 @@ class PomUpgrader:
             if level and (not elem.tail or not elem.tail.strip()):
                 elem.tail = i
 
+def get_option_value(name, default=None):
+    """读取形如 --name VALUE 的命令行参数"""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
 def main():
     if len(sys.argv) < 2:
-        print("用法: python upgrade_pom.py <pom.xml路径> [--use-parent] [--no-backup]")
+        print("用法: python upgrade_pom.py <pom.xml路径> [--use-parent] [--no-backup] [--reactor [--jobs N]] [--offline-m2 [PATH]]")
         print("\n选项:")
         print("  --use-parent  使用ym-build-parent继承方式（推荐）")
         print("  --no-backup   不创建备份文件")
+        print("  --reactor     多模块模式：从根POM递归升级<modules>中的全部模块")
+        print("  --jobs N      reactor模式下并行写入模块文件的线程数（默认4）")
+        print(f"  --offline-m2 [PATH]  离线模式：依赖版本取本地Maven仓库（默认{DEFAULT_M2_REPOSITORY}）中不低于目录版本的最新正式版")
         sys.exit(1)
     
     pom_path = sys.argv[1]
     use_parent = '--use-parent' in sys.argv
     backup = '--no-backup' not in sys.argv
+    reactor = '--reactor' in sys.argv
+    
+    try:
+        jobs = int(get_option_value('--jobs', '4'))
+    except ValueError:
+        print("错误: --jobs 参数必须为整数")
+        sys.exit(1)
     
     if not os.path.exists(pom_path):
         print(f"错误: 文件不存在: {pom_path}")
         sys.exit(1)
     
-    upgrader = PomUpgrader(pom_path, use_parent=use_parent, backup=backup)
+    offline_repo = None
+    if '--offline-m2' in sys.argv:
+        offline_repo = get_option_value('--offline-m2')
+        if offline_repo is None or offline_repo.startswith('--'):
+            offline_repo = DEFAULT_M2_REPOSITORY
+        if not os.path.isdir(offline_repo):
+            print(f"错误: 本地Maven仓库不存在: {offline_repo}")
+            sys.exit(1)
+    
+    upgrader = PomUpgrader(pom_path, use_parent=use_parent, backup=backup, offline_repo=offline_repo)
     
     try:
-        upgrader.upgrade()
+        if reactor:
+            upgrader.upgrade_reactor(jobs=jobs)
+        else:
+            upgrader.upgrade()
         print("\n" + "=" * 60)
         print("升级完成! 建议执行以下命令验证:")
         print("  mvn clean compile")
@@ -7,6 +7,9 @@ set -e
 PROJECT_PATH="${1:-.}"
 RUN_TESTS="${2:-false}"
 
+# 脚本所在目录需在切换到项目目录之前确定
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
 echo "========================================"
 echo "JDK 升级验证"
 echo "========================================"
@@ -52,12 +55,13 @@ echo "[3/4] 分析依赖树..."
 mvn dependency:tree > dependency-tree.txt 2>&1
 echo "✅ 依赖树已生成: dependency-tree.txt"
 
-# 检查是否有javax依赖冲突
-if grep -q "javax.servlet-api" dependency-tree.txt || \
-   grep -q "javax.persistence-api" dependency-tree.txt || \
-   grep -q "validation-api.*2.0" dependency-tree.txt; then
-    echo "⚠️  警告: 发现旧版本的javax依赖，可能存在冲突"
-    echo "   请检查 dependency-tree.txt"
+# 检查javax/jakarta命名空间冲突（结果按依赖树内容缓存，依赖未变化时不重新解析）
+if command -v python3 &> /dev/null; then
+    if ! python3 "$SCRIPT_DIR/analyze_dependency_tree.py" dependency-tree.txt --output dependency_analysis.json; then
+        echo "⚠️  警告: 依赖树分析失败，请检查 dependency-tree.txt"
+    fi
+else
+    echo "⚠️  警告: 未找到python3，跳过javax依赖冲突检查"
 fi
 
 # 运行测试（可选）
@@ -93,7 +97,8 @@ REPORT_FILE="upgrade_validation_report.txt"
     fi
     echo ""
     echo "依赖分析:"
-    echo "  详见: dependency-tree.txt"
+    echo "  依赖树: dependency-tree.txt"
+    echo "  javax/jakarta冲突: dependency_analysis.json"
     echo ""
     echo "后续建议:"
     echo "  1. 运行完整的集成测试"
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+ZIP中央目录读取
+只读取JAR/WAR末尾的中央目录即可列出全部条目，不解压任何内容；
+未压缩存储的嵌套JAR（如Spring Boot的BOOT-INF/lib）可在外层文件中原位读取其中央目录。
+需要条目内容时（如class文件）按条目单独读取并解压。
+ZIP64格式交给标准库zipfile处理
+"""
+
+import hashlib
+import struct
+import zipfile
+import zlib
+from collections import namedtuple
+
+# 中央目录结束记录：签名、磁盘号、中央目录起始磁盘、本磁盘条目数、条目总数、中央目录大小、偏移、注释长度
+END_RECORD = struct.Struct('<4s4H2LH')
+END_SIGNATURE = b'PK\x05\x06'
+
+# 中央目录文件头（46字节，之后依次为文件名、扩展字段、注释）
+CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+CENTRAL_SIGNATURE = b'PK\x01\x02'
+
+# 本地文件头（30字节），用于定位条目数据的起始位置
+LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+LOCAL_SIGNATURE = b'PK\x03\x04'
+
+# 文件名使用UTF-8编码的标志位
+UTF8_FLAG = 0x800
+
+STORED = 0
+DEFLATED = 8
+
+ZipEntry = namedtuple('ZipEntry', 'name method compressed_size size local_offset')
+
+
+class Zip64Required(Exception):
+    """归档使用ZIP64扩展字段，需要交给zipfile处理"""
+
+
+class CentralDirectory:
+    """读出的中央目录原始字节，digest同时覆盖各条目的CRC和大小，可作为归档内容的校验和"""
+
+    def __init__(self, data, count, base):
+        self.data = data
+        self.count = count
+        self.base = base
+        self.digest = hashlib.sha256(data).hexdigest()
+
+    def entries(self):
+        """解析中央目录中的全部条目，local_offset为条目本地头在外层文件中的绝对位置"""
+        data = self.data
+        entries = []
+        position = 0
+        for _ in range(self.count):
+            (signature, _, _, flags, method, _, _, _, compressed_size, size,
+             name_length, extra_length, comment_length, _, _, _, local_offset) = CENTRAL_HEADER.unpack_from(data, position)
+            if signature != CENTRAL_SIGNATURE:
+                raise zipfile.BadZipFile('中央目录条目签名错误')
+            if 0xFFFFFFFF in (compressed_size, size, local_offset):
+                raise Zip64Required()
+            start = position + CENTRAL_HEADER.size
+            raw_name = data[start:start + name_length]
+            name = raw_name.decode('utf-8' if flags & UTF8_FLAG else 'cp437', 'replace')
+            entries.append(ZipEntry(name, method, compressed_size, size, self.base + local_offset))
+            position = start + name_length + extra_length + comment_length
+        return entries
+
+
+def read_central_directory(f, start=0, end=None):
+    """读取位于文件[start, end)区间内的ZIP归档的中央目录"""
+    if end is None:
+        f.seek(0, 2)
+        end = f.tell()
+
+    # 结束记录位于归档末尾，之后最多跟随65535字节的注释
+    tail_start = max(start, end - END_RECORD.size - 0xFFFF)
+    f.seek(tail_start)
+    tail = f.read(end - tail_start)
+    position = tail.rfind(END_SIGNATURE)
+    if position == -1 or position + END_RECORD.size > len(tail):
+        raise zipfile.BadZipFile('未找到中央目录结束记录')
+
+    _, _, _, _, count, size, offset, _ = END_RECORD.unpack_from(tail, position)
+    if count == 0xFFFF or size == 0xFFFFFFFF or offset == 0xFFFFFFFF:
+        raise Zip64Required()
+
+    # 按结束记录的位置反推中央目录起点，兼容前置了启动脚本等数据的可执行JAR
+    end_record = tail_start + position
+    directory_start = end_record - size
+    if directory_start < start:
+        raise zipfile.BadZipFile('中央目录位置超出归档范围')
+    if directory_start >= tail_start:
+        data = tail[directory_start - tail_start:position]
+    else:
+        f.seek(directory_start)
+        data = f.read(size)
+    return CentralDirectory(data, count, directory_start - offset)
+
+
+def entry_data_offset(f, entry):
+    """条目数据在外层文件中的起始位置（跳过本地文件头）"""
+    f.seek(entry.local_offset)
+    header = f.read(LOCAL_HEADER.size)
+    if len(header) != LOCAL_HEADER.size or header[:4] != LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile(f'本地文件头签名错误: {entry.name}')
+    name_length, extra_length = LOCAL_HEADER.unpack(header)[-2:]
+    return entry.local_offset + LOCAL_HEADER.size + name_length + extra_length
+
+
+def read_entry(f, entry):
+    """读取单个条目的内容（仅支持存储和deflate压缩，与JAR规范一致）"""
+    f.seek(entry_data_offset(f, entry))
+    data = f.read(entry.compressed_size)
+    if entry.method == STORED:
+        return data
+    if entry.method == DEFLATED:
+        return zlib.decompress(data, -15)
+    raise zipfile.BadZipFile(f'不支持的压缩方式 {entry.method}: {entry.name}')
+
+
+def zipfile_entries(path):
+    """ZIP64等情况下使用zipfile列出条目，校验和由各条目的名称、CRC和大小计算"""
+    with zipfile.ZipFile(path) as archive:
+        infos = archive.infolist()
+    digest = hashlib.sha256()
+    for info in infos:
+        digest.update(f'{info.filename}\0{info.CRC}\0{info.file_size}\n'.encode('utf-8', 'surrogateescape'))
+    entries = [ZipEntry(info.filename, info.compress_type, info.compress_size, info.file_size, info.header_offset)
+               for info in infos]
+    return entries, digest.hexdigest()